@@ -3,20 +3,43 @@ AI API endpoints for NexusMind
 Provides AI-powered features like tag generation, summarization, and semantic search
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Callable, List, Literal, Optional
+from core.config import settings
 from core.middleware import get_current_user_id
+from core.rate_limit import rate_limiter
+from core.responses import trusted_rows
 from services.ai_service import ai_service
-from db.supabase import get_supabase
+from services.embeddings import content_hash, note_text
+from services.job_queue import job_queue, QueueFullError
+from db.repository import notes_repo
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
+# Per-user limits for endpoints that may call rate-limited AI providers
+ai_concurrency_limit = rate_limiter.concurrency("ai", settings.ai_max_concurrent_per_user)
+ai_stream_slot = rate_limiter.stream_concurrency("ai", settings.ai_max_concurrent_per_user)
+batch_embeddings_limit = rate_limiter.limit("ai:batch-embeddings", settings.ai_batch_rate_limit_per_minute)
+
+def ai_rate_limit(name: str):
+    return Depends(rate_limiter.limit(
+        f"ai:{name}", settings.ai_rate_limit_per_minute, burst=settings.ai_rate_limit_burst
+    ))
+
+def ai_limits(name: str):
+    return [ai_rate_limit(name), Depends(ai_concurrency_limit)]
+
 # Request/Response Models
 class GenerateTagsRequest(BaseModel):
     title: str
     content: str
     max_tags: Optional[int] = 5
+    refresh: bool = False  # Bypass the cached result
 
 class GenerateTagsResponse(BaseModel):
     tags: List[str]
@@ -26,6 +49,8 @@ class SummarizeRequest(BaseModel):
     title: str
     content: str
     max_length: Optional[int] = 150
+    refresh: bool = False  # Bypass the cached result
+    provider: Optional[Literal["auto", "extractive"]] = None  # Defaults to SUMMARY_PROVIDER
 
 class SummarizeResponse(BaseModel):
     summary: str
@@ -39,17 +64,47 @@ class SemanticSearchResponse(BaseModel):
     results: List[dict]
     query: str
 
+class JobSubmitRequest(BaseModel):
+    type: Literal["generate_tags", "summarize", "batch_embeddings"]
+    force: bool = False
+    title: Optional[str] = None
+    content: Optional[str] = None
+    max_tags: Optional[int] = 5
+    max_length: Optional[int] = 150
+    refresh: bool = False
+    provider: Optional[Literal["auto", "extractive"]] = None
+
+class JobResponse(BaseModel):
+    job_id: str
+    type: str
+    status: str  # "pending", "running", "succeeded", "failed" or "cancelled"
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
 @router.get("/status")
 async def get_ai_status():
     """
     Check if AI service is available
     """
+    if ai_service._check_groq_available():
+        provider = "groq"
+    elif ai_service._check_ollama_available():
+        provider = "ollama"
+    else:
+        provider = "fallback"
+    
     return {
         "available": ai_service.is_available(),
-        "provider": "gemini" if ai_service.is_available() else "fallback"
+        "provider": provider,
+        "providers": ai_service.provider_stats(),
+        "rate_limits": rate_limiter.stats(),
+        "cache": ai_service.cache_stats()
     }
 
-@router.post("/generate-tags", response_model=GenerateTagsResponse)
+@router.post("/generate-tags", response_model=GenerateTagsResponse, dependencies=ai_limits("generate-tags"))
 async def generate_tags(
     request: GenerateTagsRequest,
     user_id: str = Depends(get_current_user_id)
@@ -63,7 +118,8 @@ async def generate_tags(
         tags = await ai_service.generate_tags(
             title=request.title,
             content=request.content,
-            max_tags=request.max_tags
+            max_tags=request.max_tags,
+            refresh=request.refresh
         )
         
         source = "ai" if ai_service.is_available() else "fallback"
@@ -76,7 +132,7 @@ async def generate_tags(
             detail=f"Failed to generate tags: {str(e)}"
         )
 
-@router.post("/summarize", response_model=SummarizeResponse)
+@router.post("/summarize", response_model=SummarizeResponse, dependencies=ai_limits("summarize"))
 async def summarize_note(
     request: SummarizeRequest,
     user_id: str = Depends(get_current_user_id)
@@ -90,10 +146,12 @@ async def summarize_note(
         summary = await ai_service.summarize_note(
             title=request.title,
             content=request.content,
-            max_length=request.max_length
+            max_length=request.max_length,
+            refresh=request.refresh,
+            provider=request.provider
         )
         
-        source = "ai" if ai_service.is_available() else "fallback"
+        source = "ai" if ai_service.is_available() and (request.provider or ai_service.summary_provider) != "extractive" else "fallback"
         
         return SummarizeResponse(summary=summary, source=source)
         
@@ -103,6 +161,64 @@ async def summarize_note(
             detail=f"Failed to generate summary: {str(e)}"
         )
 
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/summarize/stream", dependencies=[ai_rate_limit("summarize")])
+async def summarize_note_stream(
+    request: SummarizeRequest,
+    http_request: Request,
+    ai_slot: Callable = Depends(ai_stream_slot),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Stream a summary for a note as Server-Sent Events
+    
+    Emits "token" events ({"text": ...}) as the provider produces text,
+    then a "done" event ({"source": "ai" | "fallback"}), or an "error"
+    event if the provider fails mid-stream. The provider request is
+    cancelled when the client disconnects. The user's AI concurrency slot
+    is held until the stream ends.
+    Requires authentication.
+    """
+    async def events():
+        try:
+            async with ai_slot():
+                stream = ai_service.stream_summary(
+                    title=request.title,
+                    content=request.content,
+                    max_length=request.max_length,
+                    refresh=request.refresh,
+                    provider=request.provider
+                )
+                source = "fallback"
+                try:
+                    async for provider, text in stream:
+                        if await http_request.is_disconnected():
+                            return
+                        source = "fallback" if provider == "fallback" else "ai"
+                        yield sse_event("token", {"text": text})
+                    yield sse_event("done", {"source": source})
+                except Exception as e:
+                    print(f"Streaming summary failed: {e}")
+                    yield sse_event("error", {"detail": f"Failed to generate summary: {str(e)}"})
+                finally:
+                    # Closes the upstream provider request if we stopped early
+                    await stream.aclose()
+        except HTTPException as e:
+            # Another request took the last slot after the up-front check
+            yield sse_event("error", {"detail": e.detail})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering so tokens arrive immediately
+        }
+    )
+
 @router.post("/semantic-search", response_model=SemanticSearchResponse)
 async def semantic_search(
     request: SemanticSearchRequest,
@@ -114,33 +230,26 @@ async def semantic_search(
     Requires authentication.
     """
     try:
-        supabase = get_supabase()
-        
-        # Fetch user's notes
-        response = supabase.table("notes")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .execute()
-        
-        notes = response.data
-        
-        # Perform semantic search
-        results = await ai_service.semantic_search(
+        # Find the most similar notes in the user's vector index
+        matches = await ai_service.semantic_search(
+            user_id=user_id,
             query=request.query,
-            notes=notes
+            limit=request.limit
         )
         
-        # Limit results
-        results = results[:request.limit]
+        # Fetch the matching notes in one query
+        notes = await notes_repo.get_many([note_id for note_id, _ in matches], user_id)
+        notes_by_id = {note['id']: note for note in notes}
         
-        # Remove embedding from response (too large)
-        for result in results:
-            result.pop('embedding', None)
+        results = []
+        for note_id, score in matches:
+            note = notes_by_id.get(note_id)
+            if note is None:
+                continue
+            note['relevance_score'] = round(score, 4)
+            results.append(note)
         
-        return SemanticSearchResponse(
-            results=results,
-            query=request.query
-        )
+        return trusted_rows({"results": results, "query": request.query})
         
     except Exception as e:
         raise HTTPException(
@@ -159,30 +268,20 @@ async def generate_embedding(
     Requires authentication.
     """
     try:
-        supabase = get_supabase()
-        
         # Fetch note
-        response = supabase.table("notes")\
-            .select("*")\
-            .eq("id", note_id)\
-            .eq("user_id", user_id)\
-            .single()\
-            .execute()
-        
-        note = response.data
+        note = await notes_repo.get(note_id, user_id)
         if not note:
             raise HTTPException(status_code=404, detail="Note not found")
         
         # Generate embedding
-        text = f"{note['title']} {note['body']}"
+        text = note_text(note)
         embedding = await ai_service.generate_embedding(text)
         
         if embedding:
-            # Store embedding in database
-            supabase.table("notes")\
-                .update({"embedding": embedding})\
-                .eq("id", note_id)\
-                .execute()
+            # Store embedding (and the hash of its source text) in database
+            await notes_repo.update_embeddings(user_id, [
+                {"id": note_id, "embedding": embedding, "embedding_hash": content_hash(text)}
+            ])
             
             return {
                 "success": True,
@@ -204,56 +303,179 @@ async def generate_embedding(
             detail=f"Failed to generate embedding: {str(e)}"
         )
 
-@router.post("/batch-generate-embeddings")
+async def embed_user_notes(user_id: str, force: bool = False) -> dict:
+    """
+    Generate and store embeddings for all of a user's notes
+    
+    Notes are read one keyset page at a time, so accounts past the
+    database's row cap are covered and only one page is held in memory.
+    Notes whose text hash matches the stored embedding_hash are skipped
+    unless force is set. The rest are embedded and written in chunks of
+    ai_service.embedding_batch_size, with a bounded number of chunks in flight.
+    """
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(ai_service.embedding_concurrency)
+    
+    async def process(chunk) -> int:
+        async with semaphore:
+            try:
+                embeddings = await ai_service.generate_embeddings([text for _, text, _ in chunk])
+                return await notes_repo.update_embeddings(user_id, [
+                    {"id": note_id, "embedding": embedding, "embedding_hash": digest}
+                    for (note_id, _, digest), embedding in zip(chunk, embeddings)
+                ])
+            except Exception as e:
+                print(f"Failed to store embeddings for {len(chunk)} notes: {e}")
+                return 0
+    
+    total_notes = 0
+    pending_count = 0
+    success_count = 0
+    size = ai_service.embedding_batch_size
+    async for notes in notes_repo.pages(
+        user_id, is_archived=None, columns="id, title, body, embedding_hash"
+    ):
+        pending = []
+        for note in notes:
+            text = note_text(note)
+            digest = content_hash(text)
+            if force or note.get("embedding_hash") != digest:
+                pending.append((note["id"], text, digest))
+        
+        stored = await asyncio.gather(*[
+            process(pending[i:i + size]) for i in range(0, len(pending), size)
+        ])
+        total_notes += len(notes)
+        pending_count += len(pending)
+        success_count += sum(stored)
+    
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "success": True,
+        "total_notes": total_notes,
+        "success_count": success_count,
+        "skipped_count": total_notes - pending_count,
+        "failed_count": pending_count - success_count,
+        "elapsed_seconds": round(elapsed, 3),
+        "notes_per_second": round(pending_count / elapsed, 1) if elapsed > 0 else None
+    }
+
+@router.post(
+    "/batch-generate-embeddings",
+    dependencies=[Depends(batch_embeddings_limit), Depends(ai_concurrency_limit)]
+)
 async def batch_generate_embeddings(
+    force: bool = Query(False, description="Re-embed notes whose content has not changed"),
     user_id: str = Depends(get_current_user_id)
 ):
     """
     Generate embeddings for all user's notes
     
-    Requires authentication.
+    Requires authentication. For large collections prefer submitting a
+    "batch_embeddings" job via POST /ai/jobs.
     """
     try:
-        supabase = get_supabase()
-        
-        # Fetch all user's notes without embeddings
-        response = supabase.table("notes")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .execute()
-        
-        notes = response.data
+        return await embed_user_notes(user_id, force=force)
         
-        success_count = 0
-        failed_count = 0
-        
-        for note in notes:
-            try:
-                text = f"{note['title']} {note['body']}"
-                embedding = await ai_service.generate_embedding(text)
-                
-                if embedding:
-                    supabase.table("notes")\
-                        .update({"embedding": embedding})\
-                        .eq("id", note['id'])\
-                        .execute()
-                    success_count += 1
-                else:
-                    failed_count += 1
-                    
-            except Exception as e:
-                print(f"Failed to generate embedding for note {note['id']}: {e}")
-                failed_count += 1
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch embedding generation failed: {str(e)}"
+        )
+
+async def _run_generate_tags(request: JobSubmitRequest) -> dict:
+    tags = await ai_service.generate_tags(
+        title=request.title,
+        content=request.content,
+        max_tags=request.max_tags,
+        refresh=request.refresh
+    )
+    source = "ai" if ai_service.is_available() else "fallback"
+    return {"tags": tags, "source": source}
+
+async def _run_summarize(request: JobSubmitRequest) -> dict:
+    summary = await ai_service.summarize_note(
+        title=request.title,
+        content=request.content,
+        max_length=request.max_length,
+        refresh=request.refresh,
+        provider=request.provider
+    )
+    source = "ai" if ai_service.is_available() and (request.provider or ai_service.summary_provider) != "extractive" else "fallback"
+    return {"summary": summary, "source": source}
+
+@router.post(
+    "/jobs",
+    response_model=JobResponse,
+    status_code=202,
+    dependencies=[Depends(rate_limiter.limit(
+        "ai:jobs", settings.ai_rate_limit_per_minute, burst=settings.ai_rate_limit_burst
+    ))]
+)
+async def submit_job(
+    request: JobSubmitRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Queue AI work to run in the background and return its job id immediately
+    
+    "generate_tags" and "summarize" need title and content; "batch_embeddings"
+    embeds all of the user's notes. Poll GET /ai/jobs/{job_id} for the result.
+    Requires authentication.
+    """
+    try:
+        if request.type == "batch_embeddings":
+            # Same allowance as the synchronous batch endpoint
+            await batch_embeddings_limit(user_id)
+            job = job_queue.submit(user_id, request.type, lambda: embed_user_notes(user_id, force=request.force))
+        else:
+            if request.title is None or request.content is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="title and content are required for this job type"
+                )
+            run = _run_generate_tags if request.type == "generate_tags" else _run_summarize
+            job = job_queue.submit(user_id, request.type, lambda: run(request))
         
-        return {
-            "success": True,
-            "total_notes": len(notes),
-            "success_count": success_count,
-            "failed_count": failed_count
-        }
+        return job.to_dict()
         
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Batch embedding generation failed: {str(e)}"
+            detail=f"Failed to submit job: {str(e)}"
         )
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Get the status, and once finished the result, of a background AI job
+    
+    Requires authentication. Users can only see their own jobs.
+    """
+    job = job_queue.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(
+    job_id: str,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Cancel a pending or running background AI job
+    
+    Requires authentication. Users can only cancel their own jobs.
+    """
+    job = job_queue.cancel(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
@@ -6,15 +6,15 @@ from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import timedelta
 from core.auth import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     verify_token,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
-from core.middleware import get_current_user, get_current_user_id
-from db.supabase import get_supabase_client
+from core.middleware import get_current_user, get_current_user_id, invalidate_cached_user
+from db.repository import users_repo
 import uuid
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -93,12 +93,10 @@ async def signup(request: SignupRequest):
     
     Creates a new user with email and password, generates JWT tokens.
     """
-    supabase = get_supabase_client()
-    
     try:
         # Check if user already exists
-        existing = supabase.table("user_profiles").select("email").eq("email", request.email).execute()
-        if existing.data and len(existing.data) > 0:
+        existing = await users_repo.get_by_email(request.email, columns="email")
+        if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -106,7 +104,7 @@ async def signup(request: SignupRequest):
         
         # Generate user ID and hash password
         user_id = str(uuid.uuid4())
-        hashed_password = get_password_hash(request.password)
+        hashed_password = await get_password_hash_async(request.password)
         
         # Create user profile
         user_data = {
@@ -122,9 +120,9 @@ async def signup(request: SignupRequest):
         # For now, we're storing users in user_profiles table
         # This is a simplified version - Supabase Auth is recommended
         
-        response = supabase.table("user_profiles").insert(user_data).execute()
+        created = await users_repo.create(user_data)
         
-        if not response.data:
+        if not created:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create user"
@@ -163,22 +161,18 @@ async def login(request: LoginRequest):
     
     Validates email and password, returns access and refresh tokens.
     """
-    supabase = get_supabase_client()
-    
     try:
         # Get user by email
-        response = supabase.table("user_profiles").select("*").eq("email", request.email).execute()
+        user = await users_repo.get_by_email(request.email)
         
-        if not response.data or len(response.data) == 0:
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
         
-        user = response.data[0]
-        
         # Verify password
-        if not verify_password(request.password, user.get("password_hash", "")):
+        if not await verify_password_async(request.password, user.get("password_hash", "")):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
@@ -221,16 +215,15 @@ async def refresh_access_token(request: RefreshTokenRequest):
             )
         
         # Get user to include email in new token
-        supabase = get_supabase_client()
-        response = supabase.table("user_profiles").select("email").eq("id", user_id).execute()
+        user = await users_repo.get_by_id(user_id, columns="email")
         
-        if not response.data or len(response.data) == 0:
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
         
-        user_email = response.data[0]["email"]
+        user_email = user["email"]
         
         # Generate new tokens
         access_token = create_access_token(data={"sub": user_id, "email": user_email})
@@ -297,8 +290,6 @@ async def update_profile(
     
     Allows updating full_name. Email cannot be changed.
     """
-    supabase = get_supabase_client()
-    
     try:
         # Prepare update data
         update_data = {}
@@ -312,18 +303,15 @@ async def update_profile(
             )
         
         # Update profile
-        response = supabase.table("user_profiles").update(
-            update_data
-        ).eq("id", current_user["id"]).execute()
+        updated_user = await users_repo.update(current_user["id"], update_data)
+        invalidate_cached_user(current_user["id"])
         
-        if not response.data:
+        if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to update profile"
             )
         
-        updated_user = response.data[0]
-        
         return UserResponse(
             id=updated_user["id"],
             email=updated_user["email"],
@@ -352,25 +340,25 @@ async def change_password(
     
     Requires current password for verification.
     """
-    supabase = get_supabase_client()
-    
     try:
-        # Verify current password
-        if not verify_password(request.current_password, current_user.get("password_hash", "")):
+        # Verify current password against the stored hash (never cached)
+        stored = await users_repo.get_by_id(current_user["id"], columns="password_hash")
+        if not stored or not await verify_password_async(request.current_password, stored.get("password_hash") or ""):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Current password is incorrect"
             )
         
         # Hash new password
-        new_password_hash = get_password_hash(request.new_password)
+        new_password_hash = await get_password_hash_async(request.new_password)
         
         # Update password
-        response = supabase.table("user_profiles").update({
+        updated = await users_repo.update(current_user["id"], {
             "password_hash": new_password_hash
-        }).eq("id", current_user["id"]).execute()
+        })
+        invalidate_cached_user(current_user["id"])
         
-        if not response.data:
+        if not updated:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to update password"
@@ -394,18 +382,14 @@ async def forgot_password(request: ForgotPasswordRequest):
     
     Generates a password reset token and sends it via email.
     """
-    supabase = get_supabase_client()
-    
     try:
         # Check if user exists
-        response = supabase.table("user_profiles").select("id, email").eq("email", request.email).execute()
+        user = await users_repo.get_by_email(request.email, columns="id, email")
         
-        if not response.data or len(response.data) == 0:
+        if not user:
             # Don't reveal if email exists or not for security
             return MessageResponse(message="If that email exists, a password reset link has been sent")
         
-        user = response.data[0]
-        
         # Generate password reset token (valid for 1 hour)
         reset_token = create_access_token(
             data={"sub": user["id"], "email": user["email"], "type": "password_reset"},
@@ -437,8 +421,6 @@ async def reset_password(request: ResetPasswordRequest):
     
     Validates the reset token and updates the password.
     """
-    supabase = get_supabase_client()
-    
     try:
         # Verify reset token
         payload = verify_token(request.token)
@@ -458,14 +440,15 @@ async def reset_password(request: ResetPasswordRequest):
             )
         
         # Hash new password
-        new_password_hash = get_password_hash(request.new_password)
+        new_password_hash = await get_password_hash_async(request.new_password)
         
         # Update password
-        response = supabase.table("user_profiles").update({
+        updated = await users_repo.update(user_id, {
             "password_hash": new_password_hash
-        }).eq("id", user_id).execute()
+        })
+        invalidate_cached_user(user_id)
         
-        if not response.data:
+        if not updated:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to reset password"
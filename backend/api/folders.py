@@ -2,12 +2,16 @@
 Folders API endpoints for organizing notes.
 Handles folder CRUD operations with hierarchical support.
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
-from db.supabase import get_supabase
+from db.repository import folders_repo, notes_repo
+from services.folder_counts import folder_counts
+from api.notes import resolve_fields, columns_for, project_notes
+from core.conditional import conditional_json
 from core.middleware import get_current_user_id
+from core.pagination import decode_cursor, set_next_cursor
 
 router = APIRouter(prefix="/folders", tags=["Folders"])
 
@@ -53,21 +57,15 @@ class FolderWithNotes(FolderResponse):
 
 
 @router.get("/", response_model=List[FolderResponse])
-async def get_all_folders(user_id: str = Depends(get_current_user_id)):
+async def get_all_folders(request: Request, user_id: str = Depends(get_current_user_id)):
     """
     Get all folders for the authenticated user.
     Returns folders sorted by position.
+    Supports conditional requests (ETag / If-None-Match).
     """
     try:
-        supabase = get_supabase()
-        response = (
-            supabase.table("folders")
-            .select("*")
-            .eq("user_id", user_id)
-            .order("position")
-            .execute()
-        )
-        return response.data
+        folders = await folders_repo.list(user_id)
+        return conditional_json(request, folders, model=List[FolderResponse])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch folders: {str(e)}")
 
@@ -79,12 +77,8 @@ async def get_folder_hierarchy(user_id: str = Depends(get_current_user_id)):
     Returns folders in tree structure with levels.
     """
     try:
-        supabase = get_supabase()
-        
         # Call the SQL function
-        response = supabase.rpc("get_folder_hierarchy", {"p_user_id": user_id}).execute()
-        
-        return response.data
+        return await folders_repo.hierarchy(user_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch folder hierarchy: {str(e)}")
 
@@ -92,33 +86,19 @@ async def get_folder_hierarchy(user_id: str = Depends(get_current_user_id)):
 @router.get("/with-counts", response_model=List[FolderWithNotes])
 async def get_folders_with_counts(user_id: str = Depends(get_current_user_id)):
     """
-    Get all folders with note counts.
+    Get all folders with note counts (archived notes excluded).
     Useful for displaying folder statistics.
+    
+    Counts come from an incrementally maintained per-user counter, so this
+    costs one folders query regardless of how many folders there are.
     """
     try:
-        supabase = get_supabase()
-        
         # Get folders
-        folders_response = (
-            supabase.table("folders")
-            .select("*")
-            .eq("user_id", user_id)
-            .order("position")
-            .execute()
-        )
-        
-        folders = folders_response.data
+        folders = await folders_repo.list(user_id)
+        counts = await folder_counts.counts(user_id)
         
-        # Get note counts for each folder
         for folder in folders:
-            notes_response = (
-                supabase.table("notes")
-                .select("id", count="exact")
-                .eq("user_id", user_id)
-                .eq("folder_id", folder["id"])
-                .execute()
-            )
-            folder["note_count"] = notes_response.count or 0
+            folder["note_count"] = counts.get(folder["id"], 0)
         
         return folders
     except Exception as e:
@@ -131,19 +111,12 @@ async def get_folder(folder_id: str, user_id: str = Depends(get_current_user_id)
     Get a single folder by ID.
     """
     try:
-        supabase = get_supabase()
-        response = (
-            supabase.table("folders")
-            .select("*")
-            .eq("id", folder_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
+        folder = await folders_repo.get(folder_id, user_id)
         
-        if not response.data:
+        if not folder:
             raise HTTPException(status_code=404, detail="Folder not found")
         
-        return response.data[0]
+        return folder
     except HTTPException:
         raise
     except Exception as e:
@@ -156,7 +129,6 @@ async def create_folder(folder: FolderCreate, user_id: str = Depends(get_current
     Create a new folder for the authenticated user.
     """
     try:
-        supabase = get_supabase()
         current_time = datetime.utcnow().isoformat()
         
         folder_data = {
@@ -171,12 +143,12 @@ async def create_folder(folder: FolderCreate, user_id: str = Depends(get_current
             "updated_at": current_time
         }
         
-        response = supabase.table("folders").insert(folder_data).execute()
+        created = await folders_repo.create(folder_data)
         
-        if not response.data:
+        if not created:
             raise HTTPException(status_code=500, detail="Failed to create folder")
         
-        return response.data[0]
+        return created
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create folder: {str(e)}")
 
@@ -191,8 +163,6 @@ async def update_folder(
     Update an existing folder.
     """
     try:
-        supabase = get_supabase()
-        
         # Build update data
         update_data = {}
         if folder.name is not None:
@@ -213,18 +183,12 @@ async def update_folder(
         
         update_data["updated_at"] = datetime.utcnow().isoformat()
         
-        response = (
-            supabase.table("folders")
-            .update(update_data)
-            .eq("id", folder_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
+        updated = await folders_repo.update(folder_id, user_id, update_data)
         
-        if not response.data:
+        if not updated:
             raise HTTPException(status_code=404, detail="Folder not found")
         
-        return response.data[0]
+        return updated
     except HTTPException:
         raise
     except Exception as e:
@@ -238,19 +202,13 @@ async def delete_folder(folder_id: str, user_id: str = Depends(get_current_user_
     Notes in the folder will have their folder_id set to NULL.
     """
     try:
-        supabase = get_supabase()
-        
-        response = (
-            supabase.table("folders")
-            .delete()
-            .eq("id", folder_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
+        deleted = await folders_repo.delete(folder_id, user_id)
         
-        if not response.data:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Folder not found")
         
+        folder_counts.folder_deleted(user_id, folder_id)
+        
         return None
     except HTTPException:
         raise
@@ -259,23 +217,33 @@ async def delete_folder(folder_id: str, user_id: str = Depends(get_current_user_
 
 
 @router.get("/{folder_id}/notes")
-async def get_folder_notes(folder_id: str, user_id: str = Depends(get_current_user_id)):
+async def get_folder_notes(
+    folder_id: str,
+    response: Response,
+    user_id: str = Depends(get_current_user_id),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    view: str = Query("full", pattern="^(full|summary)$", description="'summary' returns a lightweight list view with a snippet instead of the body"),
+    fields: Optional[str] = Query(None, description="Comma-separated note fields to return (overrides view)"),
+):
     """
-    Get all notes in a specific folder.
+    Get notes in a specific folder, one page at a time.
+    Returns notes sorted by update date; the next page's cursor
+    is returned in the X-Next-Cursor header.
     """
+    after = decode_cursor(cursor, "updated_at")
+    selected = resolve_fields(view, fields, "updated_at")
     try:
-        supabase = get_supabase()
-        
-        response = (
-            supabase.table("notes")
-            .select("*")
-            .eq("user_id", user_id)
-            .eq("folder_id", folder_id)
-            .eq("is_archived", False)
-            .order("updated_at", desc=True)
-            .execute()
+        notes = await notes_repo.list(
+            user_id,
+            folder_id=folder_id,
+            is_archived=False,
+            order_by="updated_at",
+            after=after,
+            limit=limit,
+            columns=columns_for(selected),
         )
-        
-        return response.data
+        set_next_cursor(response, notes, limit, "updated_at")
+        return project_notes(notes, selected)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch folder notes: {str(e)}")
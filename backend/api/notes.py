@@ -2,12 +2,18 @@
 Notes API endpoints for CRUD operations.
 Handles all note-related database operations via Supabase with user authentication.
 """
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
-from db.supabase import get_supabase
+import re
+from db.repository import notes_repo, folders_repo, NOTE_COLUMNS
 from core.middleware import get_current_user_id, get_optional_current_user
+from core.conditional import conditional_json
+from core.pagination import decode_cursor, set_next_cursor
+from core.responses import trusted_rows
+from services.search_index import search_index, highlight_offsets
+from services.tag_index import tag_index
 
 router = APIRouter(prefix="/notes", tags=["Notes"])
 
@@ -31,6 +37,70 @@ class NoteUpdate(BaseModel):
     folder_id: Optional[str] = None
 
 
+class NoteFlagUpdate(BaseModel):
+    """Schema for explicitly setting a boolean note flag."""
+    value: bool
+
+
+# Maximum number of notes a single bulk request may touch
+BULK_MAX_ITEMS = 1000
+
+
+class BulkNoteCreate(BaseModel):
+    """Schema for creating several notes at once."""
+    notes: List[NoteCreate] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class BulkNoteFilter(BaseModel):
+    """Selects notes by attribute instead of by id."""
+    is_favorite: Optional[bool] = None
+    is_archived: Optional[bool] = None
+    folder_id: Optional[str] = None
+    tag: Optional[str] = None
+
+
+class BulkNoteUpdate(BaseModel):
+    """
+    Schema for updating many notes at once.
+    
+    Notes are selected by ``ids`` or by ``filter`` (exactly one of them).
+    ``tags`` replaces the tag list; ``add_tags``/``remove_tags`` edit it.
+    """
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=BULK_MAX_ITEMS)
+    filter: Optional[BulkNoteFilter] = None
+    is_favorite: Optional[bool] = None
+    is_archived: Optional[bool] = None
+    folder_id: Optional[str] = None
+    tags: Optional[List[str]] = None
+    add_tags: Optional[List[str]] = None
+    remove_tags: Optional[List[str]] = None
+
+
+class BulkNoteMove(BaseModel):
+    """Schema for moving notes to a folder (``folder_id: null`` removes them from any folder)."""
+    ids: List[str] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+    folder_id: Optional[str] = None
+
+
+class BulkNoteDelete(BaseModel):
+    """Schema for deleting several notes at once."""
+    ids: List[str] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class BulkItemResult(BaseModel):
+    """Outcome for one item of a bulk request."""
+    id: Optional[str] = None
+    index: Optional[int] = None
+    status: str
+
+
+class BulkResponse(BaseModel):
+    """Schema for bulk operation results."""
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
 class NoteResponse(BaseModel):
     """Schema for note response."""
     id: str
@@ -45,8 +115,147 @@ class NoteResponse(BaseModel):
     updated_at: str
 
 
-@router.get("/", response_model=List[NoteResponse])
+class NoteSearchResult(NoteResponse):
+    """Schema for a note returned from a search, with ranking information."""
+    score: Optional[float] = None
+    highlights: Optional[Dict[str, List[Tuple[int, int]]]] = None
+
+
+class NoteSummary(BaseModel):
+    """
+    Lightweight note schema for list views (``view=summary`` or ``fields=``).
+    Only the selected fields are included in the response.
+    """
+    id: str
+    user_id: Optional[str] = None
+    title: Optional[str] = None
+    body: Optional[str] = None
+    snippet: Optional[str] = None
+    is_favorite: Optional[bool] = None
+    is_archived: Optional[bool] = None
+    tags: Optional[List[str]] = None
+    folder_id: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    score: Optional[float] = None
+    highlights: Optional[Dict[str, List[Tuple[int, int]]]] = None
+
+
+# Cap on highlight offsets returned per field
+MAX_HIGHLIGHTS = 50
+
+# Fields returned by view=summary (everything the sidebar needs)
+SUMMARY_FIELDS = [
+    "id", "title", "snippet", "tags", "folder_id",
+    "is_favorite", "is_archived", "created_at", "updated_at",
+]
+SELECTABLE_FIELDS = set(NoteSummary.model_fields) - {"score", "highlights"}
+SNIPPET_LENGTH = 160
+
+_MARKDOWN_RE = re.compile(r"[#>*_`~\[\]()|-]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def make_snippet(body: Optional[str], length: int = SNIPPET_LENGTH) -> str:
+    """Plain-text preview of a markdown body, cut at a word boundary."""
+    if not body:
+        return ""
+    text = _WHITESPACE_RE.sub(" ", _MARKDOWN_RE.sub(" ", body[:length * 4])).strip()
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0] + "…"
+
+
+def resolve_fields(view: str, fields: Optional[str], order_by: str) -> Optional[List[str]]:
+    """
+    Work out which note fields a list request wants.
+    
+    Returns None for the full view. The sort column and id are always
+    included so pagination cursors can be built.
+    """
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in SELECTABLE_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+    elif view == "summary":
+        requested = list(SUMMARY_FIELDS)
+    else:
+        return None
+    
+    for required in ("id", order_by):
+        if required not in requested:
+            requested.append(required)
+    return requested
+
+
+def columns_for(selected: Optional[List[str]]) -> str:
+    """Database columns needed to produce the selected fields."""
+    if selected is None:
+        return NOTE_COLUMNS
+    columns = [field for field in selected if field != "snippet"]
+    if "snippet" in selected and "body" not in columns:
+        columns.append("body")
+    return ", ".join(columns)
+
+
+def project_notes(notes: List[dict], selected: Optional[List[str]]) -> List[dict]:
+    """Compute snippets and drop columns that were only fetched to build them."""
+    if selected is None:
+        return notes
+    keep = set(selected) | {"score", "highlights"}
+    for note in notes:
+        if "snippet" in keep:
+            note["snippet"] = make_snippet(note.get("body"))
+        for key in [key for key in note if key not in keep]:
+            del note[key]
+    return notes
+
+
+async def _ranked_search(
+    user_id: str,
+    query: str,
+    limit: int,
+    selected: Optional[List[str]] = None,
+    **filters
+) -> List[dict]:
+    """
+    Run a full-text search and return the matching notes in rank order,
+    annotated with their BM25 score and highlight offsets.
+    """
+    hits = await search_index.search(user_id, query, limit=limit, **filters)
+    # Title and body are always needed to compute highlight offsets
+    columns = columns_for(
+        None if selected is None else list(dict.fromkeys(selected + ["title", "body"]))
+    )
+    notes = await notes_repo.get_many([note_id for note_id, _ in hits], user_id, columns=columns)
+    notes_by_id = {note["id"]: note for note in notes}
+    
+    results = []
+    for note_id, score in hits:
+        note = notes_by_id.get(note_id)
+        if note is None:
+            continue
+        note["score"] = score
+        note["highlights"] = {
+            "title": highlight_offsets(query, note.get("title") or "")[:MAX_HIGHLIGHTS],
+            "body": highlight_offsets(query, note.get("body") or "")[:MAX_HIGHLIGHTS],
+        }
+        results.append(note)
+    return project_notes(results, selected)
+
+
+@router.get(
+    "/",
+    response_model=List[Union[NoteSearchResult, NoteSummary]],
+    response_model_exclude_unset=True,
+)
 async def get_all_notes(
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_current_user_id),
     search: Optional[str] = Query(None, description="Search query for title and body"),
     is_favorite: Optional[bool] = Query(None, description="Filter by favorite status"),
@@ -54,6 +263,9 @@ async def get_all_notes(
     date_from: Optional[str] = Query(None, description="Filter notes created after this date (ISO format)"),
     date_to: Optional[str] = Query(None, description="Filter notes created before this date (ISO format)"),
     limit: Optional[int] = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    view: str = Query("full", pattern="^(full|summary)$", description="'summary' returns a lightweight list view with a snippet instead of the body"),
+    fields: Optional[str] = Query(None, description="Comma-separated note fields to return (overrides view)"),
 ):
     """
     Fetch all notes for the authenticated user with advanced filtering.
@@ -63,148 +275,178 @@ async def get_all_notes(
     - Filter by favorite status
     - Filter by archived status
     - Filter by date range
-    - Pagination with limit
+    - Keyset pagination with limit and cursor
+    - Column projection with view=summary or fields=
     
-    Returns notes sorted by creation date (newest first).
+    Returns notes sorted by creation date (newest first), or by relevance
+    with highlight offsets when a search query is given (search results
+    are not paginated, so a cursor is rejected). When more notes are
+    available the cursor for the next page is returned in the
+    X-Next-Cursor header.
+    Listings carry an ETag; send it back in If-None-Match to get a 304
+    when nothing changed.
     Requires authentication.
     """
+    if search and cursor:
+        raise HTTPException(status_code=400, detail="Search results are not paginated; cursor can't be combined with search")
+    after = decode_cursor(cursor, "created_at")
+    selected = resolve_fields(view, fields, "created_at")
     try:
-        supabase = get_supabase()
-        
-        # Start with base query
-        query = supabase.table("notes").select("*").eq("user_id", user_id)
-        
-        # Apply filters
-        if is_favorite is not None:
-            query = query.eq("is_favorite", is_favorite)
-        
-        if is_archived is not None:
-            query = query.eq("is_archived", is_archived)
-        else:
-            # By default, don't show archived notes
-            query = query.eq("is_archived", False)
-        
-        if date_from:
-            query = query.gte("created_at", date_from)
-        
-        if date_to:
-            query = query.lte("created_at", date_to)
-        
-        # Apply search if provided
         if search:
-            # PostgreSQL full-text search using textSearch
-            # This searches in both title and body
-            query = query.or_(f"title.ilike.%{search}%,body.ilike.%{search}%")
-        
-        # Order and limit
-        query = query.order("created_at", desc=True).limit(limit)
-        
-        response = query.execute()
-        return response.data
+            return trusted_rows(await _ranked_search(
+                user_id,
+                search,
+                limit,
+                selected,
+                is_favorite=is_favorite,
+                # By default, don't show archived notes
+                is_archived=is_archived if is_archived is not None else False,
+                date_from=date_from,
+                date_to=date_to,
+            ))
+        
+        notes = await notes_repo.list(
+            user_id,
+            is_favorite=is_favorite,
+            # By default, don't show archived notes
+            is_archived=is_archived if is_archived is not None else False,
+            date_from=date_from,
+            date_to=date_to,
+            order_by="created_at",
+            after=after,
+            limit=limit,
+            columns=columns_for(selected),
+        )
+        set_next_cursor(response, notes, limit, "created_at")
+        return conditional_json(
+            request,
+            project_notes(notes, selected),
+            response,
+            model=List[Union[NoteSearchResult, NoteSummary]],
+            exclude_unset=True,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch notes: {str(e)}")
 
 
-@router.get("/search", response_model=List[NoteResponse])
+@router.get(
+    "/search",
+    response_model=List[Union[NoteSearchResult, NoteSummary]],
+    response_model_exclude_unset=True,
+)
 async def search_notes(
     query: str = Query(..., min_length=1, description="Search query"),
     user_id: str = Depends(get_current_user_id),
     limit: Optional[int] = Query(50, ge=1, le=100),
+    view: str = Query("full", pattern="^(full|summary)$", description="'summary' returns a lightweight list view with a snippet instead of the body"),
+    fields: Optional[str] = Query(None, description="Comma-separated note fields to return (overrides view)"),
 ):
     """
-    Advanced search endpoint with fuzzy matching.
+    Advanced search endpoint with prefix matching.
     
     Searches in:
-    - Note title
+    - Note title (boosted)
     - Note body
     
-    Returns results ranked by relevance.
+    Returns results ranked by BM25 relevance with highlight offsets.
     Requires authentication.
     """
+    selected = resolve_fields(view, fields, "updated_at")
     try:
-        supabase = get_supabase()
-        
-        # Use PostgreSQL's ILIKE for case-insensitive search
-        # Search in both title and body
-        response = (
-            supabase.table("notes")
-            .select("*")
-            .eq("user_id", user_id)
-            .eq("is_archived", False)
-            .or_(f"title.ilike.%{query}%,body.ilike.%{query}%")
-            .order("updated_at", desc=True)
-            .limit(limit)
-            .execute()
-        )
-        
-        return response.data
+        return trusted_rows(await _ranked_search(user_id, query, limit, selected, is_archived=False))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
-@router.get("/favorites", response_model=List[NoteResponse])
-async def get_favorite_notes(user_id: str = Depends(get_current_user_id)):
+@router.get(
+    "/favorites",
+    response_model=List[Union[NoteResponse, NoteSummary]],
+    response_model_exclude_unset=True,
+)
+async def get_favorite_notes(
+    response: Response,
+    user_id: str = Depends(get_current_user_id),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    view: str = Query("full", pattern="^(full|summary)$", description="'summary' returns a lightweight list view with a snippet instead of the body"),
+    fields: Optional[str] = Query(None, description="Comma-separated note fields to return (overrides view)"),
+):
     """
-    Get all favorite notes for the authenticated user.
+    Get favorite notes for the authenticated user, one page at a time.
     Returns notes sorted by update date (most recently updated first).
     
     Requires authentication.
     """
+    after = decode_cursor(cursor, "updated_at")
+    selected = resolve_fields(view, fields, "updated_at")
     try:
-        supabase = get_supabase()
-        response = (
-            supabase.table("notes")
-            .select("*")
-            .eq("user_id", user_id)
-            .eq("is_favorite", True)
-            .eq("is_archived", False)
-            .order("updated_at", desc=True)
-            .execute()
+        notes = await notes_repo.list(
+            user_id,
+            is_favorite=True,
+            is_archived=False,
+            order_by="updated_at",
+            after=after,
+            limit=limit,
+            columns=columns_for(selected),
         )
-        return response.data
+        set_next_cursor(response, notes, limit, "updated_at")
+        return trusted_rows(project_notes(notes, selected), response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch favorites: {str(e)}")
 
 
-@router.get("/archived", response_model=List[NoteResponse])
-async def get_archived_notes(user_id: str = Depends(get_current_user_id)):
+@router.get(
+    "/archived",
+    response_model=List[Union[NoteResponse, NoteSummary]],
+    response_model_exclude_unset=True,
+)
+async def get_archived_notes(
+    response: Response,
+    user_id: str = Depends(get_current_user_id),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    view: str = Query("full", pattern="^(full|summary)$", description="'summary' returns a lightweight list view with a snippet instead of the body"),
+    fields: Optional[str] = Query(None, description="Comma-separated note fields to return (overrides view)"),
+):
     """
-    Get all archived notes for the authenticated user.
+    Get archived notes for the authenticated user, one page at a time.
     Returns notes sorted by archive date (most recently archived first).
     
     Requires authentication.
     """
+    after = decode_cursor(cursor, "updated_at")
+    selected = resolve_fields(view, fields, "updated_at")
     try:
-        supabase = get_supabase()
-        response = (
-            supabase.table("notes")
-            .select("*")
-            .eq("user_id", user_id)
-            .eq("is_archived", True)
-            .order("updated_at", desc=True)
-            .execute()
+        notes = await notes_repo.list(
+            user_id,
+            is_archived=True,
+            order_by="updated_at",
+            after=after,
+            limit=limit,
+            columns=columns_for(selected),
         )
-        return response.data
+        set_next_cursor(response, notes, limit, "updated_at")
+        return trusted_rows(project_notes(notes, selected), response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch archived notes: {str(e)}")
 
 
 @router.get("/{note_id}", response_model=NoteResponse)
-async def get_note(note_id: str, user_id: str = Depends(get_current_user_id)):
+async def get_note(note_id: str, request: Request, user_id: str = Depends(get_current_user_id)):
     """
     Get a single note by ID.
+    Supports conditional requests (ETag / If-None-Match).
     
     Requires authentication. Users can only access their own notes.
     """
     try:
-        supabase = get_supabase()
         # Filter by both note_id and user_id for security
-        response = supabase.table("notes").select("*").eq("id", note_id).eq("user_id", user_id).execute()
+        note = await notes_repo.get(note_id, user_id)
         
-        if not response.data:
+        if not note:
             raise HTTPException(status_code=404, detail="Note not found")
         
-        return response.data[0]
+        return conditional_json(request, note, model=NoteResponse)
     except HTTPException:
         raise
     except Exception as e:
@@ -219,7 +461,6 @@ async def create_note(note: NoteCreate, user_id: str = Depends(get_current_user_
     Requires authentication.
     """
     try:
-        supabase = get_supabase()
         current_time = datetime.utcnow().isoformat()
         
         note_data = {
@@ -234,12 +475,12 @@ async def create_note(note: NoteCreate, user_id: str = Depends(get_current_user_
             "updated_at": current_time
         }
         
-        response = supabase.table("notes").insert(note_data).execute()
+        created = await notes_repo.create(note_data)
         
-        if not response.data:
+        if not created:
             raise HTTPException(status_code=500, detail="Failed to create note")
         
-        return response.data[0]
+        return created
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create note: {str(e)}")
 
@@ -252,8 +493,6 @@ async def update_note(note_id: str, note: NoteUpdate, user_id: str = Depends(get
     Requires authentication. Users can only update their own notes.
     """
     try:
-        supabase = get_supabase()
-        
         # Build update data (only include provided fields)
         update_data = {}
         if note.title is not None:
@@ -275,12 +514,12 @@ async def update_note(note_id: str, note: NoteUpdate, user_id: str = Depends(get
         update_data["updated_at"] = datetime.utcnow().isoformat()
         
         # Filter by both note_id and user_id for security
-        response = supabase.table("notes").update(update_data).eq("id", note_id).eq("user_id", user_id).execute()
+        updated = await notes_repo.update(note_id, user_id, update_data)
         
-        if not response.data:
+        if not updated:
             raise HTTPException(status_code=404, detail="Note not found or you don't have permission to update it")
         
-        return response.data[0]
+        return updated
     except HTTPException:
         raise
     except Exception as e:
@@ -292,35 +531,48 @@ async def toggle_favorite(note_id: str, user_id: str = Depends(get_current_user_
     """
     Toggle the favorite status of a note.
     
-    Requires authentication. Users can only toggle their own notes.
+    The flip happens atomically on the database, so concurrent toggles
+    are never lost. Requires authentication. Users can only toggle their own notes.
     """
     try:
-        supabase = get_supabase()
+        updated = await notes_repo.toggle_flag(note_id, user_id, "is_favorite")
         
-        # Get current note
-        note_response = supabase.table("notes").select("is_favorite").eq("id", note_id).eq("user_id", user_id).execute()
-        
-        if not note_response.data:
+        if not updated:
             raise HTTPException(status_code=404, detail="Note not found")
         
-        current_favorite = note_response.data[0].get("is_favorite", False)
-        
-        # Toggle favorite status
-        update_data = {
-            "is_favorite": not current_favorite,
+        return updated
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to toggle favorite: {str(e)}")
+
+
+@router.put("/{note_id}/favorite", response_model=NoteResponse)
+async def set_favorite(
+    note_id: str,
+    request: NoteFlagUpdate,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Set the favorite status of a note to an explicit value.
+    
+    Idempotent, so retries and concurrent clients converge on the same state.
+    Requires authentication. Users can only update their own notes.
+    """
+    try:
+        updated = await notes_repo.update(note_id, user_id, {
+            "is_favorite": request.value,
             "updated_at": datetime.utcnow().isoformat()
-        }
+        })
         
-        response = supabase.table("notes").update(update_data).eq("id", note_id).eq("user_id", user_id).execute()
-        
-        if not response.data:
-            raise HTTPException(status_code=404, detail="Failed to update favorite status")
+        if not updated:
+            raise HTTPException(status_code=404, detail="Note not found")
         
-        return response.data[0]
+        return updated
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to toggle favorite: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to set favorite: {str(e)}")
 
 
 @router.patch("/{note_id}/archive", response_model=NoteResponse)
@@ -328,35 +580,48 @@ async def toggle_archive(note_id: str, user_id: str = Depends(get_current_user_i
     """
     Toggle the archive status of a note.
     
-    Requires authentication. Users can only toggle their own notes.
+    The flip happens atomically on the database, so concurrent toggles
+    are never lost. Requires authentication. Users can only toggle their own notes.
     """
     try:
-        supabase = get_supabase()
+        updated = await notes_repo.toggle_flag(note_id, user_id, "is_archived")
         
-        # Get current note
-        note_response = supabase.table("notes").select("is_archived").eq("id", note_id).eq("user_id", user_id).execute()
-        
-        if not note_response.data:
+        if not updated:
             raise HTTPException(status_code=404, detail="Note not found")
         
-        current_archived = note_response.data[0].get("is_archived", False)
-        
-        # Toggle archive status
-        update_data = {
-            "is_archived": not current_archived,
+        return updated
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to toggle archive: {str(e)}")
+
+
+@router.put("/{note_id}/archive", response_model=NoteResponse)
+async def set_archive(
+    note_id: str,
+    request: NoteFlagUpdate,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Set the archive status of a note to an explicit value.
+    
+    Idempotent, so retries and concurrent clients converge on the same state.
+    Requires authentication. Users can only update their own notes.
+    """
+    try:
+        updated = await notes_repo.update(note_id, user_id, {
+            "is_archived": request.value,
             "updated_at": datetime.utcnow().isoformat()
-        }
+        })
         
-        response = supabase.table("notes").update(update_data).eq("id", note_id).eq("user_id", user_id).execute()
-        
-        if not response.data:
-            raise HTTPException(status_code=404, detail="Failed to update archive status")
+        if not updated:
+            raise HTTPException(status_code=404, detail="Note not found")
         
-        return response.data[0]
+        return updated
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to toggle archive: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to set archive status: {str(e)}")
 
 
 @router.delete("/{note_id}", status_code=204)
@@ -368,11 +633,10 @@ async def delete_note(note_id: str, user_id: str = Depends(get_current_user_id))
     Tags are automatically deleted via CASCADE constraint.
     """
     try:
-        supabase = get_supabase()
         # Filter by both note_id and user_id for security
-        response = supabase.table("notes").delete().eq("id", note_id).eq("user_id", user_id).execute()
+        deleted = await notes_repo.delete(note_id, user_id)
         
-        if not response.data:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Note not found or you don't have permission to delete it")
         
         return None
@@ -382,37 +646,204 @@ async def delete_note(note_id: str, user_id: str = Depends(get_current_user_id))
         raise HTTPException(status_code=500, detail=f"Failed to delete note: {str(e)}")
 
 
-@router.get("/tags/all")
-async def get_all_tags(user_id: str = Depends(get_current_user_id)):
+def bulk_results(requested_ids: List[str], rows: List[dict], success_status: str) -> dict:
+    """Per-id results for a bulk request; ids without a matching row are reported as not_found."""
+    done = {row["id"] for row in rows}
+    results = [
+        {"id": note_id, "status": success_status if note_id in done else "not_found"}
+        for note_id in dict.fromkeys(requested_ids)
+    ]
+    succeeded = sum(1 for result in results if result["status"] == success_status)
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+
+@router.post("/bulk", response_model=BulkResponse, status_code=201)
+async def bulk_create_notes(request: BulkNoteCreate, user_id: str = Depends(get_current_user_id)):
     """
-    Get all unique tags used by the authenticated user with usage counts.
-    Useful for tag filtering and autocomplete.
+    Create several notes with a single insert.
+    
+    Results are reported per input item, in input order. Requires authentication.
     """
     try:
-        supabase = get_supabase()
-        
-        # Get all notes with tags
-        response = (
-            supabase.table("notes")
-            .select("tags")
-            .eq("user_id", user_id)
-            .execute()
-        )
+        current_time = datetime.utcnow().isoformat()
         
-        # Count tag occurrences
-        tag_counts = {}
-        for note in response.data:
-            if note.get("tags"):
-                for tag in note["tags"]:
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        # Convert to list of objects sorted by count
-        tags_list = [
-            {"tag": tag, "count": count}
-            for tag, count in sorted(tag_counts.items(), key=lambda x: (-x[1], x[0]))
+        notes_data = [
+            {
+                "user_id": user_id,
+                "title": note.title,
+                "body": note.body,
+                "is_favorite": False,
+                "is_archived": False,
+                "tags": note.tags if note.tags else [],
+                "folder_id": note.folder_id,
+                "created_at": current_time,
+                "updated_at": current_time
+            }
+            for note in request.notes
         ]
         
-        return tags_list
+        created = await notes_repo.create_many(notes_data)
+        
+        if len(created) != len(notes_data):
+            raise HTTPException(status_code=500, detail="Failed to create notes")
+        
+        return {
+            "succeeded": len(created),
+            "failed": 0,
+            "results": [
+                {"id": note["id"], "index": index, "status": "created"}
+                for index, note in enumerate(created)
+            ]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create notes: {str(e)}")
+
+
+@router.patch("/bulk", response_model=BulkResponse)
+async def bulk_update_notes(request: BulkNoteUpdate, user_id: str = Depends(get_current_user_id)):
+    """
+    Update many notes at once, selected by id list or by filter.
+    
+    Matching notes are resolved once, then updated with one UPDATE per chunk
+    of ids. With ``add_tags``/``remove_tags`` the other fields are applied by
+    the same tag-edit call, so each note is written once.
+    Requires authentication. Users can only update their own notes, and only
+    move them into their own folders.
+    """
+    try:
+        if (request.ids is None) == (request.filter is None):
+            raise HTTPException(status_code=400, detail="Provide exactly one of 'ids' or 'filter'")
+        if request.tags is not None and (request.add_tags or request.remove_tags):
+            raise HTTPException(status_code=400, detail="Use either 'tags' or 'add_tags'/'remove_tags', not both")
+        
+        update_data = {}
+        if request.is_favorite is not None:
+            update_data["is_favorite"] = request.is_favorite
+        if request.is_archived is not None:
+            update_data["is_archived"] = request.is_archived
+        if request.folder_id is not None:
+            update_data["folder_id"] = request.folder_id
+        if request.tags is not None:
+            update_data["tags"] = request.tags
+        edit_tags = bool(request.add_tags or request.remove_tags)
+        
+        if not update_data and not edit_tags:
+            raise HTTPException(status_code=400, detail="No fields to update")
+        
+        if request.folder_id is not None:
+            folder = await folders_repo.get(request.folder_id, user_id)
+            if not folder:
+                raise HTTPException(status_code=404, detail="Folder not found")
+        
+        if request.ids is not None:
+            note_ids = list(dict.fromkeys(request.ids))
+        else:
+            criteria = request.filter.model_dump(exclude_none=True)
+            if not criteria:
+                raise HTTPException(status_code=400, detail="Filter must have at least one criterion")
+            # A single read stops at PostgREST's row cap, so follow keyset
+            # pages until every match is seen or the limit is exceeded
+            note_ids = []
+            async for page in notes_repo.pages(
+                user_id,
+                is_archived=criteria.pop("is_archived", None),
+                columns="id",
+                **criteria
+            ):
+                note_ids.extend(note["id"] for note in page)
+                if len(note_ids) > BULK_MAX_ITEMS:
+                    raise HTTPException(
+                        status_code=422,
+                        detail=f"Filter matches more than {BULK_MAX_ITEMS} notes"
+                    )
+        
+        if edit_tags:
+            # 'tags' was rejected above, so update_data holds only plain fields
+            rows = await notes_repo.update_tags_many(
+                user_id, note_ids, add=request.add_tags, remove=request.remove_tags,
+                fields=update_data
+            )
+        else:
+            update_data["updated_at"] = datetime.utcnow().isoformat()
+            rows = await notes_repo.update_many(user_id, note_ids, update_data)
+        
+        return bulk_results(note_ids, rows, "updated")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update notes: {str(e)}")
+
+
+@router.post("/bulk/move", response_model=BulkResponse)
+async def bulk_move_notes(request: BulkNoteMove, user_id: str = Depends(get_current_user_id)):
+    """
+    Move several notes into a folder, or out of any folder with ``folder_id: null``.
+    
+    Requires authentication. Users can only move their own notes into their own folders.
+    """
+    try:
+        if request.folder_id is not None:
+            folder = await folders_repo.get(request.folder_id, user_id)
+            if not folder:
+                raise HTTPException(status_code=404, detail="Folder not found")
+        
+        rows = await notes_repo.update_many(user_id, list(dict.fromkeys(request.ids)), {
+            "folder_id": request.folder_id,
+            "updated_at": datetime.utcnow().isoformat()
+        })
+        
+        return bulk_results(request.ids, rows, "updated")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to move notes: {str(e)}")
+
+
+@router.post("/bulk/delete", response_model=BulkResponse)
+async def bulk_delete_notes(request: BulkNoteDelete, user_id: str = Depends(get_current_user_id)):
+    """
+    Delete several notes at once.
+    
+    Requires authentication. Users can only delete their own notes.
+    """
+    try:
+        rows = await notes_repo.delete_many(user_id, list(dict.fromkeys(request.ids)))
+        
+        return bulk_results(request.ids, rows, "deleted")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to delete notes: {str(e)}")
+
+
+@router.get("/tags/all")
+async def get_all_tags(user_id: str = Depends(get_current_user_id)):
+    """
+    Get all unique tags used by the authenticated user with usage counts.
+    Useful for tag filtering.
+    
+    Served from an incrementally maintained per-user tag index.
+    """
+    try:
+        return await tag_index.all_tags(user_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch tags: {str(e)}")
 
+
+@router.get("/tags/autocomplete")
+async def autocomplete_tags(
+    prefix: str = Query("", max_length=100, description="Tag prefix (case-insensitive)"),
+    limit: int = Query(10, ge=1, le=50),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Suggest the user's most used tags starting with a prefix.
+    Intended to be called on every keystroke in the tag input.
+    """
+    try:
+        return await tag_index.autocomplete(user_id, prefix, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to autocomplete tags: {str(e)}")
+
@@ -0,0 +1,156 @@
+"""
+AI provider calls against a local stub provider.
+
+Starts an Ollama-compatible stub (HTTPS with a throwaway self-signed
+certificate, or plain HTTP with ``--no-tls``) and times
+``ai_service._ollama_generate_tags`` calls to it, sequentially and
+concurrently. Without a shared client every call pays for a new TCP
+connection and TLS handshake.
+
+    python benchmarks/ai_http_client.py [--calls 200] [--concurrency 10] [--no-tls]
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from common import print_latencies
+
+
+async def stub_app(scope, receive, send):
+    """Minimal Ollama /api/generate endpoint."""
+    if scope["type"] != "http":
+        return
+    while (await receive()).get("more_body"):
+        pass
+    body = b'{"model": "stub", "response": "alpha, beta, gamma", "done": true}'
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def self_signed_certificate(directory: str):
+    """Write a localhost certificate and key; return their paths."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+    import ipaddress
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+
+def start_stub(port: int, tls_files) -> None:
+    import uvicorn
+
+    options = {}
+    if tls_files:
+        options = {"ssl_certfile": tls_files[0], "ssl_keyfile": tls_files[1]}
+    config = uvicorn.Config(stub_app, host="127.0.0.1", port=port, log_level="error", **options)
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(args) -> None:
+    from services.ai_service import ai_service
+
+    async def call() -> float:
+        started = time.perf_counter()
+        tags = await ai_service._ollama_generate_tags("Weekly sync", "Roadmap and hiring plan", 3)
+        assert tags == ["alpha", "beta", "gamma"], tags
+        return time.perf_counter() - started
+
+    if hasattr(ai_service, "startup"):
+        await ai_service.startup()
+    try:
+        # Warm-up: lets a shared client open its pool of connections
+        await asyncio.gather(*(call() for _ in range(args.concurrency)))
+        sequential = [await call() for _ in range(args.calls)]
+
+        concurrent = []
+        remaining = args.calls
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                concurrent.append(await call())
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        if hasattr(ai_service, "shutdown"):
+            await ai_service.shutdown()
+
+    scheme = "https" if not args.no_tls else "http"
+    print(f"{args.calls} calls per run to a local {scheme} stub")
+    print_latencies("sequential", sequential)
+    print_latencies(f"{args.concurrency} concurrent", concurrent)
+    print(f"concurrent throughput: {args.calls / elapsed:.0f} calls/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--no-tls", action="store_true")
+    args = parser.parse_args()
+
+    port = free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        tls_files = None if args.no_tls else self_signed_certificate(directory)
+        if tls_files:
+            # httpx reads the trust store location from the environment
+            os.environ["SSL_CERT_FILE"] = tls_files[0]
+        scheme = "http" if args.no_tls else "https"
+        os.environ["OLLAMA_BASE_URL"] = f"{scheme}://127.0.0.1:{port}"
+        # Keep provider health probes and hedging out of the measurement
+        os.environ.setdefault("AI_HEALTH_PROBE_INTERVAL", "3600")
+        start_stub(port, tls_files)
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
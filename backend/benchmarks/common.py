@@ -0,0 +1,87 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run in-process and need no Supabase project: the app is driven
+over ASGI by httpx, and the database is the in-memory fake from
+tests/fakes.py with a simulated network round trip on every query. The
+fake blocks for that round trip the way the synchronous supabase-py client
+does, so code that calls it on the event loop stalls like it would in
+production.
+
+Scripts only use entry points that exist in every version of the app
+(``db.supabase.SupabaseClient``, the routers, ``ai_service``), so the same
+script can be run against an older checkout to get "before" numbers.
+"""
+import os
+import sys
+import time
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from tests.fakes import FakeSupabase, Query, Rpc  # noqa: E402
+
+
+class SlowQuery(Query):
+    def execute(self):
+        time.sleep(self.client.latency)
+        return super().execute()
+
+
+class SlowRpc(Rpc):
+    def execute(self):
+        time.sleep(self.client.latency)
+        return super().execute()
+
+
+class LatencySupabase(FakeSupabase):
+    """In-memory Supabase client that takes ``latency_ms`` per query."""
+
+    def __init__(self, latency_ms: float = 10.0, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency_ms / 1000.0
+
+    def table(self, name: str) -> SlowQuery:
+        return SlowQuery(self, name).select()
+
+    def rpc(self, name: str, params: dict) -> SlowRpc:
+        return SlowRpc(self, name, params)
+
+
+def install(client: FakeSupabase) -> None:
+    """Make every ``get_supabase()`` call return ``client``."""
+    from db.supabase import SupabaseClient
+    SupabaseClient._instance = client
+
+
+def asgi_client(app):
+    """An httpx client that calls ``app`` in-process on the current event loop."""
+    import httpx
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of latencies given in seconds, in milliseconds."""
+    return {
+        "p50": percentile(samples, 50) * 1000,
+        "p95": percentile(samples, 95) * 1000,
+        "p99": percentile(samples, 99) * 1000,
+        "max": max(samples) * 1000 if samples else 0.0,
+    }
+
+
+def print_latencies(label: str, samples: List[float]) -> None:
+    summary = latency_summary(samples)
+    print(
+        f"{label:<28} n={len(samples):<6} "
+        + "  ".join(f"{name}={value:8.1f} ms" for name, value in summary.items())
+    )
@@ -0,0 +1,97 @@
+"""
+Concurrent load on the notes API with a slow database.
+
+Many clients list their notes at once while a probe keeps requesting the
+database-free root endpoint. With ``DB_LATENCY_MS`` of simulated round trip
+per query, an event loop that blocks on database calls serializes every
+request behind the database, which shows up in the tail latency of both.
+
+    python benchmarks/db_load.py [--latency-ms 10] [--concurrency 50] [--requests 500]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from common import LatencySupabase, asgi_client, install, print_latencies
+from tests.fakes import make_note
+
+
+def seed(client: LatencySupabase, users: int, notes_per_user: int) -> list:
+    tokens = []
+    from core.auth import create_access_token
+
+    for _ in range(users):
+        user_id = str(uuid.uuid4())
+        client.tables.setdefault("user_profiles", []).append({
+            "id": user_id,
+            "email": f"{user_id}@example.com",
+            "full_name": "Bench User",
+            "password_hash": "x",
+            "created_at": "2025-01-01T00:00:00+00:00",
+            "updated_at": "2025-01-01T00:00:00+00:00",
+        })
+        client.tables.setdefault("notes", []).extend(
+            make_note(user_id, i) for i in range(notes_per_user)
+        )
+        tokens.append(create_access_token({"sub": user_id, "email": f"{user_id}@example.com"}))
+    return tokens
+
+
+async def run(args) -> None:
+    client = LatencySupabase(latency_ms=args.latency_ms)
+    install(client)
+    tokens = seed(client, args.users, args.notes_per_user)
+
+    from main import app
+
+    note_latencies = []
+    probe_latencies = []
+    remaining = args.requests
+    done = asyncio.Event()
+
+    async with asgi_client(app) as http:
+        async def worker(index: int) -> None:
+            nonlocal remaining
+            headers = {"Authorization": f"Bearer {tokens[index % len(tokens)]}"}
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                response = await http.get("/notes/", params={"limit": 20}, headers=headers)
+                note_latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        async def probe() -> None:
+            while not done.is_set():
+                started = time.perf_counter()
+                await http.get("/")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    print(
+        f"{args.requests} x GET /notes, {args.concurrency} concurrent, "
+        f"{args.latency_ms:g} ms per query: {args.requests / elapsed:.1f} req/s"
+    )
+    print_latencies("GET /notes", note_latencies)
+    print_latencies("GET / (probe, no DB)", probe_latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--notes-per-user", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
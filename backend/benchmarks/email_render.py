@@ -0,0 +1,40 @@
+"""
+Per-message cost of building transactional email.
+
+Times rendering the compiled password-reset and welcome templates, and
+rendering plus building and flattening the MIME message that is handed to
+SMTP. No mail is sent.
+
+    python benchmarks/email_render.py [--runs 5000]
+"""
+import argparse
+import timeit
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from core.email_service import email_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5000)
+    args = parser.parse_args()
+
+    token = "x" * 200
+    cases = {
+        "password reset, template render": lambda: email_service.password_reset_template.render(
+            "user@example.com", token=token
+        ),
+        "password reset, MIME build + flatten": lambda: email_service.password_reset_template.render(
+            "user@example.com", token=token
+        ).as_mime().as_bytes(),
+        "welcome, template render": lambda: email_service.welcome_template.render(
+            "user@example.com", name="Ada Lovelace"
+        ),
+    }
+    for label, build in cases.items():
+        seconds = min(timeit.repeat(build, number=args.runs, repeat=3))
+        print(f"{label}: {seconds / args.runs * 1e6:.1f} us/message")
+
+
+if __name__ == "__main__":
+    main()
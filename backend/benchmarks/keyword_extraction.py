@@ -0,0 +1,81 @@
+"""
+Fallback tag generation on large notes.
+
+Times ``ai_service._fallback_generate_tags`` (the path taken when no AI
+provider answers) on synthetic notes of increasing length, and the cost of
+importing ``services.ai_service`` in a fresh interpreter, which is paid by
+every worker at startup.
+
+    python benchmarks/keyword_extraction.py [--sizes 500,5000,50000] [--repeat 5]
+"""
+import argparse
+import random
+import subprocess
+import sys
+import time
+
+from common import BACKEND_DIR, print_latencies
+
+TOPICS = [
+    "database migration", "release schedule", "customer onboarding",
+    "quarterly budget", "incident review", "search latency", "design system",
+]
+FILLER = (
+    "the team agreed that we should revisit this after the next sprint and "
+    "keep an eye on how it affects the rest of the roadmap for now"
+).split()
+
+
+def synthetic_text(words: int, seed: int = 11) -> str:
+    """Sentences of filler words mixed with a few recurring topic phrases"""
+    rng = random.Random(seed)
+    sentences = []
+    count = 0
+    while count < words:
+        length = rng.randint(8, 24)
+        sentence = rng.sample(FILLER, min(length, len(FILLER)))
+        sentence.insert(rng.randrange(len(sentence)), rng.choice(TOPICS))
+        sentences.append(" ".join(sentence).capitalize() + rng.choice([".", ".", "!", "?"]))
+        count += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def import_seconds() -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "import services.ai_service"],
+        cwd=BACKEND_DIR, check=True, capture_output=True,
+    )
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="500,5000,50000", help="note lengths in words")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print_latencies("import services.ai_service", [import_seconds() for _ in range(3)])
+
+    from services.ai_service import ai_service
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        content = synthetic_text(size)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            try:
+                tags = ai_service._fallback_generate_tags("Quarterly budget review", content, 5)
+            except Exception as e:
+                # The TextBlob extractor needs NLTK corpora that may not be installed
+                if type(e).__name__ != "MissingCorpusError":
+                    raise
+                print("TextBlob corpora missing; run python -m textblob.download_corpora")
+                return
+            timings.append(time.perf_counter() - started)
+        print_latencies(f"{size} words", timings)
+        print(f"  tags: {tags}")
+
+
+if __name__ == "__main__":
+    main()
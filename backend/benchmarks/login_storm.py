@@ -0,0 +1,95 @@
+"""
+Login storm: bcrypt verification under concurrent logins.
+
+Fires a burst of concurrent ``POST /auth/login`` requests (each one a bcrypt
+verification) while other clients keep listing their notes and a probe
+keeps requesting the root endpoint. Reports login throughput and the
+latency the non-auth requests see during the storm.
+
+    python benchmarks/login_storm.py [--logins 24] [--concurrency 12]
+"""
+import argparse
+import asyncio
+import time
+
+from common import LatencySupabase, asgi_client, install, print_latencies
+from db_load import seed
+
+PASSWORD = "correct horse battery staple"
+
+
+async def run(args) -> None:
+    from core.auth import get_password_hash
+
+    client = LatencySupabase(latency_ms=args.latency_ms)
+    install(client)
+    tokens = seed(client, users=4, notes_per_user=50)
+    password_hash = get_password_hash(PASSWORD)
+    for profile in client.tables["user_profiles"]:
+        profile["password_hash"] = password_hash
+    emails = [profile["email"] for profile in client.tables["user_profiles"]]
+
+    from main import app
+
+    login_latencies = []
+    note_latencies = []
+    probe_latencies = []
+    remaining = args.logins
+    storm_over = asyncio.Event()
+
+    async with asgi_client(app) as http:
+        async def login(index: int) -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                response = await http.post(
+                    "/auth/login", json={"email": emails[index % len(emails)], "password": PASSWORD}
+                )
+                login_latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        async def list_notes(index: int) -> None:
+            headers = {"Authorization": f"Bearer {tokens[index % len(tokens)]}"}
+            while not storm_over.is_set():
+                started = time.perf_counter()
+                response = await http.get("/notes/", params={"limit": 20}, headers=headers)
+                note_latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+                await asyncio.sleep(0.02)
+
+        async def probe() -> None:
+            while not storm_over.is_set():
+                started = time.perf_counter()
+                await http.get("/")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.02)
+
+        background = [asyncio.create_task(list_notes(i)) for i in range(4)]
+        background.append(asyncio.create_task(probe()))
+        await asyncio.sleep(0.2)
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        storm_over.set()
+        await asyncio.gather(*background)
+
+    print(
+        f"{args.logins} logins, {args.concurrency} concurrent: "
+        f"{args.logins / elapsed:.2f} logins/s over {elapsed:.1f} s"
+    )
+    print_latencies("POST /auth/login", login_latencies)
+    print_latencies("GET /notes during storm", note_latencies)
+    print_latencies("GET / during storm", probe_latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Full-text search over a large synthetic note collection.
+
+Builds the BM25 inverted index over ``--notes`` synthetic notes (Zipf-like
+word frequencies) and times queries of several shapes. As a reference it
+also times a case-insensitive substring scan of every title and body,
+which is what the former ``title.ilike.%q%,body.ilike.%q%`` filter did per
+row (in Python here, so slower per row than PostgreSQL, but just as linear
+in the number of notes).
+
+    python benchmarks/search_index.py [--notes 100000] [--repeat 20]
+"""
+import argparse
+import random
+import resource
+import time
+
+from common import print_latencies
+from services.search_index import FullTextIndex
+
+QUERIES = {
+    "rare term": "quokka",
+    "common term": "project",
+    "two terms": "budget review",
+    "prefix": "infra",
+    "no match": "zyzzyva",
+}
+
+
+def synthetic_notes(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    syllables = ["ka", "lo", "mi", "ne", "ru", "sa", "te", "vo", "zi", "pa", "do", "fe"]
+    vocabulary = [
+        "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(20000)
+    ]
+    vocabulary[:8] = ["project", "budget", "review", "meeting", "infrastructure", "infra", "plan", "team"]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+
+    notes = []
+    for i in range(count):
+        title = " ".join(rng.choices(vocabulary, weights, k=5))
+        body = " ".join(rng.choices(vocabulary, weights, k=80))
+        if i % 5000 == 0:
+            body += " quokka"
+        notes.append({
+            "id": f"note-{i}",
+            "title": title,
+            "body": body,
+            "is_archived": False,
+            "is_favorite": False,
+            "created_at": "2025-01-01T00:00:00+00:00",
+        })
+    return notes
+
+
+def substring_scan(notes: list, query: str) -> list:
+    needle = query.lower()
+    return [
+        note["id"] for note in notes
+        if needle in note["title"].lower() or needle in note["body"].lower()
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    notes = synthetic_notes(args.notes)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    index = FullTextIndex.from_notes(notes)
+    build_seconds = time.perf_counter() - started
+    rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+
+    # ru_maxrss is in KiB on Linux
+    print(f"{args.notes} notes: index built in {build_seconds:.1f} s, peak RSS +{rss_growth / 1024:.0f} MiB")
+    for label, query in QUERIES.items():
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            hits = index.search(query, limit=50)
+            timings.append(time.perf_counter() - started)
+        print_latencies(f"bm25 {label} ({len(hits)} hits)", timings)
+
+    for label in ("rare term", "common term"):
+        timings = []
+        for _ in range(max(1, args.repeat // 5)):
+            started = time.perf_counter()
+            matches = substring_scan(notes, QUERIES[label])
+            timings.append(time.perf_counter() - started)
+        print_latencies(f"scan {label} ({len(matches)} rows)", timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Fallback summarization on large notes.
+
+Times ``ai_service._fallback_summarize`` (the summary returned when no AI
+provider answers) on synthetic notes of up to 50,000 words, awaiting it
+on an event loop when it is a coroutine.
+
+    python benchmarks/summarizer.py [--sizes 1000,10000,50000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import inspect
+import time
+
+from common import print_latencies
+from keyword_extraction import synthetic_text
+
+
+async def run(args) -> None:
+    from services.ai_service import ai_service
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        content = synthetic_text(size)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            summary = ai_service._fallback_summarize("Quarterly budget review", content, args.max_length)
+            if inspect.isawaitable(summary):
+                summary = await summary
+            timings.append(time.perf_counter() - started)
+        print_latencies(f"{size} words", timings)
+        print(f"  summary: {len(summary.split())} words")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,50000", help="note lengths in words")
+    parser.add_argument("--max-length", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
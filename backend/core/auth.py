@@ -1,8 +1,10 @@
 """
 Authentication utilities for JWT token handling and password hashing.
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
@@ -11,6 +13,9 @@ import os
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Max concurrent bcrypt operations (each one burns ~100-300 ms of CPU)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
 # JWT settings
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
@@ -63,6 +68,77 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(truncated)
 
 
+class PasswordHashPool:
+    """
+    Bounded worker pool for bcrypt hashing and verification.
+    
+    bcrypt releases the GIL, so running it on a small dedicated thread pool
+    keeps the event loop responsive during login/signup storms. A semaphore
+    caps concurrency; callers beyond the limit wait in line and are counted
+    in ``waiting`` so the queue depth can be monitored.
+    """
+    
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="bcrypt",
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.peak_waiting = 0
+    
+    async def run(self, func: Callable, *args):
+        """Run ``func(*args)`` on the pool once a slot is free."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._semaphore.release()
+    
+    def stats(self) -> dict:
+        """Return pool size and queue-depth counters."""
+        return {
+            "max_workers": self.max_workers,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "peak_waiting": self.peak_waiting,
+        }
+    
+    def shutdown(self) -> None:
+        """Shut down the worker threads (called on app shutdown)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hash_pool = PasswordHashPool(PASSWORD_HASH_WORKERS)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt worker pool without blocking the event loop."""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the bcrypt worker pool without blocking the event loop."""
+    return await password_hash_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -0,0 +1,121 @@
+"""
+In-process caching utilities.
+
+Provides a small TTL + LRU cache used to avoid repeated database round-trips
+for hot, rarely-changing data such as authenticated user profiles, and to
+avoid repeating expensive AI provider calls.
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries also expire after a fixed TTL.
+
+    Not thread-safe: intended to be used from the event loop only.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 60.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key`` or None if missing/expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return the unexpired value for ``key`` without counting or reordering it."""
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting the oldest entry if full."""
+        if self.max_size <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove ``key`` from the cache if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        self._data.clear()
+
+    def save(self, path: str) -> int:
+        """
+        Write unexpired entries to a JSON file and return how many were written.
+
+        Keys must be strings and values JSON-serialisable. The file is
+        replaced atomically so a crash never leaves a truncated cache.
+        """
+        now = time.monotonic()
+        entries = [
+            [key, expires_at - now, value]
+            for key, (expires_at, value) in self._data.items()
+            if expires_at > now
+        ]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "entries": entries}, f)
+        os.replace(tmp_path, path)
+        return len(entries)
+
+    def load(self, path: str) -> int:
+        """
+        Load entries written by :meth:`save` and return how many are still fresh.
+
+        Time spent on disk counts against each entry's remaining TTL.
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        elapsed = max(0.0, time.time() - data.get("saved_at", 0))
+        loaded = 0
+        for key, remaining, value in data.get("entries", []):
+            remaining = min(remaining, self.ttl_seconds) - elapsed
+            if remaining <= 0:
+                continue
+            self.set(key, value)
+            self._data[key] = (time.monotonic() + remaining, value)
+            loaded += 1
+        return loaded
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,143 @@
+"""
+Response compression.
+
+Compresses complete responses above a size threshold with brotli (when the
+``brotli`` package is installed and the client accepts it) or gzip. Large
+note listings are mostly repetitive JSON and shrink several-fold.
+
+Streaming responses (Server-Sent Events) are passed through untouched so
+tokens keep arriving as they are produced.
+
+A compressed response is a different representation, so a strong ETag gets
+the encoding appended (``"abc"`` becomes ``"abc-br"``); the conditional GET
+helpers strip it again when comparing.
+"""
+import gzip
+from typing import List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Media types worth compressing
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+# Supported encodings, and the ETag suffixes they add
+ENCODINGS = ("br", "gzip")
+ENCODING_SUFFIXES = tuple(f'-{encoding}"' for encoding in ENCODINGS)
+
+
+def parse_accept_encoding(value: str) -> List[str]:
+    """Encodings a client accepts (q > 0), in header order."""
+    accepted = []
+    for item in value.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, number = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.append(coding)
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Compresses single-body HTTP responses of at least ``minimum_size`` bytes.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 5,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Best encoding this server supports for an Accept-Encoding header."""
+        accepted = parse_accept_encoding(accept_encoding)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                    or content_type.startswith("text/event-stream")
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Wait for the body to decide
+                    start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streamed or small: send as is
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = self.compress(encoding, body)
+            headers = MutableHeaders(raw=list(start["headers"]))
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and etag.endswith('"') and not etag.startswith("W/"):
+                headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+            start["headers"] = headers.raw
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,135 @@
+"""
+Conditional GET support for polled read endpoints.
+
+Responses carry a strong ``ETag`` (a hash of the exact JSON body) and a
+``Last-Modified`` date from the newest ``updated_at``. A request whose
+``If-None-Match`` lists the current ETag gets an empty ``304 Not Modified``,
+so an unchanged poll costs one serialization pass for the hash and skips
+response encoding, compression and transfer. The body is built once and
+reused when it does need to be sent.
+
+The ETag hashes content rather than deriving from ``updated_at``. The API's
+own writes do bump ``updated_at``, but a listing can change without its
+newest timestamp changing: a deleted note, or one moved or archived out of
+a filtered page, leaves the remaining rows as they were. Deleting a folder
+also clears ``folder_id`` on its notes through ``ON DELETE SET NULL``
+without touching ``updated_at``, and the same rows serialize differently
+per ``view``/``fields``. ``If-Modified-Since`` is therefore not used to
+validate.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, Iterable, Optional
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from core.compression import ENCODING_SUFFIXES
+from core.config import settings
+from core.responses import orjson
+
+# Validators for response models, built on first use
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize like the app's default response class."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches ``etag``.
+
+    Uses weak comparison, as RFC 9110 specifies for If-None-Match, and
+    ignores the suffix added when the matching response was compressed.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        for suffix in ENCODING_SUFFIXES:
+            if tag.endswith(suffix):
+                tag = tag[:-len(suffix)] + '"'
+                break
+        if tag == etag:
+            return True
+    return False
+
+
+def last_modified(rows: Iterable[dict]) -> Optional[str]:
+    """HTTP date of the newest ``updated_at`` among ``rows``, if any."""
+    newest = None
+    for row in rows:
+        value = row.get("updated_at")
+        if not value:
+            continue
+        try:
+            stamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except (TypeError, ValueError):
+            continue
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        if newest is None or stamp > newest:
+            newest = stamp
+    if newest is None:
+        return None
+    return format_datetime(newest.astimezone(timezone.utc), usegmt=True)
+
+
+def conditional_json(
+    request: Request,
+    content: Any,
+    response: Optional[Response] = None,
+    model: Any = None,
+    exclude_unset: bool = False,
+) -> Response:
+    """
+    Build a JSON response with ETag/Last-Modified, or a 304 if the client is current.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        content: Row or rows to send
+        response: The route's injected Response, whose headers
+            (e.g. pagination cursors) are carried over
+        model: Response model the content is validated against, unless
+            DB rows are trusted (``TRUST_DB_ROWS``)
+        exclude_unset: Mirror of the route's ``response_model_exclude_unset``
+
+    Returns:
+        A 200 JSON response or an empty 304
+    """
+    if model is not None and not settings.trust_db_rows:
+        adapter = _adapters.get(model)
+        if adapter is None:
+            adapter = _adapters[model] = TypeAdapter(model)
+        content = adapter.dump_python(
+            adapter.validate_python(content), mode="json", exclude_unset=exclude_unset
+        )
+
+    body = dump_json(content)
+    headers = dict(response.headers) if response is not None else {}
+    etag = make_etag(body)
+    headers["ETag"] = etag
+    # Per-user data: caches may keep it but must revalidate every time
+    headers["Cache-Control"] = "private, no-cache"
+    modified = last_modified(content if isinstance(content, list) else [content])
+    if modified:
+        headers["Last-Modified"] = modified
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
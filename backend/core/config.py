@@ -18,6 +18,40 @@ class Settings(BaseModel):
     supabase_key: str = os.getenv("SUPABASE_KEY", "")  # Anon key for frontend
     supabase_service_key: str = os.getenv("SUPABASE_SERVICE_KEY", "")  # Service key for backend
     
+    # Database access (blocking Supabase calls run on a bounded thread pool)
+    db_max_workers: int = int(os.getenv("DB_MAX_WORKERS", "16"))
+    # Rows per page when reading a user's whole notes table; must not exceed
+    # PostgREST's max-rows (1000 on Supabase) or paging stops early
+    db_page_size: int = int(os.getenv("DB_PAGE_SIZE", "1000"))
+    # Users whose in-memory note indexes (search, tags, folder counts,
+    # semantic vectors) each worker keeps, least recently used first out
+    index_max_users: int = int(os.getenv("INDEX_MAX_USERS", "1000"))
+    # Seconds before each per-user index is rebuilt from the database
+    search_index_ttl_seconds: float = float(os.getenv("SEARCH_INDEX_TTL_SECONDS", "600"))
+    tag_index_ttl_seconds: float = float(os.getenv("TAG_INDEX_TTL_SECONDS", "600"))
+    folder_counts_ttl_seconds: float = float(os.getenv("FOLDER_COUNTS_TTL_SECONDS", "600"))
+    semantic_index_ttl_seconds: float = float(os.getenv("SEMANTIC_INDEX_TTL_SECONDS", "600"))
+    # Send note listings without re-validating DB rows against the response model
+    trust_db_rows: bool = os.getenv("TRUST_DB_ROWS", "false").lower() == "true"
+    
+    # Authenticated user cache
+    user_cache_ttl_seconds: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    user_cache_max_size: int = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
+    # Trust the JWT "sub" claim for routes that only need the user ID
+    # (skips the profile lookup; deleted users keep access until token expiry)
+    trust_jwt_claims: bool = os.getenv("TRUST_JWT_CLAIMS", "false").lower() == "true"
+    
+    # Response compression (brotli when installed, otherwise gzip)
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))
+    compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    
+    # AI endpoint rate limits, per user and endpoint (0 disables a limit)
+    ai_rate_limit_per_minute: float = float(os.getenv("AI_RATE_LIMIT_PER_MINUTE", "20"))
+    ai_rate_limit_burst: int = int(os.getenv("AI_RATE_LIMIT_BURST", "10"))
+    ai_batch_rate_limit_per_minute: float = float(os.getenv("AI_BATCH_RATE_LIMIT_PER_MINUTE", "2"))
+    ai_max_concurrent_per_user: int = int(os.getenv("AI_MAX_CONCURRENT_PER_USER", "3"))
+    
     # CORS Configuration
     frontend_url: str = os.getenv("FRONTEND_URL", "http://localhost:5173")
     
@@ -1,12 +1,32 @@
 """
 Email service for sending transactional emails
 Supports SMTP and can be extended for services like SendGrid, Mailgun, etc.
+
+Messages are queued and delivered by a background dispatcher that reuses one
+SMTP session across messages, sends in batches, retries transient failures
+with exponential backoff, and moves messages that keep failing to a
+dead-letter store. Request handlers only pay for building the message.
+
+Templates are compiled once when the service is created: static text is
+dedented, encoded and wrapped in precomputed MIME headers, so rendering a
+message only escapes the per-recipient fields and joins byte strings.
 """
 
+import asyncio
+import html
+import json
+import random
+import re
 import smtplib
+import textwrap
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.header import Header
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from email.utils import formataddr
+from typing import Deque, Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
@@ -17,13 +37,590 @@ SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SMTP_USER = os.getenv("SMTP_USER", "")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+# Close the pooled SMTP session after this many idle seconds
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
 FROM_EMAIL = os.getenv("FROM_EMAIL", SMTP_USER)
 FROM_NAME = os.getenv("FROM_NAME", "NexusMind")
 
+# Background delivery
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "2"))
+EMAIL_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", "300"))
+# Optional JSON-lines file recording messages that could not be delivered
+EMAIL_DEAD_LETTER_PATH = os.getenv("EMAIL_DEAD_LETTER_PATH") or None
+
 # Frontend URL for links
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
 
+# $name placeholders in template bodies
+_FIELD_RE = re.compile(r"\$(\w+)")
+
+
+class RenderedEmail:
+    """A message rendered to wire format, plus what delivery needs to know about it"""
+    
+    __slots__ = ("to_email", "subject", "sender", "from_email", "text_body", "html_body", "raw")
+    
+    def __init__(
+        self,
+        to_email: str,
+        subject: str,
+        sender: str,
+        from_email: str,
+        text_body: bytes,
+        html_body: bytes,
+        raw: bytes
+    ):
+        self.to_email = to_email
+        self.subject = subject
+        self.sender = sender
+        self.from_email = from_email
+        self.text_body = text_body
+        self.html_body = html_body
+        self.raw = raw
+    
+    def as_mime(self) -> MIMEMultipart:
+        """The same message with base64 bodies, for servers without 8BITMIME"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = self.subject
+        msg['From'] = self.sender
+        msg['To'] = self.to_email
+        msg.attach(MIMEText(self.text_body.decode("utf-8").replace("\r\n", "\n"), 'plain'))
+        msg.attach(MIMEText(self.html_body.decode("utf-8").replace("\r\n", "\n"), 'html'))
+        return msg
+
+
+class EmailTemplate:
+    """
+    A multipart/alternative email compiled once
+    
+    Bodies use $name placeholders. Values passed as static_fields are baked in
+    at compile time; the rest are per-recipient and must be given to render().
+    Field values are HTML-escaped in the HTML part and kept on one line.
+    """
+    
+    def __init__(
+        self,
+        subject: str,
+        html_body: str,
+        text_body: str,
+        from_email: str,
+        from_name: str,
+        **static_fields: str
+    ):
+        self.subject = subject
+        self.from_email = from_email
+        self.sender = formataddr((from_name, from_email), charset="utf-8")
+        self._boundary = f"=============={random.getrandbits(64):016x}=="
+        self._text = self._compile(text_body, static_fields, escape=False)
+        self._html = self._compile(html_body, static_fields, escape=True)
+        self.fields = frozenset(self._text[1]) | frozenset(self._html[1])
+        
+        encoded_subject = subject if subject.isascii() else Header(subject, "utf-8").encode()
+        part_headers = 'Content-Type: text/{}; charset="utf-8"\r\nContent-Transfer-Encoding: 8bit\r\n\r\n'
+        self._before_to = f"From: {self.sender}\r\nTo: ".encode()
+        self._before_text = (
+            f"\r\nSubject: {encoded_subject}\r\n"
+            "MIME-Version: 1.0\r\n"
+            f'Content-Type: multipart/alternative; boundary="{self._boundary}"\r\n\r\n'
+            f"--{self._boundary}\r\n" + part_headers.format("plain")
+        ).encode()
+        self._before_html = (f"\r\n--{self._boundary}\r\n" + part_headers.format("html")).encode()
+        self._end = f"\r\n--{self._boundary}--\r\n".encode()
+    
+    @staticmethod
+    def _compile(source: str, static_fields: Dict[str, str], escape: bool):
+        """Split a body into encoded static chunks and the field names between them"""
+        pieces = _FIELD_RE.split(textwrap.dedent(source).strip("\n").replace("\n", "\r\n"))
+        chunks, names = [pieces[0]], []
+        for name, static in zip(pieces[1::2], pieces[2::2]):
+            if name in static_fields:
+                value = static_fields[name]
+                chunks[-1] += html.escape(value) if escape else value
+                chunks[-1] += static
+            else:
+                names.append(name)
+                chunks.append(static)
+        return [chunk.encode("utf-8") for chunk in chunks], names
+    
+    def _value(self, value: str, escape: bool) -> bytes:
+        value = " ".join(str(value).splitlines())
+        if self._boundary in value:
+            raise ValueError("Template field contains the MIME boundary")
+        return (html.escape(value) if escape else value).encode("utf-8")
+    
+    def _render_body(self, compiled, values: Dict[str, bytes]) -> bytes:
+        chunks, names = compiled
+        out = [chunks[0]]
+        for name, chunk in zip(names, chunks[1:]):
+            out.append(values[name])
+            out.append(chunk)
+        return b"".join(out)
+    
+    def render(self, to_email: str, **fields: str) -> RenderedEmail:
+        """Fill in the per-recipient fields and return the message ready to send"""
+        if "\r" in to_email or "\n" in to_email:
+            raise ValueError("Invalid recipient address")
+        text_body = self._render_body(self._text, {k: self._value(v, False) for k, v in fields.items()})
+        html_body = self._render_body(self._html, {k: self._value(v, True) for k, v in fields.items()})
+        raw = b"".join((
+            self._before_to, to_email.encode("utf-8"), self._before_text,
+            text_body, self._before_html, html_body, self._end
+        ))
+        return RenderedEmail(to_email, self.subject, self.sender, self.from_email, text_body, html_body, raw)
+
+
+class SMTPConnection:
+    """
+    A reusable SMTP session
+    Connects (and authenticates) lazily, reconnects when the server has dropped
+    the session, and closes it after SMTP_IDLE_TIMEOUT idle seconds.
+    Blocking; used from a single worker thread.
+    """
+    
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str = "",
+        password: str = "",
+        starttls: bool = True,
+        timeout: float = 30.0,
+        idle_timeout: float = 60.0
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.connections_opened = 0
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+    
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.starttls:
+                server.starttls()
+                server.ehlo()
+            if self.user and self.password:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.connections_opened += 1
+        return server
+    
+    @staticmethod
+    def _transmit(server: smtplib.SMTP, email: RenderedEmail) -> None:
+        if server.has_extn("8bitmime"):
+            server.sendmail(email.from_email, [email.to_email], email.raw, mail_options=["BODY=8BITMIME"])
+        else:
+            server.send_message(email.as_mime())
+    
+    def send(self, email: RenderedEmail) -> None:
+        """Send one message, reconnecting once if the pooled session has gone away"""
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+        
+        if self._server is None:
+            self._server = self._connect()
+            fresh = True
+        else:
+            fresh = False
+        
+        try:
+            self._transmit(self._server, email)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.close()
+            if fresh:
+                raise
+            self._server = self._connect()
+            self._transmit(self._server, email)
+        self._last_used = time.monotonic()
+    
+    def close(self) -> None:
+        """End the session (QUIT), ignoring errors from an already dead connection"""
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            try:
+                self._server.close()
+            except Exception:
+                pass
+        self._server = None
+
+
+class QueuedEmail:
+    """An outgoing message and its delivery state"""
+    
+    def __init__(self, email: RenderedEmail):
+        self.email = email
+        self.to_email = email.to_email
+        self.subject = email.subject
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+        self.queued_at = time.time()
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx replies and refused recipients won't succeed on retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+class EmailDispatcher:
+    """
+    Background email delivery over a pooled SMTP connection
+    """
+    
+    def __init__(
+        self,
+        connection: SMTPConnection,
+        batch_size: int = 20,
+        max_attempts: int = 5,
+        retry_base: float = 2.0,
+        retry_max: float = 300.0,
+        dead_letter_path: Optional[str] = None,
+        max_dead_letters: int = 1000
+    ):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.dead_letter_path = dead_letter_path
+        # Most recent undeliverable messages, kept for inspection/redelivery
+        self.dead_letters: Deque[QueuedEmail] = deque(maxlen=max_dead_letters)
+        self.sent = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        # smtplib is blocking and one session can't be shared between threads
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._retry_handles: Dict[asyncio.TimerHandle, QueuedEmail] = {}
+    
+    @property
+    def running(self) -> bool:
+        return self._worker_task is not None
+    
+    async def start(self) -> None:
+        """Start the delivery worker (called from the app lifespan)"""
+        if self._worker_task is None:
+            self._queue = asyncio.Queue()
+            self._worker_task = asyncio.create_task(self._worker(), name="email-dispatcher")
+    
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Deliver what is queued (within timeout), dead-letter the rest, close the session"""
+        if self._worker_task is None:
+            return
+        
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._worker_task.cancel()
+        await asyncio.gather(self._worker_task, return_exceptions=True)
+        self._worker_task = None
+        
+        # Messages waiting for a retry or still queued are not silently lost
+        for handle, item in list(self._retry_handles.items()):
+            handle.cancel()
+            self._dead_letter(item, "not delivered before shutdown")
+        self._retry_handles.clear()
+        while not self._queue.empty():
+            self._dead_letter(self._queue.get_nowait(), "not delivered before shutdown")
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.connection.close)
+        self._executor.shutdown(wait=False)
+    
+    def enqueue(self, email: RenderedEmail) -> None:
+        """Queue a message for delivery"""
+        self._queue.put_nowait(QueuedEmail(email))
+    
+    def redeliver_dead_letters(self) -> int:
+        """Queue every dead-lettered message again and return how many were queued"""
+        count = 0
+        while self.dead_letters:
+            item = self.dead_letters.popleft()
+            item.attempts = 0
+            self._queue.put_nowait(item)
+            count += 1
+        return count
+    
+    def stats(self) -> dict:
+        """Delivery counters for health reporting"""
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "awaiting_retry": len(self._retry_handles),
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "smtp_connections_opened": self.connection.connections_opened,
+        }
+    
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            try:
+                errors = await loop.run_in_executor(self._executor, self._send_batch, batch)
+                for item, error in zip(batch, errors):
+                    if error is None:
+                        self.sent += 1
+                        print(f"Email sent successfully to {item.to_email}")
+                    else:
+                        self._failed(item, error)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _send_batch(self, batch: List[QueuedEmail]) -> List[Optional[Exception]]:
+        """Send a batch over the pooled session (runs on the SMTP thread)"""
+        errors: List[Optional[Exception]] = []
+        for item in batch:
+            try:
+                self.connection.send(item.email)
+                errors.append(None)
+            except Exception as e:
+                # Start the next message on a fresh session
+                self.connection.close()
+                errors.append(e)
+        return errors
+    
+    def _failed(self, item: QueuedEmail, error: Exception) -> None:
+        item.attempts += 1
+        item.last_error = str(error)
+        if _is_permanent(error) or item.attempts >= self.max_attempts:
+            self._dead_letter(item, str(error))
+            return
+        
+        delay = min(self.retry_max, self.retry_base * 2 ** (item.attempts - 1))
+        delay *= random.uniform(0.8, 1.2)
+        print(f"Failed to send email to {item.to_email} (attempt {item.attempts}): {error}; retrying in {delay:.0f}s")
+        self.retried += 1
+        
+        def requeue():
+            del self._retry_handles[handle]
+            self._queue.put_nowait(item)
+        
+        handle = asyncio.get_running_loop().call_later(delay, requeue)
+        self._retry_handles[handle] = item
+    
+    def _dead_letter(self, item: QueuedEmail, reason: str) -> None:
+        item.last_error = reason
+        self.dead_letters.append(item)
+        self.dead_lettered += 1
+        print(f"Failed to send email to {item.to_email} after {item.attempts} attempt(s): {reason}")
+        
+        if self.dead_letter_path:
+            # Metadata only: bodies can contain password reset tokens
+            record = {
+                "to": item.to_email,
+                "subject": item.subject,
+                "attempts": item.attempts,
+                "error": reason,
+                "queued_at": item.queued_at,
+                "failed_at": time.time(),
+            }
+            try:
+                with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            except Exception as e:
+                print(f"Failed to write email dead letter: {e}")
+
+
+# Template sources; $frontend_url is filled in at compile time
+PASSWORD_RESET_SUBJECT = "Reset Your NexusMind Password"
+
+PASSWORD_RESET_HTML = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                max-width: 600px;
+                margin: 0 auto;
+                padding: 20px;
+            }
+            .container {
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                border-radius: 10px;
+                padding: 40px;
+                color: white;
+            }
+            .content {
+                background: white;
+                border-radius: 8px;
+                padding: 30px;
+                margin-top: 20px;
+                color: #333;
+            }
+            .button {
+                display: inline-block;
+                padding: 12px 30px;
+                background: #667eea;
+                color: white;
+                text-decoration: none;
+                border-radius: 5px;
+                margin: 20px 0;
+                font-weight: bold;
+            }
+            .footer {
+                margin-top: 30px;
+                font-size: 12px;
+                color: #999;
+                text-align: center;
+            }
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1 style="margin: 0;">🔐 NexusMind</h1>
+            <p style="margin: 5px 0 0 0; opacity: 0.9;">AI-Powered Note Taking</p>
+        </div>
+
+        <div class="content">
+            <h2>Reset Your Password</h2>
+            <p>Hi there,</p>
+            <p>We received a request to reset your password for your NexusMind account. Click the button below to create a new password:</p>
+
+            <div style="text-align: center;">
+                <a href="$frontend_url/reset-password?token=$token" class="button">Reset Password</a>
+            </div>
+
+            <p>Or copy and paste this link into your browser:</p>
+            <p style="background: #f5f5f5; padding: 10px; border-radius: 5px; word-break: break-all;">
+                $frontend_url/reset-password?token=$token
+            </p>
+
+            <p><strong>This link will expire in 1 hour.</strong></p>
+
+            <p>If you didn't request a password reset, you can safely ignore this email. Your password will remain unchanged.</p>
+
+            <p>Best regards,<br>The NexusMind Team</p>
+        </div>
+
+        <div class="footer">
+            <p>This is an automated email. Please do not reply to this message.</p>
+            <p>&copy; 2025 NexusMind. All rights reserved.</p>
+        </div>
+    </body>
+    </html>
+"""
+
+PASSWORD_RESET_TEXT = """
+    Reset Your NexusMind Password
+
+    Hi there,
+
+    We received a request to reset your password for your NexusMind account.
+
+    Click the link below to create a new password:
+    $frontend_url/reset-password?token=$token
+
+    This link will expire in 1 hour.
+
+    If you didn't request a password reset, you can safely ignore this email.
+
+    Best regards,
+    The NexusMind Team
+"""
+
+WELCOME_SUBJECT = "Welcome to NexusMind! 🎉"
+
+WELCOME_HTML = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                max-width: 600px;
+                margin: 0 auto;
+                padding: 20px;
+            }
+            .container {
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                border-radius: 10px;
+                padding: 40px;
+                color: white;
+            }
+            .content {
+                background: white;
+                border-radius: 8px;
+                padding: 30px;
+                margin-top: 20px;
+                color: #333;
+            }
+            .feature {
+                margin: 15px 0;
+                padding-left: 25px;
+            }
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1 style="margin: 0;">✨ Welcome to NexusMind!</h1>
+        </div>
+
+        <div class="content">
+            <p>Hi $name,</p>
+            <p>Thank you for joining NexusMind! We're excited to help you organize your thoughts and boost your productivity with AI-powered note-taking.</p>
+
+            <h3>🚀 Get Started:</h3>
+            <div class="feature">📝 Create your first note</div>
+            <div class="feature">🏷️ Use AI to generate tags automatically</div>
+            <div class="feature">🔍 Search and organize your notes effortlessly</div>
+            <div class="feature">📊 Visualize connections with the graph view</div>
+
+            <p>If you have any questions or need help, feel free to reach out to our support team.</p>
+
+            <p>Happy note-taking!<br>The NexusMind Team</p>
+        </div>
+    </body>
+    </html>
+"""
+
+WELCOME_TEXT = """
+    Welcome to NexusMind!
+
+    Hi $name,
+
+    Thank you for joining NexusMind! We're excited to help you organize your thoughts and boost your productivity with AI-powered note-taking.
+
+    Get Started:
+    - Create your first note
+    - Use AI to generate tags automatically
+    - Search and organize your notes effortlessly
+    - Visualize connections with the graph view
+
+    Happy note-taking!
+    The NexusMind Team
+"""
+
+
 class EmailService:
     """Service for sending emails via SMTP"""
     
@@ -34,54 +631,81 @@ class EmailService:
         self.smtp_password = SMTP_PASSWORD
         self.from_email = FROM_EMAIL
         self.from_name = FROM_NAME
+        # Without a server to talk to, report failure so callers can fall back
+        self.configured = bool(os.getenv("SMTP_HOST") or SMTP_USER)
+        self.password_reset_template = self._compile(
+            PASSWORD_RESET_SUBJECT, PASSWORD_RESET_HTML, PASSWORD_RESET_TEXT
+        )
+        self.welcome_template = self._compile(WELCOME_SUBJECT, WELCOME_HTML, WELCOME_TEXT)
+        self.dispatcher = EmailDispatcher(
+            self._connection(),
+            batch_size=EMAIL_BATCH_SIZE,
+            max_attempts=EMAIL_MAX_ATTEMPTS,
+            retry_base=EMAIL_RETRY_BASE_SECONDS,
+            retry_max=EMAIL_RETRY_MAX_SECONDS,
+            dead_letter_path=EMAIL_DEAD_LETTER_PATH,
+        )
     
-    def _send_email(
-        self,
-        to_email: str,
-        subject: str,
-        html_body: str,
-        text_body: Optional[str] = None
-    ) -> bool:
+    def _compile(self, subject: str, html_body: str, text_body: str) -> EmailTemplate:
+        return EmailTemplate(
+            subject,
+            html_body,
+            text_body,
+            self.from_email,
+            self.from_name,
+            frontend_url=FRONTEND_URL,
+        )
+    
+    def _connection(self) -> SMTPConnection:
+        return SMTPConnection(
+            self.smtp_host,
+            self.smtp_port,
+            self.smtp_user,
+            self.smtp_password,
+            starttls=SMTP_STARTTLS,
+            timeout=SMTP_TIMEOUT,
+            idle_timeout=SMTP_IDLE_TIMEOUT,
+        )
+    
+    async def startup(self) -> None:
+        """Start background delivery (called from the app lifespan)"""
+        await self.dispatcher.start()
+    
+    async def shutdown(self) -> None:
+        """Flush queued mail and close the SMTP session"""
+        await self.dispatcher.stop()
+    
+    def _send_email(self, email: RenderedEmail) -> bool:
         """
-        Send an email using SMTP
+        Queue an email for background delivery
+        
+        Falls back to sending immediately (blocking) when the dispatcher isn't
+        running, e.g. in scripts outside the app lifespan.
         
         Args:
-            to_email: Recipient email address
-            subject: Email subject
-            html_body: HTML version of email body
-            text_body: Plain text version of email body (optional)
+            email: Rendered message
         
         Returns:
-            True if email sent successfully, False otherwise
+            True if email was queued or sent, False otherwise
         """
+        if not self.configured:
+            print(f"SMTP is not configured, not sending email to {email.to_email}")
+            return False
+        
+        if self.dispatcher.running:
+            self.dispatcher.enqueue(email)
+            return True
+        
+        connection = self._connection()
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = to_email
-            
-            # Add text and HTML parts
-            if text_body:
-                part1 = MIMEText(text_body, 'plain')
-                msg.attach(part1)
-            
-            part2 = MIMEText(html_body, 'html')
-            msg.attach(part2)
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                if self.smtp_user and self.smtp_password:
-                    server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-            
-            print(f"Email sent successfully to {to_email}")
+            connection.send(email)
+            print(f"Email sent successfully to {email.to_email}")
             return True
-            
         except Exception as e:
-            print(f"Failed to send email to {to_email}: {str(e)}")
+            print(f"Failed to send email to {email.to_email}: {str(e)}")
             return False
+        finally:
+            connection.close()
     
     def send_password_reset_email(self, to_email: str, reset_token: str) -> bool:
         """
@@ -94,110 +718,12 @@ class EmailService:
         Returns:
             True if email sent successfully
         """
-        reset_link = f"{FRONTEND_URL}/reset-password?token={reset_token}"
-        
-        subject = "Reset Your NexusMind Password"
-        
-        # HTML version
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .container {{
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    border-radius: 10px;
-                    padding: 40px;
-                    color: white;
-                }}
-                .content {{
-                    background: white;
-                    border-radius: 8px;
-                    padding: 30px;
-                    margin-top: 20px;
-                    color: #333;
-                }}
-                .button {{
-                    display: inline-block;
-                    padding: 12px 30px;
-                    background: #667eea;
-                    color: white;
-                    text-decoration: none;
-                    border-radius: 5px;
-                    margin: 20px 0;
-                    font-weight: bold;
-                }}
-                .footer {{
-                    margin-top: 30px;
-                    font-size: 12px;
-                    color: #999;
-                    text-align: center;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1 style="margin: 0;">🔐 NexusMind</h1>
-                <p style="margin: 5px 0 0 0; opacity: 0.9;">AI-Powered Note Taking</p>
-            </div>
-            
-            <div class="content">
-                <h2>Reset Your Password</h2>
-                <p>Hi there,</p>
-                <p>We received a request to reset your password for your NexusMind account. Click the button below to create a new password:</p>
-                
-                <div style="text-align: center;">
-                    <a href="{reset_link}" class="button">Reset Password</a>
-                </div>
-                
-                <p>Or copy and paste this link into your browser:</p>
-                <p style="background: #f5f5f5; padding: 10px; border-radius: 5px; word-break: break-all;">
-                    {reset_link}
-                </p>
-                
-                <p><strong>This link will expire in 1 hour.</strong></p>
-                
-                <p>If you didn't request a password reset, you can safely ignore this email. Your password will remain unchanged.</p>
-                
-                <p>Best regards,<br>The NexusMind Team</p>
-            </div>
-            
-            <div class="footer">
-                <p>This is an automated email. Please do not reply to this message.</p>
-                <p>&copy; 2025 NexusMind. All rights reserved.</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Plain text version
-        text_body = f"""
-        Reset Your NexusMind Password
-        
-        Hi there,
-        
-        We received a request to reset your password for your NexusMind account.
-        
-        Click the link below to create a new password:
-        {reset_link}
-        
-        This link will expire in 1 hour.
-        
-        If you didn't request a password reset, you can safely ignore this email.
-        
-        Best regards,
-        The NexusMind Team
-        """
-        
-        return self._send_email(to_email, subject, html_body, text_body)
+        try:
+            email = self.password_reset_template.render(to_email, token=reset_token)
+        except ValueError as e:
+            print(f"Failed to render email to {to_email}: {str(e)}")
+            return False
+        return self._send_email(email)
     
     def send_welcome_email(self, to_email: str, full_name: Optional[str] = None) -> bool:
         """
@@ -210,83 +736,12 @@ class EmailService:
         Returns:
             True if email sent successfully
         """
-        greeting = f"Hi {full_name}," if full_name else "Hi there,"
-        
-        subject = "Welcome to NexusMind! 🎉"
-        
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .container {{
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    border-radius: 10px;
-                    padding: 40px;
-                    color: white;
-                }}
-                .content {{
-                    background: white;
-                    border-radius: 8px;
-                    padding: 30px;
-                    margin-top: 20px;
-                    color: #333;
-                }}
-                .feature {{
-                    margin: 15px 0;
-                    padding-left: 25px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1 style="margin: 0;">✨ Welcome to NexusMind!</h1>
-            </div>
-            
-            <div class="content">
-                <p>{greeting}</p>
-                <p>Thank you for joining NexusMind! We're excited to help you organize your thoughts and boost your productivity with AI-powered note-taking.</p>
-                
-                <h3>🚀 Get Started:</h3>
-                <div class="feature">📝 Create your first note</div>
-                <div class="feature">🏷️ Use AI to generate tags automatically</div>
-                <div class="feature">🔍 Search and organize your notes effortlessly</div>
-                <div class="feature">📊 Visualize connections with the graph view</div>
-                
-                <p>If you have any questions or need help, feel free to reach out to our support team.</p>
-                
-                <p>Happy note-taking!<br>The NexusMind Team</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_body = f"""
-        Welcome to NexusMind!
-        
-        {greeting}
-        
-        Thank you for joining NexusMind! We're excited to help you organize your thoughts and boost your productivity with AI-powered note-taking.
-        
-        Get Started:
-        - Create your first note
-        - Use AI to generate tags automatically
-        - Search and organize your notes effortlessly
-        - Visualize connections with the graph view
-        
-        Happy note-taking!
-        The NexusMind Team
-        """
-        
-        return self._send_email(to_email, subject, html_body, text_body)
+        try:
+            email = self.welcome_template.render(to_email, name=full_name or "there")
+        except ValueError as e:
+            print(f"Failed to render email to {to_email}: {str(e)}")
+            return False
+        return self._send_email(email)
 
 
 # Singleton instance
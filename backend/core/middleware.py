@@ -5,11 +5,41 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from core.auth import verify_token
-from db.supabase import get_supabase_client
+from core.cache import TTLCache
+from core.config import settings
+from db.repository import users_repo
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
+# Cache of user profiles keyed by user ID, so authenticated requests
+# don't pay a database round-trip just to resolve the caller.
+# Must be invalidated whenever a profile row changes. Cached profiles never
+# include ``password_hash``: routes that verify a password read it fresh.
+user_cache = TTLCache(
+    max_size=settings.user_cache_max_size,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+)
+
+
+def _user_id_from_token(token: str) -> str:
+    """Verify an access token and return its ``sub`` claim."""
+    payload = verify_token(token, token_type="access")
+    
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_id
+
+
+def invalidate_cached_user(user_id: str) -> None:
+    """Drop a user's cached profile after it has been modified."""
+    user_cache.invalidate(user_id)
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -21,39 +51,35 @@ async def get_current_user(
         credentials: HTTP Bearer credentials from request header
         
     Returns:
-        User information dictionary
+        User information dictionary (without ``password_hash``)
         
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
-    
     # Verify and decode the token
-    payload = verify_token(token, token_type="access")
+    user_id = _user_id_from_token(credentials.credentials)
     
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return dict(cached)
     
     # Get user from Supabase
-    supabase = get_supabase_client()
     try:
-        response = supabase.table("user_profiles").select("*").eq("id", user_id).execute()
+        user = await users_repo.get_by_id(user_id)
         
-        if not response.data or len(response.data) == 0:
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        user = response.data[0]
-        return user
+        user.pop("password_hash", None)
+        user_cache.set(user_id, user)
+        return dict(user)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -62,17 +88,24 @@ async def get_current_user(
 
 
 async def get_current_user_id(
-    current_user: dict = Depends(get_current_user)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> str:
     """
     Dependency to get just the current user's ID.
     
+    When ``TRUST_JWT_CLAIMS`` is enabled the ID is taken straight from the
+    verified token's ``sub`` claim without loading the profile.
+    
     Args:
-        current_user: Current user from get_current_user dependency
+        credentials: HTTP Bearer credentials from request header
         
     Returns:
         User ID string
     """
+    if settings.trust_jwt_claims:
+        return _user_id_from_token(credentials.credentials)
+    
+    current_user = await get_current_user(credentials)
     return current_user["id"]
 
 
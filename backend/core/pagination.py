@@ -0,0 +1,76 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Listing endpoints order by ``(<timestamp column>, id)`` descending and hand
+out an opaque cursor pointing just past the last row of a page. Fetching the
+next page is then a single indexed range query instead of an ever-growing
+OFFSET scan.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, Response, status
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(order_by: str, row: dict) -> str:
+    """
+    Build an opaque cursor positioned after ``row``.
+
+    Args:
+        order_by: Timestamp column the listing is ordered by
+        row: Last row of the current page
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps([order_by, row[order_by], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], order_by: str) -> Optional[Tuple[str, str]]:
+    """
+    Decode a cursor into the ``(timestamp, id)`` position it points after.
+
+    Returns:
+        ``(timestamp, id)`` in canonical ISO-8601 and UUID form, or None
+        when no cursor was given
+
+    Raises:
+        HTTPException: If the cursor is malformed, holds anything other than
+            a timestamp and a UUID, or belongs to a listing with a different
+            sort order
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        column, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        # Both values end up inside a PostgREST filter string, so only a
+        # real timestamp and UUID are accepted, re-serialized canonically
+        stamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        row_uuid = uuid.UUID(row_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+    if column != order_by:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+    return stamp.isoformat(), str(row_uuid)
+
+
+def set_next_cursor(response: Response, rows: List[dict], limit: int, order_by: str) -> None:
+    """Attach the next-page cursor header when the page is full."""
+    if rows and len(rows) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(order_by, rows[-1])
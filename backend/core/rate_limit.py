@@ -0,0 +1,242 @@
+"""
+Rate limiting for expensive endpoints.
+
+Requests are metered with token buckets keyed by endpoint and user: each
+bucket holds up to ``burst`` tokens, refills at ``per_minute`` tokens per
+minute, and a request that finds it empty gets ``429 Too Many Requests``
+with a ``Retry-After`` header. Per-user concurrency caps bound how many
+slow requests one user can have in flight at once.
+
+Bucket state lives in a :class:`RateLimitBackend`. The default in-memory
+backend limits each worker process independently; deployments running
+several workers can plug in a shared backend (e.g. Redis) with
+``rate_limiter.set_backend``.
+
+:class:`ProviderBudget` applies the same idea to outbound calls, so the
+whole process stays within an AI provider's published quota.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+from fastapi import Depends, HTTPException, status
+from core.middleware import get_current_user_id
+
+
+class TokenBucket:
+    """A single token bucket refilled continuously at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def take(self, cost: float = 1.0) -> float:
+        """
+        Take ``cost`` tokens if available.
+
+        Returns:
+            0.0 if the tokens were taken, otherwise seconds until they would be
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for token buckets.
+
+    Implementations must make :meth:`take` atomic per key.
+    """
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens from the bucket ``key``; return 0.0 or seconds to wait."""
+
+
+class InMemoryBackend(RateLimitBackend):
+    """
+    Per-process buckets, least recently used first out once ``max_keys`` is reached.
+
+    Not thread-safe: intended to be used from the event loop only.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rate, capacity)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(cost)
+
+
+class RateLimiter:
+    """
+    Builds FastAPI dependencies that rate limit and concurrency-cap routes per user.
+    """
+
+    def __init__(self, backend: Optional[RateLimitBackend] = None):
+        self.backend = backend or InMemoryBackend()
+        self._active: Counter = Counter()
+        self.rejected: Counter = Counter()
+
+    def set_backend(self, backend: RateLimitBackend) -> None:
+        """Use a different bucket store (e.g. one shared between worker processes)."""
+        self.backend = backend
+
+    def limit(self, name: str, per_minute: float, burst: Optional[int] = None):
+        """
+        Dependency allowing each user ``per_minute`` requests per minute on ``name``,
+        with bursts of up to ``burst`` requests (defaults to ``per_minute``).
+        """
+        rate = per_minute / 60.0
+        capacity = float(burst if burst is not None else max(1, int(per_minute)))
+
+        async def dependency(user_id: str = Depends(get_current_user_id)) -> None:
+            if per_minute <= 0:
+                return
+            wait = await self.backend.take(f"{name}:{user_id}", rate, capacity)
+            if wait > 0:
+                self.rejected[name] += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Rate limit exceeded, please slow down",
+                    headers={"Retry-After": str(max(1, math.ceil(wait)))},
+                )
+
+        return dependency
+
+    def _reject_if_full(self, name: str, key: str, max_concurrent: int) -> None:
+        if self._active[key] >= max_concurrent:
+            self.rejected[name] += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent requests, wait for one to finish",
+                headers={"Retry-After": "1"},
+            )
+
+    @asynccontextmanager
+    async def slot(self, name: str, user_id: str, max_concurrent: int) -> AsyncIterator[None]:
+        """
+        Hold one of the user's ``max_concurrent`` slots on ``name`` for the block.
+
+        Raises:
+            HTTPException: 429 if all of the user's slots are taken
+        """
+        if max_concurrent <= 0:
+            yield
+            return
+        key = f"{name}:{user_id}"
+        self._reject_if_full(name, key, max_concurrent)
+        self._active[key] += 1
+        try:
+            yield
+        finally:
+            self._active[key] -= 1
+            if self._active[key] <= 0:
+                del self._active[key]
+
+    def concurrency(self, name: str, max_concurrent: int):
+        """
+        Dependency allowing each user at most ``max_concurrent`` in-flight requests on ``name``.
+
+        The slot is held until the route returns. Streaming routes use
+        :meth:`stream_concurrency` instead.
+        """
+
+        async def dependency(user_id: str = Depends(get_current_user_id)):
+            async with self.slot(name, user_id, max_concurrent):
+                yield
+
+        return dependency
+
+    def stream_concurrency(self, name: str, max_concurrent: int):
+        """
+        Dependency for streaming routes sharing the ``name`` concurrency cap.
+
+        A dependency's cleanup runs before a ``StreamingResponse`` body is
+        sent, so a slot held by :meth:`concurrency` would be released as the
+        stream starts. This one only rejects with 429 up front when no slot
+        is free, and returns a factory for :meth:`slot` that the body
+        generator enters for as long as it streams.
+        """
+
+        async def dependency(user_id: str = Depends(get_current_user_id)) -> Callable:
+            if max_concurrent > 0:
+                self._reject_if_full(name, f"{name}:{user_id}", max_concurrent)
+            return lambda: self.slot(name, user_id, max_concurrent)
+
+        return dependency
+
+    def stats(self) -> dict:
+        """Rejection counts per limit and requests currently holding a concurrency slot."""
+        return {
+            "backend": type(self.backend).__name__,
+            "rejected": dict(self.rejected),
+            "in_flight": sum(self._active.values()),
+        }
+
+
+class ProviderBudget:
+    """
+    Outbound request budget for one AI provider, shared by the whole process.
+
+    Enforces a per-minute and a per-day ceiling; a request is allowed only if
+    both have room. Limits of 0 disable the corresponding ceiling.
+    """
+
+    def __init__(self, name: str, per_minute: float = 0, per_day: float = 0):
+        self.name = name
+        self._buckets = []
+        if per_minute > 0:
+            self._buckets.append(TokenBucket(per_minute / 60.0, per_minute))
+        if per_day > 0:
+            self._buckets.append(TokenBucket(per_day / 86400.0, per_day))
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.used = 0
+        self.denied = 0
+
+    def try_acquire(self) -> bool:
+        """Spend one request from the budget if every ceiling has room."""
+        now = time.monotonic()
+        for bucket in self._buckets:
+            # Refill without spending so a denial doesn't consume other ceilings
+            bucket.tokens = min(bucket.capacity, bucket.tokens + (now - bucket.updated_at) * bucket.rate)
+            bucket.updated_at = now
+            if bucket.tokens < 1:
+                self.denied += 1
+                return False
+        for bucket in self._buckets:
+            bucket.tokens -= 1
+        self.used += 1
+        return True
+
+    def stats(self) -> dict:
+        """Configured ceilings, remaining headroom and usage counters."""
+        return {
+            "per_minute": self.per_minute or None,
+            "per_day": self.per_day or None,
+            "remaining": [int(bucket.tokens) for bucket in self._buckets],
+            "used": self.used,
+            "denied": self.denied,
+        }
+
+
+# Singleton used by route dependencies
+rate_limiter = RateLimiter()
@@ -0,0 +1,44 @@
+"""
+JSON response helpers.
+
+``JSONResponseClass`` is the app's default response class: orjson when it is
+installed (several times faster than the standard library encoder on large
+note listings), plain ``JSONResponse`` otherwise.
+
+``trusted_rows`` lets list endpoints skip response-model revalidation for
+rows that came straight from the database with known columns. FastAPI skips
+validation and ``jsonable_encoder`` for responses returned directly, so the
+rows are serialized exactly once. Enabled with ``TRUST_DB_ROWS=true``.
+"""
+from typing import Any, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from core.config import settings
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+JSONResponseClass = ORJSONResponse if orjson is not None else JSONResponse
+
+
+def trusted_rows(content: Any, response: Optional[Response] = None) -> Any:
+    """
+    Return ``content`` as a ready-made JSON response when DB rows are trusted.
+
+    The content must already have the shape the route's response model
+    would produce (only model fields, JSON-compatible values).
+
+    Args:
+        content: Rows (or a dict wrapping them) to send
+        response: The route's injected Response, whose headers
+            (e.g. pagination cursors) are carried over
+
+    Returns:
+        A JSON response, or ``content`` unchanged so FastAPI validates it
+    """
+    if not settings.trust_db_rows:
+        return content
+    headers = dict(response.headers) if response is not None else None
+    return JSONResponseClass(content, headers=headers)
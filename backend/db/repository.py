@@ -0,0 +1,428 @@
+"""
+Async data access layer for NexusMind.
+
+The supabase-py client is synchronous: every ``.execute()`` performs a blocking
+HTTP round-trip to PostgREST. Running it directly inside an ``async def`` route
+stalls the event loop for every other request on the worker, so all queries are
+funnelled through :func:`execute`, which offloads them to a bounded thread pool.
+
+Routers should use the repository singletons at the bottom of this module
+instead of building queries themselves. In-memory indexes that mirror the
+notes table register with ``notes_repo.add_listener`` to be told about writes.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from core.config import settings
+from db.supabase import get_supabase
+
+
+# Bounded pool for blocking Supabase calls
+_executor = ThreadPoolExecutor(
+    max_workers=settings.db_max_workers,
+    thread_name_prefix="supabase",
+)
+
+
+async def execute(query) -> Any:
+    """
+    Execute a Supabase query builder without blocking the event loop.
+
+    Args:
+        query: Any supabase-py request builder (table query or RPC)
+
+    Returns:
+        The APIResponse returned by ``query.execute()``
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, query.execute)
+
+
+# Note columns returned to clients; excludes large internal columns
+# such as ``embedding``
+NOTE_COLUMNS = (
+    "id, user_id, title, body, is_favorite, is_archived, tags, folder_id, "
+    "created_at, updated_at"
+)
+
+
+# Maximum ids per ``in.(...)`` filter; keeps PostgREST request URLs short
+ID_CHUNK_SIZE = 200
+
+
+def chunked(items: List[Any], size: int) -> List[List[Any]]:
+    """Split a list into consecutive chunks of at most ``size`` items."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def shutdown_executor() -> None:
+    """Shut down the database thread pool (called on app shutdown)."""
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
+class NotesRepository:
+    """
+    Async access to the ``notes`` table.
+
+    Listeners are objects with ``note_saved(user_id, note)`` and
+    ``note_deleted(user_id, note)`` methods; they are called with the stored
+    row after every successful write made through this repository.
+    """
+
+    table = "notes"
+
+    def __init__(self):
+        self._listeners: List[Any] = []
+
+    def _query(self):
+        return get_supabase().table(self.table)
+
+    def add_listener(self, listener: Any) -> None:
+        """Register a listener for note writes."""
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, user_id: str, notes: List[dict]) -> None:
+        # A failing listener must never fail the write that triggered it
+        for listener in self._listeners:
+            for note in notes:
+                try:
+                    getattr(listener, event)(user_id, note)
+                except Exception as e:
+                    print(f"Note listener {type(listener).__name__}.{event} failed: {e}")
+
+    def _notify_saved(self, user_id: str, notes: List[dict]) -> None:
+        self._notify("note_saved", user_id, notes)
+
+    def _notify_deleted(self, user_id: str, notes: List[dict]) -> None:
+        self._notify("note_deleted", user_id, notes)
+
+    async def list(
+        self,
+        user_id: str,
+        *,
+        is_favorite: Optional[bool] = None,
+        is_archived: Optional[bool] = False,
+        folder_id: Optional[str] = None,
+        tag: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        order_by: str = "created_at",
+        after: Optional[Tuple[str, str]] = None,
+        limit: Optional[int] = None,
+        columns: str = NOTE_COLUMNS,
+    ) -> List[dict]:
+        """
+        List a user's notes with optional filters, newest first.
+
+        Rows are ordered by ``(order_by, id)`` descending. ``after`` is a
+        keyset position ``(timestamp, id)``; only rows strictly after it in
+        that order are returned. Passing ``is_archived=None`` returns both
+        archived and active notes.
+        """
+        query = self._query().select(columns).eq("user_id", user_id)
+
+        if is_favorite is not None:
+            query = query.eq("is_favorite", is_favorite)
+        if is_archived is not None:
+            query = query.eq("is_archived", is_archived)
+        if folder_id is not None:
+            query = query.eq("folder_id", folder_id)
+        if tag is not None:
+            query = query.contains("tags", [tag])
+        if date_from:
+            query = query.gte("created_at", date_from)
+        if date_to:
+            query = query.lte("created_at", date_to)
+
+        if after is not None:
+            value, row_id = after
+            query = query.or_(
+                f'{order_by}.lt."{value}",'
+                f'and({order_by}.eq."{value}",id.lt."{row_id}")'
+            )
+
+        query = query.order(order_by, desc=True).order("id", desc=True)
+        if limit is not None:
+            query = query.limit(limit)
+
+        response = await execute(query)
+        return response.data
+
+    async def list_all(
+        self,
+        user_id: str,
+        *,
+        columns: str = NOTE_COLUMNS,
+        page_size: Optional[int] = None,
+        **filters,
+    ) -> List[dict]:
+        """
+        List every matching note, following keyset pages past the row cap.
+
+        PostgREST truncates a single response at its max-rows setting, so
+        whole-table reads (index warm-up, batch jobs) walk ``(created_at, id)``
+        pages until one comes back short. Accepts the filters of :meth:`list`.
+        """
+        notes: List[dict] = []
+        async for page in self.pages(user_id, columns=columns, page_size=page_size, **filters):
+            notes.extend(page)
+        return notes
+
+    async def pages(
+        self,
+        user_id: str,
+        *,
+        columns: str = NOTE_COLUMNS,
+        page_size: Optional[int] = None,
+        **filters,
+    ) -> AsyncIterator[List[dict]]:
+        """Yield a user's notes one keyset page at a time, newest first."""
+        page_size = page_size or settings.db_page_size
+        selected = [column.strip() for column in columns.split(",")]
+        # The cursor needs the sort key of the last row
+        for required in ("id", "created_at"):
+            if required not in selected and "*" not in selected:
+                selected.append(required)
+        columns = ", ".join(selected)
+
+        after = None
+        while True:
+            page = await self.list(
+                user_id,
+                order_by="created_at",
+                after=after,
+                limit=page_size,
+                columns=columns,
+                **filters,
+            )
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            after = (page[-1]["created_at"], page[-1]["id"])
+
+    async def get(self, note_id: str, user_id: str, columns: str = NOTE_COLUMNS) -> Optional[dict]:
+        """Get a single note owned by ``user_id``, or None."""
+        query = self._query().select(columns).eq("id", note_id).eq("user_id", user_id)
+        response = await execute(query)
+        return response.data[0] if response.data else None
+
+    async def create(self, note_data: dict) -> Optional[dict]:
+        """Insert a note and return the stored row."""
+        response = await execute(self._query().insert(note_data))
+        self._notify_saved(note_data["user_id"], response.data)
+        return response.data[0] if response.data else None
+
+    async def update(self, note_id: str, user_id: str, update_data: dict) -> Optional[dict]:
+        """Update a note owned by ``user_id`` and return the updated row."""
+        query = self._query().update(update_data).eq("id", note_id).eq("user_id", user_id)
+        response = await execute(query)
+        self._notify_saved(user_id, response.data)
+        return response.data[0] if response.data else None
+
+    async def delete(self, note_id: str, user_id: str) -> Optional[dict]:
+        """Delete a note owned by ``user_id`` and return the deleted row."""
+        query = self._query().delete().eq("id", note_id).eq("user_id", user_id)
+        response = await execute(query)
+        self._notify_deleted(user_id, response.data)
+        return response.data[0] if response.data else None
+
+    async def toggle_flag(self, note_id: str, user_id: str, flag: str) -> Optional[dict]:
+        """
+        Atomically flip a boolean note flag and return the updated row.
+
+        Runs the ``toggle_note_flag`` SQL function (migration 003), so the
+        read and the write happen in one statement on the database.
+        """
+        if flag not in ("is_favorite", "is_archived"):
+            raise ValueError(f"Unsupported note flag: {flag}")
+        response = await execute(
+            get_supabase().rpc(
+                "toggle_note_flag",
+                {"p_note_id": note_id, "p_user_id": user_id, "p_flag": flag},
+            )
+        )
+        rows = response.data or []
+        self._notify_saved(user_id, rows)
+        return rows[0] if rows else None
+
+    async def get_many(self, note_ids: List[str], user_id: str, columns: str = NOTE_COLUMNS) -> List[dict]:
+        """
+        Get several notes owned by ``user_id`` (order not preserved).
+
+        Ids are sent in chunks of ``ID_CHUNK_SIZE``, one SELECT per chunk.
+        """
+        rows: List[dict] = []
+        for ids in chunked(note_ids, ID_CHUNK_SIZE):
+            query = self._query().select(columns).eq("user_id", user_id).in_("id", ids)
+            response = await execute(query)
+            rows.extend(response.data or [])
+        return rows
+
+    async def create_many(self, notes: List[dict]) -> List[dict]:
+        """Insert several notes in one statement and return the stored rows (in input order)."""
+        if not notes:
+            return []
+        response = await execute(self._query().insert(notes))
+        rows = response.data or []
+        for user_id in {note["user_id"] for note in rows}:
+            self._notify_saved(user_id, [note for note in rows if note["user_id"] == user_id])
+        return rows
+
+    async def update_many(self, user_id: str, note_ids: List[str], update_data: dict) -> List[dict]:
+        """
+        Apply the same update to several notes owned by ``user_id``.
+
+        Ids are sent in chunks of ``ID_CHUNK_SIZE``, one UPDATE per chunk.
+        Returns the updated rows; ids that matched nothing are simply absent.
+        """
+        rows: List[dict] = []
+        for ids in chunked(note_ids, ID_CHUNK_SIZE):
+            query = self._query().update(update_data).eq("user_id", user_id).in_("id", ids)
+            response = await execute(query)
+            rows.extend(response.data or [])
+
+        self._notify_saved(user_id, rows)
+        return rows
+
+    async def update_tags_many(
+        self,
+        user_id: str,
+        note_ids: List[str],
+        add: Optional[List[str]] = None,
+        remove: Optional[List[str]] = None,
+        fields: Optional[dict] = None,
+    ) -> List[dict]:
+        """
+        Add and/or remove tags on many notes, keeping each note's other tags.
+
+        Runs the ``bulk_update_note_tags`` SQL function (migration 004), one
+        call per chunk of ids. ``fields`` (``is_favorite``, ``is_archived``,
+        ``folder_id``) are set by the same UPDATE, so each chunk is a single
+        atomic write.
+        """
+        rows: List[dict] = []
+        for ids in chunked(note_ids, ID_CHUNK_SIZE):
+            response = await execute(
+                get_supabase().rpc(
+                    "bulk_update_note_tags",
+                    {
+                        "p_user_id": user_id,
+                        "p_note_ids": ids,
+                        "p_add": add or [],
+                        "p_remove": remove or [],
+                        "p_fields": fields or {},
+                    },
+                )
+            )
+            rows.extend(response.data or [])
+
+        self._notify_saved(user_id, rows)
+        return rows
+
+    async def update_embeddings(self, user_id: str, rows: List[dict]) -> int:
+        """
+        Store embeddings for several notes in one statement.
+
+        ``rows`` are ``{"id", "embedding", "embedding_hash"}`` dicts; runs the
+        ``bulk_set_note_embeddings`` SQL function (migration 005). Listeners
+        are not notified since no indexed note fields change. Returns the
+        number of notes updated.
+        """
+        if not rows:
+            return 0
+        response = await execute(
+            get_supabase().rpc("bulk_set_note_embeddings", {"p_user_id": user_id, "p_rows": rows})
+        )
+        return len(response.data or [])
+
+    async def delete_many(self, user_id: str, note_ids: List[str]) -> List[dict]:
+        """Delete several notes owned by ``user_id`` and return the deleted rows."""
+        rows: List[dict] = []
+        for ids in chunked(note_ids, ID_CHUNK_SIZE):
+            query = self._query().delete().eq("user_id", user_id).in_("id", ids)
+            response = await execute(query)
+            rows.extend(response.data or [])
+
+        self._notify_deleted(user_id, rows)
+        return rows
+
+
+class FoldersRepository:
+    """Async access to the ``folders`` table."""
+
+    table = "folders"
+
+    def _query(self):
+        return get_supabase().table(self.table)
+
+    async def list(self, user_id: str) -> List[dict]:
+        """List a user's folders ordered by position."""
+        query = self._query().select("*").eq("user_id", user_id).order("position")
+        response = await execute(query)
+        return response.data
+
+    async def get(self, folder_id: str, user_id: str) -> Optional[dict]:
+        """Get a single folder owned by ``user_id``, or None."""
+        query = self._query().select("*").eq("id", folder_id).eq("user_id", user_id)
+        response = await execute(query)
+        return response.data[0] if response.data else None
+
+    async def hierarchy(self, user_id: str) -> List[dict]:
+        """Return the folder tree via the ``get_folder_hierarchy`` SQL function."""
+        response = await execute(
+            get_supabase().rpc("get_folder_hierarchy", {"p_user_id": user_id})
+        )
+        return response.data
+
+    async def create(self, folder_data: dict) -> Optional[dict]:
+        """Insert a folder and return the stored row."""
+        response = await execute(self._query().insert(folder_data))
+        return response.data[0] if response.data else None
+
+    async def update(self, folder_id: str, user_id: str, update_data: dict) -> Optional[dict]:
+        """Update a folder owned by ``user_id`` and return the updated row."""
+        query = self._query().update(update_data).eq("id", folder_id).eq("user_id", user_id)
+        response = await execute(query)
+        return response.data[0] if response.data else None
+
+    async def delete(self, folder_id: str, user_id: str) -> Optional[dict]:
+        """Delete a folder owned by ``user_id`` and return the deleted row."""
+        query = self._query().delete().eq("id", folder_id).eq("user_id", user_id)
+        response = await execute(query)
+        return response.data[0] if response.data else None
+
+
+class UsersRepository:
+    """Async access to the ``user_profiles`` table."""
+
+    table = "user_profiles"
+
+    def _query(self):
+        return get_supabase().table(self.table)
+
+    async def get_by_id(self, user_id: str, columns: str = "*") -> Optional[dict]:
+        """Get a user profile by ID, or None."""
+        response = await execute(self._query().select(columns).eq("id", user_id))
+        return response.data[0] if response.data else None
+
+    async def get_by_email(self, email: str, columns: str = "*") -> Optional[dict]:
+        """Get a user profile by email, or None."""
+        response = await execute(self._query().select(columns).eq("email", email))
+        return response.data[0] if response.data else None
+
+    async def create(self, user_data: Dict[str, Any]) -> Optional[dict]:
+        """Insert a user profile and return the stored row."""
+        response = await execute(self._query().insert(user_data))
+        return response.data[0] if response.data else None
+
+    async def update(self, user_id: str, update_data: Dict[str, Any]) -> Optional[dict]:
+        """Update a user profile and return the updated row."""
+        response = await execute(self._query().update(update_data).eq("id", user_id))
+        return response.data[0] if response.data else None
+
+
+# Singleton instances
+notes_repo = NotesRepository()
+folders_repo = FoldersRepository()
+users_repo = UsersRepository()
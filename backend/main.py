@@ -5,10 +5,51 @@ AI-Powered Markdown Wiki API Server
 This is the main entry point for the FastAPI application.
 Configures CORS, routes, and auto-generated documentation.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import settings
+from core.compression import CompressionMiddleware
+from core.responses import JSONResponseClass
 from api import notes, ai, auth, folders
+from core.auth import password_hash_pool
+from core.email_service import email_service
+from core.middleware import user_cache
+from core.pagination import NEXT_CURSOR_HEADER
+from db.repository import shutdown_executor
+from services.ai_service import ai_service
+from services.folder_counts import folder_counts
+from services.job_queue import job_queue
+from services.search_index import search_index
+from services.tag_index import tag_index
+from services.vector_index import semantic_index
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: set up shared resources on startup
+    and release them on shutdown.
+    """
+    # Pooled HTTP client for AI providers
+    await ai_service.startup()
+    
+    # Workers for background AI jobs
+    await job_queue.start()
+    
+    # Background delivery for transactional email
+    await email_service.startup()
+    
+    yield
+    
+    await email_service.shutdown()
+    await job_queue.stop()
+    await ai_service.shutdown()
+    
+    # Release the thread pools used for blocking database calls and bcrypt
+    shutdown_executor()
+    password_hash_pool.shutdown()
+
 
 # Initialize FastAPI app with metadata
 app = FastAPI(
@@ -17,6 +58,8 @@ app = FastAPI(
     description=settings.api_description,
     docs_url="/docs",  # Swagger UI at /docs
     redoc_url="/redoc",  # ReDoc at /redoc
+    lifespan=lifespan,
+    default_response_class=JSONResponseClass,  # orjson when installed
 )
 
 # Configure CORS to allow frontend communication
@@ -33,49 +76,84 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],  # Let the frontend read pagination cursors and ETags
 )
 
 # Security Headers Middleware
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-        
-        # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        
-        # Enable XSS protection
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        
-        # Content Security Policy
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data: https:; "
-            "font-src 'self' data:; "
-            "connect-src 'self' http://localhost:* https:;"
-        )
-        
-        # Referrer Policy
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+SECURITY_HEADERS = {
+    # Prevent clickjacking
+    "X-Frame-Options": "DENY",
+    # Prevent MIME type sniffing
+    "X-Content-Type-Options": "nosniff",
+    # Enable XSS protection
+    "X-XSS-Protection": "1; mode=block",
+    # Content Security Policy
+    "Content-Security-Policy": (
+        "default-src 'self'; "
+        "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
+        "style-src 'self' 'unsafe-inline'; "
+        "img-src 'self' data: https:; "
+        "font-src 'self' data:; "
+        "connect-src 'self' http://localhost:* https:;"
+    ),
+    # Referrer Policy
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    # Permissions Policy (formerly Feature Policy)
+    "Permissions-Policy": (
+        "geolocation=(), "
+        "microphone=(), "
+        "camera=()"
+    ),
+}
+
+
+class SecurityHeadersMiddleware:
+    """
+    Adds SECURITY_HEADERS to every HTTP response.
+    
+    Plain ASGI rather than BaseHTTPMiddleware: the header bytes are built
+    once, and responses (including streams) pass straight through with the
+    headers added to their start message.
+    """
+    
+    def __init__(self, app: ASGIApp, headers: dict = SECURITY_HEADERS):
+        self.app = app
+        self.raw_headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+        ]
+        self.names = frozenset(name for name, _ in self.raw_headers)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Permissions Policy (formerly Feature Policy)
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), "
-            "microphone=(), "
-            "camera=()"
-        )
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Replace any values the route set, as assigning them used to
+                headers = [
+                    header for header in message.get("headers", ())
+                    if header[0].lower() not in self.names
+                ]
+                headers.extend(self.raw_headers)
+                message["headers"] = headers
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_headers)
 
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Compress large responses (note listings, search results)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+
 
 # Include API routers
 app.include_router(auth.router)  # Authentication routes
@@ -111,7 +189,20 @@ async def health_check():
         return {
             "status": "healthy",
             "database": "connected",
-            "api_version": settings.api_version
+            "api_version": settings.api_version,
+            "caches": {
+                "user_profiles": user_cache.stats(),
+                "ai_results": ai_service.cache_stats(),
+                "note_indexes": {
+                    "search": search_index.stats(),
+                    "tags": tag_index.stats(),
+                    "folder_counts": folder_counts.stats(),
+                    "semantic": semantic_index.stats()
+                }
+            },
+            "password_hashing": password_hash_pool.stats(),
+            "ai_jobs": job_queue.stats(),
+            "email": email_service.dispatcher.stats()
         }
     except Exception as e:
         return {
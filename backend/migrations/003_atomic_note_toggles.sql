@@ -0,0 +1,35 @@
+-- ============================================
+-- Atomic note flag toggles
+-- ============================================
+-- Flips is_favorite / is_archived in a single UPDATE and returns the
+-- updated row, so concurrent toggles cannot lose updates and the API
+-- needs one round-trip instead of a SELECT followed by an UPDATE.
+
+CREATE OR REPLACE FUNCTION toggle_note_flag(
+    p_note_id UUID,
+    p_user_id UUID,
+    p_flag TEXT
+)
+RETURNS SETOF notes
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF p_flag = 'is_favorite' THEN
+        RETURN QUERY
+        UPDATE notes
+        SET is_favorite = NOT COALESCE(is_favorite, FALSE),
+            updated_at = NOW()
+        WHERE id = p_note_id AND user_id = p_user_id
+        RETURNING *;
+    ELSIF p_flag = 'is_archived' THEN
+        RETURN QUERY
+        UPDATE notes
+        SET is_archived = NOT COALESCE(is_archived, FALSE),
+            updated_at = NOW()
+        WHERE id = p_note_id AND user_id = p_user_id
+        RETURNING *;
+    ELSE
+        RAISE EXCEPTION 'Unsupported note flag: %', p_flag;
+    END IF;
+END;
+$$;
@@ -0,0 +1,38 @@
+-- ============================================
+-- Bulk tag edits for notes
+-- ============================================
+-- Adds and removes tags on many notes in a single UPDATE while keeping
+-- each note's other tags (and their order). Used by PATCH /notes/bulk.
+-- Other fields of the same request (is_favorite, is_archived, folder_id)
+-- are passed in p_fields and applied by the same UPDATE, so a bulk edit
+-- is one atomic write per chunk of ids.
+
+CREATE OR REPLACE FUNCTION bulk_update_note_tags(
+    p_user_id UUID,
+    p_note_ids UUID[],
+    p_add TEXT[],
+    p_remove TEXT[],
+    p_fields JSONB DEFAULT '{}'
+)
+RETURNS SETOF notes
+LANGUAGE sql
+AS $$
+    UPDATE notes
+    SET tags = (
+            SELECT COALESCE(array_agg(kept.tag ORDER BY kept.position), '{}')
+            FROM (
+                SELECT t.tag, MIN(t.position) AS position
+                FROM unnest(COALESCE(notes.tags, '{}') || COALESCE(p_add, '{}'))
+                     WITH ORDINALITY AS t(tag, position)
+                WHERE NOT (t.tag = ANY(COALESCE(p_remove, '{}')))
+                GROUP BY t.tag
+            ) AS kept
+        ),
+        is_favorite = COALESCE((p_fields->>'is_favorite')::BOOLEAN, is_favorite),
+        is_archived = COALESCE((p_fields->>'is_archived')::BOOLEAN, is_archived),
+        folder_id = COALESCE((p_fields->>'folder_id')::UUID, folder_id),
+        updated_at = NOW()
+    WHERE user_id = p_user_id
+      AND id = ANY(p_note_ids)
+    RETURNING *;
+$$;
@@ -0,0 +1,26 @@
+-- ============================================
+-- Bulk embedding writes
+-- ============================================
+-- Stores a hash of the text each embedding was computed from, so batch
+-- embedding can skip unchanged notes, and writes a whole chunk of
+-- embeddings in one UPDATE instead of one request per note.
+
+ALTER TABLE notes ADD COLUMN IF NOT EXISTS embedding_hash TEXT;
+
+-- p_rows: JSON array of {"id", "embedding", "embedding_hash"} objects.
+-- jsonb_populate_recordset casts each value to the notes column type.
+CREATE OR REPLACE FUNCTION bulk_set_note_embeddings(
+    p_user_id UUID,
+    p_rows JSONB
+)
+RETURNS TABLE (id UUID)
+LANGUAGE sql
+AS $$
+    UPDATE notes AS n
+    SET embedding = r.embedding,
+        embedding_hash = r.embedding_hash
+    FROM jsonb_populate_recordset(NULL::notes, p_rows) AS r
+    WHERE n.id = r.id
+      AND n.user_id = p_user_id
+    RETURNING n.id;
+$$;
@@ -0,0 +1,14 @@
+-- ============================================
+-- Keyset pagination indexes for notes
+-- ============================================
+-- Note listings page by (created_at, id) or (updated_at, id), newest
+-- first, within one user. These composite indexes serve each page as a
+-- single index range scan in that order, instead of sorting all of the
+-- user's notes. They replace idx_notes_user_id and idx_notes_created_at
+-- for these queries; the older indexes are left in place.
+
+CREATE INDEX IF NOT EXISTS idx_notes_user_created_keyset
+    ON notes (user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_notes_user_updated_keyset
+    ON notes (user_id, updated_at DESC, id DESC);
@@ -4,11 +4,20 @@ Supports multiple FREE AI providers: Groq, Ollama (local), and fallback
 """
 
 import os
-import re
+import json
+import asyncio
+import hashlib
 import httpx
-from typing import List, Optional
-from textblob import TextBlob
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 from dotenv import load_dotenv
+from core.cache import TTLCache
+from core.rate_limit import ProviderBudget
+from services.embeddings import embedder, to_list
+from services.keywords import extract_keywords
+from services.summarizer import summarize as extractive_summarize
+from services.provider_health import ProviderHealth
+from services.vector_index import semantic_index
 
 # Load environment variables
 load_dotenv()
@@ -29,74 +38,309 @@ class AIService:
         self.ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         self.ollama_model = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
         
-        # Provider availability
-        self._groq_available = None
-        self._ollama_available = None
+        # Per-provider request timeouts (seconds)
+        self.groq_timeout = float(os.getenv("GROQ_TIMEOUT", "15"))
+        self.ollama_timeout = float(os.getenv("OLLAMA_TIMEOUT", "30"))
+        
+        # Shared HTTP connection pool settings
+        self.http_max_connections = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "20"))
+        self.http_max_keepalive = int(os.getenv("AI_HTTP_MAX_KEEPALIVE", "10"))
+        self.http_keepalive_expiry = float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY", "30"))
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Batch embedding: notes per embedding/write chunk and chunks in flight
+        self.embedding_batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+        self.embedding_concurrency = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+        
+        # Rule-based tagger used when no provider answers: "keywords" or "textblob"
+        self.fallback_tag_extractor = os.getenv("FALLBACK_TAG_EXTRACTOR", "keywords").lower()
+        
+        # Summary provider: "auto" (Groq -> Ollama -> extractive) or "extractive" (local only)
+        self.summary_provider = os.getenv("SUMMARY_PROVIDER", "auto").lower()
+        
+        # Minimum cosine similarity for a semantic search hit
+        self.min_similarity = float(os.getenv("SEMANTIC_MIN_SIMILARITY", "0.1"))
+        
+        # Cache of AI provider results, keyed by a hash of the request
+        self.result_cache = TTLCache(
+            max_size=int(os.getenv("AI_CACHE_MAX_SIZE", "2048")),
+            ttl_seconds=float(os.getenv("AI_CACHE_TTL_SECONDS", "604800")),
+        )
+        # Optional JSON file the cache is loaded from/saved to across restarts
+        self.cache_path = os.getenv("AI_CACHE_PATH") or None
+        
+        # Provider health: circuit breakers and latency averages
+        failure_threshold = int(os.getenv("AI_BREAKER_FAILURES", "3"))
+        reset_timeout = float(os.getenv("AI_BREAKER_RESET_SECONDS", "30"))
+        self.provider_health = {
+            "groq": ProviderHealth("groq", failure_threshold, reset_timeout),
+            # Not assumed up until the first background probe reaches it
+            "ollama": ProviderHealth("ollama", failure_threshold, reset_timeout, start_open=True),
+        }
+        self.health_probe_interval = float(os.getenv("AI_HEALTH_PROBE_INTERVAL", "30"))
+        
+        # Outbound quota shared by all users (Groq free tier: 30 req/min, 14,400 req/day)
+        self.provider_budgets = {
+            "groq": ProviderBudget(
+                "groq",
+                per_minute=float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30")),
+                per_day=float(os.getenv("GROQ_REQUESTS_PER_DAY", "14400")),
+            ),
+        }
+        self._probe_task: Optional[asyncio.Task] = None
+        
+        # Start the next provider if the current one hasn't answered within
+        # this many seconds (0 disables hedging: fall back only on failure)
+        self.hedge_delay = float(os.getenv("AI_HEDGE_DELAY_SECONDS", "0"))
+    
+    async def startup(self) -> None:
+        """Open the shared HTTP client, start health probing and load the persisted result cache (called from the app lifespan)"""
+        self._get_client()
+        self._probe_task = asyncio.create_task(self._probe_loop())
+        
+        if self.cache_path:
+            try:
+                loaded = self.result_cache.load(self.cache_path)
+                print(f"Loaded {loaded} cached AI results from {self.cache_path}")
+            except Exception as e:
+                print(f"Failed to load AI result cache: {e}")
+    
+    async def shutdown(self) -> None:
+        """Stop health probing, close the shared HTTP client and persist the result cache"""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        
+        if self.cache_path:
+            try:
+                self.result_cache.save(self.cache_path)
+            except Exception as e:
+                print(f"Failed to save AI result cache: {e}")
+    
+    def _cache_key(self, operation: str, title: str, content: str, **params) -> str:
+        """
+        Content-addressed cache key for an AI request
+        Covers the operation, configured models, note text and parameters
+        """
+        payload = json.dumps(
+            [operation, self.groq_model, self.ollama_model, title, content, params],
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def invalidate_cached(self, operation: str, title: str, content: str, **params) -> None:
+        """Drop the cached result for one request"""
+        self.result_cache.invalidate(self._cache_key(operation, title, content, **params))
+    
+    def clear_cache(self) -> None:
+        """Drop every cached AI result"""
+        self.result_cache.clear()
+    
+    def cache_stats(self) -> dict:
+        """Result cache size and hit rate"""
+        return {**self.result_cache.stats(), "persisted": self.cache_path is not None}
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Return the long-lived HTTP client shared by all provider calls.
+        Reusing it keeps TCP/TLS connections alive between requests.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.http_max_connections,
+                    max_keepalive_connections=self.http_max_keepalive,
+                    keepalive_expiry=self.http_keepalive_expiry,
+                ),
+                timeout=self.groq_timeout,
+            )
+        return self._client
     
     def is_available(self) -> bool:
         """Check if any AI provider is available"""
         return self._check_groq_available() or self._check_ollama_available()
     
     def _check_groq_available(self) -> bool:
-        """Check if Groq API is available"""
-        if self._groq_available is not None:
-            return self._groq_available
+        """Check if Groq is configured and its circuit breaker lets requests through"""
+        return bool(self.groq_api_key) and self.provider_health["groq"].available()
+    
+    def _check_ollama_available(self) -> bool:
+        """Check if Ollama's circuit breaker lets requests through (kept current by background probes)"""
+        return self.provider_health["ollama"].available()
+    
+    def provider_stats(self) -> dict:
+        """Health, breaker state and latency of each provider"""
+        return {
+            "groq": {"configured": bool(self.groq_api_key), **self.provider_health["groq"].stats()},
+            "ollama": {"configured": True, **self.provider_health["ollama"].stats()},
+            "hedge_delay_seconds": self.hedge_delay or None,
+            "budgets": {name: budget.stats() for name, budget in self.provider_budgets.items()},
+        }
+    
+    async def _probe(self, name: str) -> None:
+        """Send a cheap request to a provider and record the outcome"""
+        client = self._get_client()
+        health = self.provider_health[name]
+        started = time.monotonic()
+        try:
+            if name == "groq":
+                response = await client.get(
+                    "https://api.groq.com/openai/v1/models",
+                    headers={"Authorization": f"Bearer {self.groq_api_key}"},
+                    timeout=5.0
+                )
+            else:
+                response = await client.get(f"{self.ollama_base_url}/api/tags", timeout=2.0)
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}")
+        except Exception as e:
+            health.record_failure(f"probe: {e}")
+            return
+        health.record_success(time.monotonic() - started)
+    
+    async def _probe_loop(self) -> None:
+        """
+        Periodically re-probe providers that are down or not yet confirmed up,
+        so a recovered provider is used again without waiting for user traffic
+        """
+        first = True
+        while True:
+            for name, health in self.provider_health.items():
+                if name == "groq" and not self.groq_api_key:
+                    continue
+                if first or health.state != "closed":
+                    await self._probe(name)
+            first = False
+            await asyncio.sleep(self.health_probe_interval)
+    
+    def _within_budget(self, name: str) -> bool:
+        """Spend one request from the provider's shared quota, if it has one"""
+        budget = self.provider_budgets.get(name)
+        return budget is None or budget.try_acquire()
+    
+    def _admit(self, name: str) -> bool:
+        """
+        Whether a request may be sent to a provider now
         
-        if not self.groq_api_key:
-            self._groq_available = False
+        The breaker is asked first so an open breaker doesn't spend quota;
+        if the budget then refuses, a claimed half-open trial is handed back.
+        """
+        health = self.provider_health[name]
+        if not health.allow_request():
             return False
-        
-        try:
-            # Quick check - just verify API key format
-            self._groq_available = len(self.groq_api_key) > 20
-            return self._groq_available
-        except:
-            self._groq_available = False
+        if not self._within_budget(name):
+            health.record_abandoned()
             return False
+        return True
     
-    def _check_ollama_available(self) -> bool:
-        """Check if Ollama is available"""
-        if self._ollama_available is not None:
-            return self._ollama_available
-        
+    async def _call_provider(
+        self,
+        name: str,
+        operation: str,
+        call: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run one provider call, feeding its outcome and latency into the provider's health"""
+        health = self.provider_health[name]
+        started = time.monotonic()
         try:
-            response = httpx.get(f"{self.ollama_base_url}/api/tags", timeout=2.0)
-            self._ollama_available = response.status_code == 200
-            return self._ollama_available
-        except:
-            self._ollama_available = False
+            result = await call()
+        except asyncio.CancelledError:
+            health.record_abandoned()
+            raise
+        except Exception as e:
+            print(f"{name.capitalize()} {operation} failed: {e}")
+            health.record_failure(str(e))
+            return None
+        health.record_success(time.monotonic() - started)
+        return result
+    
+    async def _first_result(
+        self,
+        operation: str,
+        calls: List[Tuple[str, Callable[[], Awaitable[Any]]]]
+    ) -> Any:
+        """
+        Return the first non-empty result from providers tried in priority order
+        
+        Providers whose breaker is open are skipped. The next provider is
+        started as soon as the current one fails, or - when hedging is enabled -
+        once it has been running for hedge_delay seconds without answering; the
+        first useful answer wins and the rest are cancelled.
+        """
+        remaining = list(calls)
+        pending = set()
+        
+        def launch_next() -> bool:
+            while remaining:
+                name, call = remaining.pop(0)
+                if name == "groq" and not self.groq_api_key:
+                    continue
+                if self._admit(name):
+                    pending.add(asyncio.create_task(self._call_provider(name, operation, call)))
+                    return True
             return False
+        
+        try:
+            launch_next()
+            while pending:
+                timeout = self.hedge_delay if self.hedge_delay > 0 and remaining else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Latency budget exceeded: hedge with the next provider
+                    launch_next()
+                    continue
+                pending.difference_update(done)
+                for task in done:
+                    result = task.result()
+                    if result:
+                        return result
+                if not pending:
+                    launch_next()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
     
     async def generate_tags(
         self, 
         title: str, 
         content: str, 
-        max_tags: int = 5
+        max_tags: int = 5,
+        refresh: bool = False
     ) -> List[str]:
         """
         Generate tags for a note
-        Tries: Groq -> Ollama -> Fallback
+        Tries: cache -> Groq -> Ollama -> Fallback
+        Provider results are cached; refresh=True bypasses and replaces the cached entry.
         """
-        # Try Groq first (FREE cloud API)
-        if self._check_groq_available():
-            try:
-                tags = await self._groq_generate_tags(title, content, max_tags)
-                if tags:
-                    return tags
-            except Exception as e:
-                print(f"Groq tag generation failed: {e}")
+        cache_key = self._cache_key("tags", title, content, max_tags=max_tags)
+        if not refresh:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
         
-        # Try Ollama (local)
-        if self._check_ollama_available():
-            try:
-                tags = await self._ollama_generate_tags(title, content, max_tags)
-                if tags:
-                    return tags
-            except Exception as e:
-                print(f"Ollama tag generation failed: {e}")
+        # Groq (FREE cloud API) first, then Ollama (local)
+        tags = await self._first_result("tag generation", [
+            ("groq", lambda: self._groq_generate_tags(title, content, max_tags)),
+            ("ollama", lambda: self._ollama_generate_tags(title, content, max_tags)),
+        ])
+        if tags:
+            self.result_cache.set(cache_key, tags)
+            return tags
         
-        # Fallback to rule-based
-        return self._fallback_generate_tags(title, content, max_tags)
+        # Fallback to rule-based, off the event loop since notes can be large
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self._fallback_generate_tags, title, content, max_tags
+        )
     
     async def _groq_generate_tags(
         self, 
@@ -112,38 +356,38 @@ Content: {content[:500]}
 
 Tags:"""
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.groq_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.groq_model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a helpful assistant that generates relevant tags for notes. Return only comma-separated tags, no explanations."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.7,
-                    "max_tokens": 50
-                },
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                tags_text = result["choices"][0]["message"]["content"].strip()
-                tags = [tag.strip() for tag in tags_text.split(",")]
-                return [tag for tag in tags if tag][:max_tags]
-            
-            return []
+        client = self._get_client()
+        response = await client.post(
+            "https://api.groq.com/openai/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.groq_api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": self.groq_model,
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": "You are a helpful assistant that generates relevant tags for notes. Return only comma-separated tags, no explanations."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                "temperature": 0.7,
+                "max_tokens": 50
+            },
+            timeout=self.groq_timeout
+        )
+        
+        if response.status_code != 200:
+            raise RuntimeError(f"Groq returned HTTP {response.status_code}")
+        
+        result = response.json()
+        tags_text = result["choices"][0]["message"]["content"].strip()
+        tags = [tag.strip() for tag in tags_text.split(",")]
+        return [tag for tag in tags if tag][:max_tags]
     
     async def _ollama_generate_tags(
         self, 
@@ -159,24 +403,24 @@ Content: {content[:500]}
 
 Tags:"""
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.ollama_base_url}/api/generate",
-                json={
-                    "model": self.ollama_model,
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=30.0
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                tags_text = result["response"].strip()
-                tags = [tag.strip() for tag in tags_text.split(",")]
-                return [tag for tag in tags if tag][:max_tags]
-            
-            return []
+        client = self._get_client()
+        response = await client.post(
+            f"{self.ollama_base_url}/api/generate",
+            json={
+                "model": self.ollama_model,
+                "prompt": prompt,
+                "stream": False
+            },
+            timeout=self.ollama_timeout
+        )
+        
+        if response.status_code != 200:
+            raise RuntimeError(f"Ollama returned HTTP {response.status_code}")
+        
+        result = response.json()
+        tags_text = result["response"].strip()
+        tags = [tag.strip() for tag in tags_text.split(",")]
+        return [tag for tag in tags if tag][:max_tags]
     
     def _fallback_generate_tags(
         self, 
@@ -184,7 +428,21 @@ Tags:"""
         content: str, 
         max_tags: int
     ) -> List[str]:
-        """Fallback: Extract keywords using TextBlob"""
+        """Fallback: Extract keyphrases locally (RAKE-style, or TextBlob if configured)"""
+        if self.fallback_tag_extractor == "textblob":
+            return self._textblob_generate_tags(title, content, max_tags)
+        return extract_keywords(title, content, max_keywords=max_tags)
+    
+    def _textblob_generate_tags(
+        self, 
+        title: str, 
+        content: str, 
+        max_tags: int
+    ) -> List[str]:
+        """Extract keywords using TextBlob noun phrases (slow; only used when configured)"""
+        # Imported lazily: TextBlob/NLTK are slow to load and rarely needed
+        from textblob import TextBlob
+        
         text = f"{title} {content}"
         
         # Extract noun phrases
@@ -216,40 +474,105 @@ Tags:"""
         self, 
         title: str, 
         content: str, 
-        max_length: int = 150
+        max_length: int = 150,
+        refresh: bool = False,
+        provider: Optional[str] = None
     ) -> str:
         """
         Summarize a note
-        Tries: Groq -> Ollama -> Fallback
+        Tries: cache -> Groq -> Ollama -> Fallback, or only the local
+        extractive summarizer when provider (or SUMMARY_PROVIDER) is "extractive".
+        Provider results are cached; refresh=True bypasses and replaces the cached entry.
         """
-        # Try Groq first
-        if self._check_groq_available():
-            try:
-                summary = await self._groq_summarize(title, content, max_length)
-                if summary:
-                    return summary
-            except Exception as e:
-                print(f"Groq summarization failed: {e}")
+        if (provider or self.summary_provider) == "extractive":
+            return await self._fallback_summarize(title, content, max_length)
         
-        # Try Ollama
-        if self._check_ollama_available():
-            try:
-                summary = await self._ollama_summarize(title, content, max_length)
-                if summary:
-                    return summary
-            except Exception as e:
-                print(f"Ollama summarization failed: {e}")
+        cache_key = self._cache_key("summary", title, content, max_length=max_length)
+        if not refresh:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Groq first, then Ollama
+        summary = await self._first_result("summarization", [
+            ("groq", lambda: self._groq_summarize(title, content, max_length)),
+            ("ollama", lambda: self._ollama_summarize(title, content, max_length)),
+        ])
+        if summary:
+            self.result_cache.set(cache_key, summary)
+            return summary
         
         # Fallback
-        return self._fallback_summarize(title, content, max_length)
+        return await self._fallback_summarize(title, content, max_length)
     
-    async def _groq_summarize(
+    async def stream_summary(
         self, 
         title: str, 
         content: str, 
-        max_length: int
-    ) -> str:
-        """Summarize using Groq API"""
+        max_length: int = 150,
+        refresh: bool = False,
+        provider: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Summarize a note, yielding (source, text) chunks as they are produced
+        Tries: cache -> Groq -> Ollama -> Fallback (provider as in summarize_note)
+        A provider that fails before producing any text falls through to the
+        next one; completed provider summaries are cached like summarize_note.
+        """
+        if (provider or self.summary_provider) == "extractive":
+            yield "fallback", await self._fallback_summarize(title, content, max_length)
+            return
+        
+        cache_key = self._cache_key("summary", title, content, max_length=max_length)
+        if not refresh:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                yield "cache", cached
+                return
+        
+        providers = []
+        if self.groq_api_key:
+            providers.append(("groq", self._groq_stream_summarize))
+        providers.append(("ollama", self._ollama_stream_summarize))
+        
+        for source, stream in providers:
+            if not self._admit(source):
+                continue
+            health = self.provider_health[source]
+            
+            started = time.monotonic()
+            parts = []
+            try:
+                async for chunk in stream(title, content, max_length):
+                    if not parts:
+                        # Time to first token is what the user waits for
+                        health.record_success(time.monotonic() - started)
+                    parts.append(chunk)
+                    yield source, chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                if not parts:
+                    health.record_abandoned()
+                raise
+            except Exception as e:
+                health.record_failure(str(e))
+                # Text already sent can't be taken back, so only retry before the first chunk
+                if parts:
+                    raise
+                print(f"{source.capitalize()} streaming summarization failed: {e}")
+                continue
+            
+            if not parts:
+                health.record_abandoned()
+            
+            summary = "".join(parts).strip()
+            if summary:
+                self.result_cache.set(cache_key, summary)
+                return
+        
+        yield "fallback", await self._fallback_summarize(title, content, max_length)
+    
+    def _groq_summary_request(self, title: str, content: str, max_length: int) -> dict:
+        """Chat completion request body for a Groq summary"""
         prompt = f"""Summarize this note in approximately {max_length} words. Be concise and capture the main points.
 
 Title: {title}
@@ -257,44 +580,79 @@ Content: {content}
 
 Summary:"""
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.groq_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.groq_model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a helpful assistant that creates concise summaries."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.5,
-                    "max_tokens": max_length * 2
+        return {
+            "model": self.groq_model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a helpful assistant that creates concise summaries."
                 },
-                timeout=15.0
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"].strip()
-            
-            return ""
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.5,
+            "max_tokens": max_length * 2
+        }
     
-    async def _ollama_summarize(
+    async def _groq_summarize(
         self, 
         title: str, 
         content: str, 
         max_length: int
     ) -> str:
-        """Summarize using Ollama"""
+        """Summarize using Groq API"""
+        client = self._get_client()
+        response = await client.post(
+            "https://api.groq.com/openai/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.groq_api_key}",
+                "Content-Type": "application/json"
+            },
+            json=self._groq_summary_request(title, content, max_length),
+            timeout=self.groq_timeout
+        )
+        
+        if response.status_code != 200:
+            raise RuntimeError(f"Groq returned HTTP {response.status_code}")
+        
+        result = response.json()
+        return result["choices"][0]["message"]["content"].strip()
+    
+    async def _groq_stream_summarize(
+        self, 
+        title: str, 
+        content: str, 
+        max_length: int
+    ) -> AsyncIterator[str]:
+        """Stream a summary from Groq's OpenAI-compatible SSE endpoint"""
+        client = self._get_client()
+        async with client.stream(
+            "POST",
+            "https://api.groq.com/openai/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.groq_api_key}",
+                "Content-Type": "application/json"
+            },
+            json={**self._groq_summary_request(title, content, max_length), "stream": True},
+            timeout=self.groq_timeout
+        ) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Groq returned HTTP {response.status_code}")
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+    
+    def _ollama_summary_request(self, title: str, content: str, max_length: int) -> dict:
+        """Generate request body for an Ollama summary"""
         prompt = f"""Summarize this note in approximately {max_length} words:
 
 Title: {title}
@@ -302,93 +660,99 @@ Content: {content}
 
 Summary:"""
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.ollama_base_url}/api/generate",
-                json={
-                    "model": self.ollama_model,
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=30.0
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result["response"].strip()
-            
-            return ""
+        return {
+            "model": self.ollama_model,
+            "prompt": prompt,
+            "stream": False
+        }
     
-    def _fallback_summarize(
+    async def _ollama_summarize(
         self, 
         title: str, 
         content: str, 
         max_length: int
     ) -> str:
-        """Fallback: Extract first N words"""
-        # Clean content
-        content = re.sub(r'\s+', ' ', content).strip()
-        
-        # Split into sentences
-        sentences = re.split(r'[.!?]+', content)
+        """Summarize using Ollama"""
+        client = self._get_client()
+        response = await client.post(
+            f"{self.ollama_base_url}/api/generate",
+            json=self._ollama_summary_request(title, content, max_length),
+            timeout=self.ollama_timeout
+        )
         
-        summary = title + ". "
-        word_count = len(title.split())
+        if response.status_code != 200:
+            raise RuntimeError(f"Ollama returned HTTP {response.status_code}")
         
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
+        result = response.json()
+        return result["response"].strip()
+    
+    async def _ollama_stream_summarize(
+        self, 
+        title: str, 
+        content: str, 
+        max_length: int
+    ) -> AsyncIterator[str]:
+        """Stream a summary from Ollama's newline-delimited JSON endpoint"""
+        client = self._get_client()
+        async with client.stream(
+            "POST",
+            f"{self.ollama_base_url}/api/generate",
+            json={**self._ollama_summary_request(title, content, max_length), "stream": True},
+            timeout=self.ollama_timeout
+        ) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Ollama returned HTTP {response.status_code}")
             
-            sentence_words = len(sentence.split())
-            if word_count + sentence_words <= max_length:
-                summary += sentence + ". "
-                word_count += sentence_words
-            else:
-                break
-        
-        return summary.strip()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+    
+    async def _fallback_summarize(
+        self, 
+        title: str, 
+        content: str, 
+        max_length: int
+    ) -> str:
+        """Fallback: Extractive summary (TF-IDF centroid sentence scoring), off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, extractive_summarize, title, content, max_length)
     
     async def semantic_search(
         self, 
+        user_id: str, 
         query: str, 
-        notes: List[dict]
-    ) -> List[dict]:
+        limit: int = 10
+    ) -> List[Tuple[str, float]]:
         """
-        Semantic search using embeddings
-        For FREE tier, we'll use simple text matching
+        Semantic search using local embeddings
+        Queries the user's in-memory vector index and returns
+        (note_id, similarity) pairs, most similar first
         """
-        # Simple keyword-based search for free tier
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
-        
-        results = []
-        for note in notes:
-            title = note.get('title', '').lower()
-            body = note.get('body', '').lower()
-            
-            # Calculate simple relevance score
-            title_matches = sum(1 for word in query_words if word in title)
-            body_matches = sum(1 for word in query_words if word in body)
-            
-            score = (title_matches * 2) + body_matches  # Title matches worth more
-            
-            if score > 0:
-                note['relevance_score'] = score
-                results.append(note)
-        
-        # Sort by relevance
-        results.sort(key=lambda x: x['relevance_score'], reverse=True)
-        
-        return results
+        matches = await semantic_index.search(user_id, query, limit)
+        return [(note_id, score) for note_id, score in matches if score >= self.min_similarity]
     
     async def generate_embedding(self, text: str) -> Optional[List[float]]:
         """
         Generate embedding for text
-        For FREE tier, return None (embeddings not needed for basic search)
+        Uses the local hashing embedder (CPU only, no API calls)
+        """
+        loop = asyncio.get_running_loop()
+        vector = await loop.run_in_executor(None, embedder.embed, text)
+        return to_list(vector)
+    
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many texts in one vectorised call
+        Uses the local hashing embedder (CPU only, no API calls)
         """
-        # Embeddings are optional - basic search works without them
-        return None
+        loop = asyncio.get_running_loop()
+        matrix = await loop.run_in_executor(None, embedder.embed_batch, texts)
+        return to_list(matrix)
 
 
 # Singleton instance
@@ -0,0 +1,115 @@
+"""
+Local CPU text embeddings for NexusMind
+
+Uses the hashing trick over word unigrams, word bigrams and character
+trigrams to map text into a fixed-size dense vector. No model download or
+external API is needed, vectors are deterministic across processes, and
+similar wording produces nearby vectors under cosine similarity.
+"""
+
+import hashlib
+import os
+import re
+import zlib
+from collections import Counter
+from typing import Iterable, List
+
+import numpy as np
+
+
+# Unicode word tokens, as in the full-text search index
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Bump when feature extraction changes so stored embeddings are recomputed
+EMBEDDING_VERSION = "2"
+
+# Relative weight of each feature family, keyed by feature prefix
+_FAMILY_WEIGHTS = {"w": 1.0, "b": 0.7, "c": 0.35}
+
+
+class HashingEmbedder:
+    """
+    Feature-hashing text embedder
+    Produces L2-normalised float32 vectors of size ``dim``
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _features(self, text: str) -> Counter:
+        """Count n-gram features in text"""
+        tokens = _TOKEN_RE.findall(text.lower())
+        features: Counter = Counter()
+
+        for token in tokens:
+            features["w:" + token] += 1
+            # Character trigrams make the vector robust to inflections/typos
+            padded = f"<{token}>"
+            for i in range(len(padded) - 2):
+                features["c:" + padded[i:i + 3]] += 1
+
+        for first, second in zip(tokens, tokens[1:]):
+            features["b:" + first + " " + second] += 1
+
+        return features
+
+    def _hashed(self, text: str):
+        """Bucket indices and signed weights of a text's features"""
+        features = self._features(text)
+        hashes = np.fromiter(
+            (zlib.crc32(feature.encode("utf-8")) for feature in features),
+            dtype=np.int64, count=len(features),
+        )
+        family = np.fromiter(
+            (_FAMILY_WEIGHTS[feature[0]] for feature in features),
+            dtype=np.float32, count=len(features),
+        )
+        counts = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+
+        signs = np.where(hashes & 0x80000000, 1.0, -1.0).astype(np.float32)
+        # Sublinear term frequency so long notes don't drown short ones
+        weights = signs * family * (1.0 + np.log(counts))
+        return hashes % self.dim, weights
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a single text into a unit-length vector"""
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Embed many texts into an (n, dim) matrix of unit-length rows
+        All rows are scattered and normalised in single NumPy operations
+        """
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if not texts:
+            return matrix
+
+        hashed = [self._hashed(text) for text in texts]
+        rows = np.repeat(np.arange(len(texts)), [len(buckets) for buckets, _ in hashed])
+        buckets = np.concatenate([buckets for buckets, _ in hashed])
+        weights = np.concatenate([weights for _, weights in hashed])
+        np.add.at(matrix, (rows, buckets), weights)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+def note_text(note: dict) -> str:
+    """Text used to embed a note"""
+    return f"{note.get('title') or ''} {note.get('body') or ''}"
+
+
+def content_hash(text: str) -> str:
+    """Hash of the text an embedding was computed from (and the embedder version)"""
+    return hashlib.sha1(f"{EMBEDDING_VERSION}:{text}".encode("utf-8")).hexdigest()
+
+
+def to_list(vector: np.ndarray) -> List[float]:
+    """Convert a vector (or a matrix, row by row) to JSON-serialisable lists"""
+    return np.round(vector.astype(np.float64), 6).tolist()
+
+
+# Singleton instance
+embedder = HashingEmbedder(dim=int(os.getenv("EMBEDDING_DIM", "384")))
@@ -0,0 +1,87 @@
+"""
+Incrementally maintained per-folder note counts
+
+Replaces one COUNT query per folder with a per-user counter that is built
+from one lightweight read of the user's notes (note id, folder and archive
+flag, paged past PostgREST's row cap) and then kept current as notes are
+created, moved, archived or deleted. Archived
+notes are not counted, matching /folders/{id}/notes.
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional
+
+from core.config import settings
+from services.indexing import PerUserNoteIndex
+
+
+class FolderCounter:
+    """Note -> folder assignments and the resulting per-folder counts"""
+
+    def __init__(self):
+        self.folders: Dict[str, Optional[str]] = {}
+        self.counts: Counter = Counter()
+
+    def set(self, note_id: str, folder_id: Optional[str]) -> None:
+        """Place a note in a folder (None for no folder)"""
+        self.remove(note_id)
+        self.folders[note_id] = folder_id
+        if folder_id is not None:
+            self.counts[folder_id] += 1
+
+    def remove(self, note_id: str) -> None:
+        """Stop counting a note"""
+        if note_id not in self.folders:
+            return
+        folder_id = self.folders.pop(note_id)
+        if folder_id is not None:
+            self.counts[folder_id] -= 1
+            if self.counts[folder_id] <= 0:
+                del self.counts[folder_id]
+
+    def clear_folder(self, folder_id: str) -> None:
+        """Detach every note from a deleted folder"""
+        for note_id, current in self.folders.items():
+            if current == folder_id:
+                self.folders[note_id] = None
+        self.counts.pop(folder_id, None)
+
+
+class FolderNoteCounts(PerUserNoteIndex):
+    """
+    Per-user folder note counts kept in sync with note writes
+    """
+
+    columns = "id, folder_id, is_archived"
+
+    async def counts(self, user_id: str) -> Dict[str, int]:
+        """Return {folder_id: note_count} for the user's non-archived notes"""
+        counter: FolderCounter = await self.get(user_id)
+        return dict(counter.counts)
+
+    def folder_deleted(self, user_id: str, folder_id: str) -> None:
+        """Notes in a deleted folder have their folder_id set to NULL"""
+        counter = self.loaded(user_id)
+        if counter is not None:
+            counter.clear_folder(folder_id)
+
+    def build_index(self, notes: List[dict]) -> FolderCounter:
+        counter = FolderCounter()
+        for note in notes:
+            if not note.get("is_archived"):
+                counter.set(note["id"], note.get("folder_id"))
+        return counter
+
+    def apply_saved(self, counter: FolderCounter, note: dict) -> None:
+        note_id = note["id"]
+        if note.get("is_archived"):
+            counter.remove(note_id)
+        elif "folder_id" in note:
+            counter.set(note_id, note["folder_id"])
+
+    def apply_deleted(self, counter: FolderCounter, note: dict) -> None:
+        counter.remove(note["id"])
+
+
+# Singleton instance, kept in sync with note writes
+folder_counts = FolderNoteCounts(max_age_seconds=settings.folder_counts_ttl_seconds)
@@ -0,0 +1,127 @@
+"""
+Base class for in-memory, per-user structures that mirror the notes table
+
+Subclasses describe which note columns they need, how to build their index
+from those rows and how to apply a single note write. This class takes care
+of lazy building, periodic rebuilds (so writes made by other worker
+processes eventually show up), per-user build locks, and replaying writes
+that race with a build. Instances register themselves as notes repository
+listeners.
+
+Built indexes live in a TTLCache: an entry expiring is what triggers the
+periodic rebuild, and at most ``max_users`` users stay resident per index,
+least recently used first out. Build locks are held weakly, so they go
+away once no request is using them.
+"""
+
+import asyncio
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.cache import TTLCache
+from core.config import settings
+from db.repository import notes_repo
+
+
+class PerUserNoteIndex:
+    """
+    Lazily built per-user index kept in sync with note writes
+    """
+
+    # Note columns fetched when building an index
+    columns = "id"
+
+    def __init__(self, max_age_seconds: float = 600.0, max_users: Optional[int] = None):
+        self.max_age_seconds = max_age_seconds
+        self._indexes = TTLCache(
+            max_size=max_users if max_users is not None else settings.index_max_users,
+            ttl_seconds=max_age_seconds,
+        )
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        # Writes that arrive while a user's index is being built
+        self._building: Dict[str, List[Tuple[str, dict]]] = {}
+        notes_repo.add_listener(self)
+
+    # Subclass hooks
+
+    def build_index(self, notes: List[dict]) -> Any:
+        """Build a user's index from note rows (runs in a worker thread)"""
+        raise NotImplementedError
+
+    def apply_saved(self, index: Any, note: dict) -> None:
+        """Apply a created/updated note row to an index"""
+        raise NotImplementedError
+
+    def apply_deleted(self, index: Any, note: dict) -> None:
+        """Apply a deleted note row to an index"""
+        raise NotImplementedError
+
+    # Listener interface
+
+    def note_saved(self, user_id: str, note: dict) -> None:
+        self._apply("saved", user_id, note)
+
+    def note_deleted(self, user_id: str, note: dict) -> None:
+        self._apply("deleted", user_id, note)
+
+    # Public helpers
+
+    def loaded(self, user_id: str) -> Any:
+        """Return the user's index if it is already built, else None"""
+        return self._indexes.peek(user_id)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user's index; it is rebuilt on next use"""
+        self._indexes.invalidate(user_id)
+
+    def lock(self, user_id: str) -> asyncio.Lock:
+        """The lock serializing builds (and subclass updates) of a user's index"""
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        return lock
+
+    async def get(self, user_id: str) -> Any:
+        """Return the user's index, building or refreshing it if needed"""
+        async with self.lock(user_id):
+            index = self._indexes.get(user_id)
+            if index is None:
+                index = await self._build(user_id)
+            return index
+
+    def stats(self) -> dict:
+        """Resident users (cache size) and hit/miss counters"""
+        return self._indexes.stats()
+
+    def _apply(self, event: str, user_id: str, note: dict) -> None:
+        if "id" not in note:
+            return
+        if user_id in self._building:
+            self._building[user_id].append((event, note))
+            return
+        index = self._indexes.peek(user_id)
+        if index is None:
+            return
+        if event == "saved":
+            self.apply_saved(index, note)
+        else:
+            self.apply_deleted(index, note)
+
+    async def _build(self, user_id: str) -> Any:
+        self.invalidate(user_id)
+        self._building[user_id] = []
+        try:
+            notes = await notes_repo.list_all(user_id, is_archived=None, columns=self.columns)
+            loop = asyncio.get_running_loop()
+            index = await loop.run_in_executor(None, self.build_index, notes)
+            self._indexes.set(user_id, index)
+        finally:
+            missed = self._building.pop(user_id)
+
+        # Replay writes that raced with the build
+        for event, note in missed:
+            if event == "saved":
+                self.apply_saved(index, note)
+            else:
+                self.apply_deleted(index, note)
+        return index
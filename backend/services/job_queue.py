@@ -0,0 +1,205 @@
+"""
+In-process background job queue for slow AI work
+
+Tag generation, summarization and batch embedding can take tens of seconds
+when a remote provider is involved. Instead of holding the HTTP request open,
+routes submit a job and return its id immediately; a fixed pool of asyncio
+worker tasks runs jobs with bounded concurrency, and clients poll for the
+result. Finished jobs are kept for a limited time and then forgotten.
+
+Jobs live in process memory, so they do not survive a restart and are only
+visible to the worker process that accepted them.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+# Job states
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when a job cannot be accepted because the queue is at capacity"""
+
+
+class Job:
+    """A unit of background work and its outcome"""
+
+    def __init__(self, user_id: str, kind: str, func: Callable[[], Awaitable[Any]]):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.kind = kind
+        self.func = func
+        self.status = PENDING
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> dict:
+        """Public view of the job, as returned by the status endpoint"""
+        return {
+            "job_id": self.id,
+            "type": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    Bounded FIFO job queue served by a fixed number of asyncio workers
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 1000,
+        max_pending_per_user: int = 20,
+        result_ttl_seconds: float = 3600.0,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_pending_per_user = max_pending_per_user
+        self.result_ttl_seconds = result_ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        # Finished jobs in completion order, for expiry
+        self._finished: Deque[Job] = deque()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def start(self) -> None:
+        """Start the worker tasks (called from the app lifespan)"""
+        if self._workers:
+            return
+        self._stopping = False
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"ai-job-worker-{i}")
+            for i in range(self.max_workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers and any job still running or queued"""
+        self._stopping = True
+        for job in self._jobs.values():
+            if job.status in (PENDING, RUNNING):
+                self._finish(job, CANCELLED, error="Server shutting down")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def submit(self, user_id: str, kind: str, func: Callable[[], Awaitable[Any]]) -> Job:
+        """
+        Queue a coroutine function for background execution.
+
+        Raises:
+            QueueFullError: If the queue or the user's share of it is full
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        self._expire()
+
+        active = [job for job in self._jobs.values() if job.status in (PENDING, RUNNING)]
+        if len(active) >= self.max_pending:
+            raise QueueFullError("Too many background jobs queued, try again later")
+        if sum(1 for job in active if job.user_id == user_id) >= self.max_pending_per_user:
+            raise QueueFullError("Too many of your background jobs are still running")
+
+        job = Job(user_id, kind, func)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str, user_id: str) -> Optional[Job]:
+        """Return a job owned by user_id, or None"""
+        self._expire()
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    def cancel(self, job_id: str, user_id: str) -> Optional[Job]:
+        """Cancel a pending or running job owned by user_id"""
+        job = self.get(job_id, user_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+        if job._task is not None:
+            job._task.cancel()
+        self._finish(job, CANCELLED)
+        return job
+
+    def stats(self) -> dict:
+        """Queue depth and worker counts for health reporting"""
+        counts = {state: 0 for state in (PENDING, RUNNING) + FINISHED_STATES}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return {"workers": len(self._workers), "jobs": counts}
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status != PENDING:
+                    continue
+                job.status = RUNNING
+                job.started_at = time.time()
+                job._task = asyncio.create_task(job.func())
+                try:
+                    result = await job._task
+                except asyncio.CancelledError:
+                    # Either the job was cancelled, or this worker is stopping
+                    if job.status == RUNNING:
+                        self._finish(job, CANCELLED)
+                    if self._stopping:
+                        raise
+                except Exception as e:
+                    print(f"Background job {job.id} ({job.kind}) failed: {e}")
+                    self._finish(job, FAILED, error=str(e))
+                else:
+                    job.result = result
+                    self._finish(job, SUCCEEDED)
+            finally:
+                job._task = None
+                self._queue.task_done()
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        job.func = None
+        self._finished.append(job)
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.result_ttl_seconds
+        while self._finished and self._finished[0].finished_at < cutoff:
+            job = self._finished.popleft()
+            self._jobs.pop(job.id, None)
+
+
+# Singleton instance shared by the AI routes
+job_queue = JobQueue(
+    max_workers=int(os.getenv("AI_JOB_WORKERS", "4")),
+    max_pending=int(os.getenv("AI_JOB_MAX_PENDING", "1000")),
+    max_pending_per_user=int(os.getenv("AI_JOB_MAX_PENDING_PER_USER", "20")),
+    result_ttl_seconds=float(os.getenv("AI_JOB_RESULT_TTL_SECONDS", "3600")),
+)
@@ -0,0 +1,123 @@
+"""
+Fast keyword extraction for fallback tag generation
+
+RAKE-style candidate selection: text is split into candidate phrases at
+stopwords and punctuation. Words are scored by sublinear frequency (boosted
+when they also appear in the title) and phrases by their words and how often
+the phrase itself recurs. One regex pass over the text, no NLP models or
+corpora needed.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+# Common English function words plus filler that makes poor tags
+STOPWORDS = frozenset("""
+a about above after again against all almost also although always am among an
+and another any anyone anything are around as at be became because become been
+before being below between both but by can cannot could did do does doing done
+down during each either else enough etc even ever every few for from further get
+gets getting got had has have having he her here hers herself him himself his how
+however i if in into is it its itself just least less let like made make many may
+me might mine more most much must my myself need neither never no nor not nothing
+now of off often on once one only or other others otherwise our ours ourselves out
+over own per perhaps please put quite rather really said same say says see seem
+seems several shall she should since so some something sometimes still such take
+than that the their theirs them themselves then there therefore these they thing
+things this those though through thus to too toward towards under until up upon
+us use used using very via want was we well were what whatever when whenever where
+whether which while who whoever whom whose why will with within without would yet
+you your yours yourself yourselves
+add adds based include includes including new part parts provide provides
+run runs way ways work works
+""".split())
+
+# Words in any script, allowing inner hyphens/apostrophes/dots (e.g.
+# "node.js", "e-mail", "crème"). [^\W_] is a Unicode letter or digit;
+# underscores never reach this pattern since _BREAK_RE splits on them.
+_WORD_RE = re.compile(r"[^\W_](?:[\w'+#.-]*(?:[^\W_]|[+#]))?")
+# Punctuation that ends a candidate phrase
+_BREAK_RE = re.compile(r"[,.;:!?()\[\]{}\"`|/\\<>=*_~]+\s|[\n\r\t]+|[,;:!?()\[\]{}\"`|\\<>=*_~]+")
+
+
+def _phrases(text: str, max_words: int) -> List[tuple]:
+    """Candidate phrases of at most max_words non-stopwords"""
+    phrases = []
+    for segment in _BREAK_RE.split(text.lower()):
+        current: List[str] = []
+        for word in _WORD_RE.findall(segment):
+            word = word.strip(".'-")
+            if word in STOPWORDS or len(word) < 3 or word.isdigit():
+                if current:
+                    phrases.append(current)
+                current = []
+            else:
+                current.append(word)
+        if current:
+            phrases.append(current)
+
+    # Long runs become overlapping windows so every tag stays short
+    candidates = []
+    for words in phrases:
+        if len(words) <= max_words:
+            candidates.append(tuple(words))
+        else:
+            for i in range(len(words) - max_words + 1):
+                candidates.append(tuple(words[i:i + max_words]))
+    return candidates
+
+
+def extract_keywords(
+    title: str,
+    content: str,
+    max_keywords: int = 5,
+    max_words: int = 2,
+    title_boost: float = 2.0,
+) -> List[str]:
+    """
+    Return up to max_keywords keyphrases for a note, best first
+
+    Args:
+        title: Note title; its words are boosted
+        content: Note body
+        max_keywords: Number of phrases to return
+        max_words: Maximum words per phrase
+        title_boost: Score multiplier for words that appear in the title
+    """
+    candidates = _phrases(f"{title}\n{content}", max_words)
+    if not candidates:
+        return []
+
+    frequency: Counter = Counter(word for phrase in candidates for word in phrase)
+    title_words = {word for phrase in _phrases(title, max_words) for word in phrase}
+
+    # Sublinear word frequency, boosted for title words
+    word_score: Dict[str, float] = {}
+    for word, count in frequency.items():
+        score = 1.0 + math.log(count)
+        if word in title_words:
+            score *= title_boost
+        word_score[word] = score
+
+    # A phrase scores its words (dampened by length so longer phrases are
+    # favoured but not automatically) times how often the phrase recurs
+    phrase_score: Dict[tuple, float] = {}
+    for phrase, count in Counter(candidates).items():
+        phrase_score[phrase] = (
+            sum(word_score[word] for word in phrase) / math.sqrt(len(phrase))
+            * (1.0 + math.log(count))
+        )
+
+    keywords: List[str] = []
+    seen_words = set()
+    for phrase, _ in sorted(phrase_score.items(), key=lambda item: (-item[1], item[0])):
+        # Skip phrases that only repeat words already covered by a better tag
+        if all(word in seen_words for word in phrase):
+            continue
+        keywords.append(" ".join(phrase))
+        seen_words.update(phrase)
+        if len(keywords) >= max_keywords:
+            break
+    return keywords
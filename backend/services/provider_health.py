@@ -0,0 +1,101 @@
+"""
+Health tracking for AI providers
+
+Each provider gets a circuit breaker and a latency moving average. After a
+run of consecutive failures the breaker opens and the provider is skipped
+outright instead of costing a full request timeout on every call; once the
+reset timeout passes, a single trial request (or a successful background
+probe) decides whether it closes again.
+"""
+
+import time
+from typing import Optional
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """
+    Circuit breaker and latency EWMA for one provider
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        ewma_alpha: float = 0.3,
+        start_open: bool = False,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.ewma_alpha = ewma_alpha
+        self.state = OPEN if start_open else CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = time.monotonic() if start_open else 0.0
+        self.latency_ewma: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._trial_in_flight = False
+
+    def available(self) -> bool:
+        """Whether requests may currently be sent (without claiming the half-open trial)"""
+        if self.state == OPEN:
+            return time.monotonic() - self.opened_at >= self.reset_timeout
+        if self.state == HALF_OPEN:
+            return not self._trial_in_flight
+        return True
+
+    def allow_request(self) -> bool:
+        """Claim permission to send a request; only one trial is let through while half-open"""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful request and close the breaker"""
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.ewma_alpha * (latency - self.latency_ewma)
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self._trial_in_flight = False
+
+    def record_failure(self, error: Optional[str] = None) -> None:
+        """Record a failed request, opening the breaker if failures keep happening"""
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def record_abandoned(self) -> None:
+        """A request was cancelled (e.g. lost a hedge); it says nothing about health"""
+        self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        """Breaker state and latency for status reporting"""
+        return {
+            "state": self.state,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,253 @@
+"""
+In-memory full-text search for notes
+
+FullTextIndex is an inverted index (term -> {note_id: term frequency}) with
+BM25 ranking and prefix matching over a sorted vocabulary. NoteSearchIndex
+keeps one FullTextIndex per user, built lazily from the notes table and
+updated incrementally as notes are written (see services.indexing), so
+searches no longer need an ILIKE sequential scan over every note body.
+"""
+
+import bisect
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.config import settings
+from services.indexing import PerUserNoteIndex
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Title matches count this many times more than body matches
+TITLE_BOOST = 2.0
+# Prefix expansions score slightly lower than exact term matches
+PREFIX_WEIGHT = 0.8
+MAX_PREFIX_EXPANSIONS = 50
+MIN_PREFIX_LENGTH = 2
+
+# Note columns kept in memory for filtering
+_META_FIELDS = ("is_archived", "is_favorite", "created_at", "updated_at")
+_INDEX_COLUMNS = "id, title, body, " + ", ".join(_META_FIELDS)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def highlight_offsets(query: str, text: str) -> List[Tuple[int, int]]:
+    """
+    Return (start, end) character offsets of words in text that match a
+    query term exactly or by prefix
+    """
+    terms = set(tokenize(query))
+    if not terms or not text:
+        return []
+    prefixes = tuple(term for term in terms if len(term) >= MIN_PREFIX_LENGTH)
+
+    offsets = []
+    for match in _TOKEN_RE.finditer(text):
+        word = match.group(0).lower()
+        if word in terms or (prefixes and word.startswith(prefixes)):
+            offsets.append((match.start(), match.end()))
+    return offsets
+
+
+class FullTextIndex:
+    """
+    Inverted index with BM25 scoring for a single user's notes
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._vocabulary: List[str] = []  # sorted, for prefix lookups
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._bulk_loading = False
+        self.meta: Dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    @classmethod
+    def from_notes(cls, notes: List[dict]) -> "FullTextIndex":
+        """Bulk-build an index, sorting the vocabulary once at the end"""
+        index = cls()
+        index._bulk_loading = True
+        for note in notes:
+            index.add(note)
+        index._vocabulary = sorted(index._postings)
+        index._bulk_loading = False
+        return index
+
+    def add(self, note: dict) -> None:
+        """Index (or re-index) a note"""
+        note_id = note["id"]
+        self.remove(note_id)
+
+        terms: Counter = Counter()
+        for token in tokenize(note.get("title") or ""):
+            terms[token] += TITLE_BOOST
+        for token in tokenize(note.get("body") or ""):
+            terms[token] += 1
+
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if not self._bulk_loading:
+                    bisect.insort(self._vocabulary, term)
+            postings[note_id] = frequency
+
+        length = sum(terms.values())
+        self._doc_terms[note_id] = terms
+        self._doc_lengths[note_id] = length
+        self._total_length += length
+        self.meta[note_id] = {field: note.get(field) for field in _META_FIELDS}
+
+    def update_meta(self, note: dict) -> None:
+        """Refresh filter metadata for a note whose text did not change"""
+        meta = self.meta.get(note["id"])
+        if meta is not None:
+            for field in _META_FIELDS:
+                if field in note:
+                    meta[field] = note[field]
+
+    def remove(self, note_id: str) -> None:
+        """Remove a note from the index"""
+        terms = self._doc_terms.pop(note_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(note_id, None)
+            if not postings:
+                del self._postings[term]
+                position = bisect.bisect_left(self._vocabulary, term)
+                del self._vocabulary[position]
+
+        self._total_length -= self._doc_lengths.pop(note_id)
+        self.meta.pop(note_id, None)
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Exact term plus vocabulary terms that start with it"""
+        expansions = []
+        if term in self._postings:
+            expansions.append((term, 1.0))
+        if len(term) < MIN_PREFIX_LENGTH:
+            return expansions
+
+        position = bisect.bisect_right(self._vocabulary, term)
+        while (
+            position < len(self._vocabulary)
+            and self._vocabulary[position].startswith(term)
+            and len(expansions) < MAX_PREFIX_EXPANSIONS
+        ):
+            expansions.append((self._vocabulary[position], PREFIX_WEIGHT))
+            position += 1
+        return expansions
+
+    def search(
+        self,
+        query: str,
+        limit: int = 50,
+        predicate: Optional[Callable[[dict], bool]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Return up to ``limit`` (note_id, score) pairs, best first
+        Every query term must match (exactly or by prefix)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        doc_count = len(self._doc_terms)
+        if not terms or doc_count == 0:
+            return []
+
+        average_length = self._total_length / doc_count
+        scores: Optional[Dict[str, float]] = None
+
+        for term in terms:
+            term_scores: Dict[str, float] = {}
+            for expanded, weight in self._expand(term):
+                postings = self._postings[expanded]
+                df = len(postings)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for note_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[note_id] / average_length)
+                    score = weight * idf * tf * (self.k1 + 1) / (tf + norm)
+                    if score > term_scores.get(note_id, 0.0):
+                        term_scores[note_id] = score
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    note_id: total + term_scores[note_id]
+                    for note_id, total in scores.items()
+                    if note_id in term_scores
+                }
+            if not scores:
+                return []
+
+        hits = scores.items()
+        if predicate is not None:
+            hits = [(note_id, score) for note_id, score in hits if predicate(self.meta[note_id])]
+        ranked = heapq.nlargest(limit, hits, key=lambda hit: hit[1])
+        return [(note_id, round(score, 4)) for note_id, score in ranked]
+
+
+class NoteSearchIndex(PerUserNoteIndex):
+    """
+    Per-user full-text indexes kept in sync with note writes
+    """
+
+    columns = _INDEX_COLUMNS
+
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 50,
+        is_archived: Optional[bool] = False,
+        is_favorite: Optional[bool] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> List[Tuple[str, float]]:
+        """Ranked (note_id, score) pairs for the user's notes matching query"""
+        index: FullTextIndex = await self.get(user_id)
+
+        def predicate(meta: dict) -> bool:
+            if is_archived is not None and bool(meta.get("is_archived")) != is_archived:
+                return False
+            if is_favorite is not None and bool(meta.get("is_favorite")) != is_favorite:
+                return False
+            created_at = meta.get("created_at") or ""
+            if date_from and created_at < date_from:
+                return False
+            if date_to and created_at > date_to:
+                return False
+            return True
+
+        return index.search(query, limit, predicate)
+
+    def build_index(self, notes: List[dict]) -> FullTextIndex:
+        return FullTextIndex.from_notes(notes)
+
+    def apply_saved(self, index: FullTextIndex, note: dict) -> None:
+        if "title" in note or "body" in note:
+            index.add(note)
+        else:
+            index.update_meta(note)
+
+    def apply_deleted(self, index: FullTextIndex, note: dict) -> None:
+        index.remove(note["id"])
+
+
+# Singleton instance, kept in sync with note writes
+search_index = NoteSearchIndex(max_age_seconds=settings.search_index_ttl_seconds)
@@ -0,0 +1,135 @@
+"""
+Local extractive summarizer
+
+Scores sentences by TF-IDF centroid similarity: every sentence is a sparse
+TF-IDF vector over the note's vocabulary, the centroid is their sum, and a
+sentence's score is its cosine similarity to the centroid, nudged towards
+sentences that share words with the title or appear early. The best
+sentences are returned in their original order until the word budget is
+spent.
+
+All scoring works on flat (sentence, term, weight) arrays with NumPy
+bincounts, so cost grows with the number of words rather than with
+sentences x vocabulary.
+"""
+
+import re
+from typing import List
+
+import numpy as np
+
+from services.keywords import STOPWORDS
+
+# Sentence boundaries: terminal punctuation followed by whitespace, or blank lines
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n\s*\n+|\n(?=\s*(?:[-*#>]|\d+\.)\s)")
+# Words in any script ([^\W_] is a Unicode letter or digit)
+_WORD_RE = re.compile(r"[^\W_](?:[^\W_]|['-])*")
+_MARKDOWN_RE = re.compile(r"^\s*(?:[-*+>]|#{1,6}|\d+\.)\s+")
+
+# Sentences scoring below this fraction of the best one are never selected
+MIN_RELATIVE_SCORE = 0.4
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, dropping list/heading markers and empty pieces"""
+    sentences = []
+    for piece in _SENTENCE_RE.split(text):
+        sentence = _MARKDOWN_RE.sub("", " ".join(piece.split()))
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def summarize(
+    title: str,
+    content: str,
+    max_words: int = 150,
+    title_weight: float = 0.3,
+    position_weight: float = 0.1,
+) -> str:
+    """
+    Return an extractive summary of at most max_words words
+
+    Args:
+        title: Note title; sentences sharing its terms score higher
+        content: Note body
+        max_words: Word budget for the summary
+        title_weight: Weight of title-term overlap in a sentence's score
+        position_weight: Weight of the early-sentence bonus
+    """
+    sentences = split_sentences(content)
+    if not sentences:
+        return title.strip()
+
+    vocabulary = {}
+    rows, cols = [], []
+    lengths = np.empty(len(sentences), dtype=np.int64)
+    for i, sentence in enumerate(sentences):
+        lowered = sentence.lower()
+        lengths[i] = len(lowered.split())
+        for token in _WORD_RE.findall(lowered):
+            if token in STOPWORDS or len(token) < 3:
+                continue
+            rows.append(i)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    n = len(sentences)
+    if not rows:
+        return _fit(sentences, list(range(n)), lengths, max_words)
+
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    size = len(vocabulary)
+
+    # Collapse repeated (sentence, term) pairs into term frequencies
+    pairs, tf = np.unique(rows * size + cols, return_counts=True)
+    rows, cols = pairs // size, pairs % size
+
+    # Each unique pair is one sentence containing the term
+    df = np.bincount(cols, minlength=size)
+    idf = np.log((1 + n) / (1 + df)) + 1.0
+    weights = (1.0 + np.log(tf)) * idf[cols]
+
+    centroid = np.bincount(cols, weights=weights, minlength=size)
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n))
+    dots = np.bincount(rows, weights=weights * centroid[cols], minlength=n)
+    scores = np.divide(dots, norms * np.linalg.norm(centroid), out=np.zeros(n), where=norms > 0)
+
+    title_terms = [vocabulary[t] for t in set(_WORD_RE.findall(title.lower())) if t in vocabulary]
+    if title_terms:
+        in_title = np.zeros(size, dtype=bool)
+        in_title[title_terms] = True
+        overlap = np.bincount(rows, weights=in_title[cols].astype(np.float64), minlength=n)
+        scores += title_weight * overlap / len(title_terms)
+
+    scores += position_weight / np.sqrt(np.arange(1, n + 1))
+
+    # Very short fragments rarely make useful summary sentences
+    scores[lengths < 4] *= 0.5
+
+    # Leave the budget unspent rather than padding it with off-topic sentences
+    ranked = np.argsort(-scores, kind="stable")
+    ranked = ranked[scores[ranked] >= MIN_RELATIVE_SCORE * scores[ranked[0]]]
+    return _fit(sentences, ranked.tolist(), lengths, max_words)
+
+
+def _fit(sentences: List[str], ranked: List[int], lengths: np.ndarray, max_words: int) -> str:
+    """Take sentences in rank order while they fit the budget, then restore document order"""
+    chosen, used, seen = [], 0, set()
+    for index in ranked:
+        key = sentences[index].lower()
+        if key in seen:
+            continue
+        if used + lengths[index] > max_words:
+            if chosen:
+                continue
+            # Even the best sentence is too long: truncate it
+            words = sentences[index].split()[:max_words]
+            return " ".join(words) + ("..." if len(words) < lengths[index] else "")
+        chosen.append(index)
+        used += int(lengths[index])
+        seen.add(key)
+        if used >= max_words:
+            break
+
+    return " ".join(sentences[i] for i in sorted(chosen))
@@ -0,0 +1,99 @@
+"""
+Incrementally maintained per-user tag counts
+
+Keeps tag -> usage count for each user, built once from the ``tags`` column
+and then updated as notes are created, updated or deleted, so listing tags
+no longer downloads every note's tags. A sorted, case-folded vocabulary
+serves prefix autocomplete with a binary search.
+"""
+
+import bisect
+import heapq
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from core.config import settings
+from services.indexing import PerUserNoteIndex
+
+
+class TagCounter:
+    """Note -> tags assignments, per-tag counts and a sorted vocabulary"""
+
+    def __init__(self):
+        self.note_tags: Dict[str, Tuple[str, ...]] = {}
+        self.counts: Counter = Counter()
+        # Sorted (lowercase tag, tag) pairs for prefix search
+        self._vocabulary: List[Tuple[str, str]] = []
+
+    def set(self, note_id: str, tags: List[str]) -> None:
+        """Replace a note's tags"""
+        new_tags = tuple(dict.fromkeys(tag for tag in tags or [] if tag))
+        if self.note_tags.get(note_id) == new_tags:
+            return
+        self.remove(note_id)
+        self.note_tags[note_id] = new_tags
+        for tag in new_tags:
+            if self.counts[tag] == 0:
+                bisect.insort(self._vocabulary, (tag.lower(), tag))
+            self.counts[tag] += 1
+
+    def remove(self, note_id: str) -> None:
+        """Stop counting a note's tags"""
+        for tag in self.note_tags.pop(note_id, ()):
+            self.counts[tag] -= 1
+            if self.counts[tag] <= 0:
+                del self.counts[tag]
+                position = bisect.bisect_left(self._vocabulary, (tag.lower(), tag))
+                del self._vocabulary[position]
+
+    def all(self) -> List[dict]:
+        """All tags sorted by count (descending), then name"""
+        return [
+            {"tag": tag, "count": count}
+            for tag, count in sorted(self.counts.items(), key=lambda x: (-x[1], x[0]))
+        ]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[dict]:
+        """Most used tags starting with prefix (case-insensitive)"""
+        prefix = prefix.lower()
+        position = bisect.bisect_left(self._vocabulary, (prefix, ""))
+        matches = []
+        while position < len(self._vocabulary) and self._vocabulary[position][0].startswith(prefix):
+            matches.append(self._vocabulary[position][1])
+            position += 1
+
+        best = heapq.nsmallest(limit, matches, key=lambda tag: (-self.counts[tag], tag))
+        return [{"tag": tag, "count": self.counts[tag]} for tag in best]
+
+
+class TagIndex(PerUserNoteIndex):
+    """
+    Per-user tag counts kept in sync with note writes
+    """
+
+    columns = "id, tags"
+
+    async def all_tags(self, user_id: str) -> List[dict]:
+        counter: TagCounter = await self.get(user_id)
+        return counter.all()
+
+    async def autocomplete(self, user_id: str, prefix: str, limit: int = 10) -> List[dict]:
+        counter: TagCounter = await self.get(user_id)
+        return counter.complete(prefix, limit)
+
+    def build_index(self, notes: List[dict]) -> TagCounter:
+        counter = TagCounter()
+        for note in notes:
+            counter.set(note["id"], note.get("tags"))
+        return counter
+
+    def apply_saved(self, counter: TagCounter, note: dict) -> None:
+        if "tags" in note:
+            counter.set(note["id"], note["tags"])
+
+    def apply_deleted(self, counter: TagCounter, note: dict) -> None:
+        counter.remove(note["id"])
+
+
+# Singleton instance, kept in sync with note writes
+tag_index = TagIndex(max_age_seconds=settings.tag_index_ttl_seconds)
@@ -0,0 +1,288 @@
+"""
+In-memory approximate nearest-neighbour index for note embeddings
+
+VectorIndex stores unit vectors in a contiguous NumPy matrix and answers
+cosine-similarity queries. Small collections are scanned exactly; once a
+collection grows past ``ivf_threshold`` an IVF (inverted file) layer is
+trained with k-means and only the ``nprobe`` closest lists are scanned.
+
+SemanticIndex keeps one VectorIndex per user; building, periodic refresh
+and change tracking come from PerUserNoteIndex. Builds reuse the embeddings
+stored on notes (see /ai/batch-generate-embeddings) whose embedding_hash
+matches the current text, embed only the rest, and write those back so
+the next build can reuse them too.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from db.repository import notes_repo
+from services.embeddings import content_hash, embedder, note_text, to_list
+from core.config import settings
+from services.indexing import PerUserNoteIndex
+
+# Embeddings written back to the database per statement
+STORE_BATCH_SIZE = 200
+
+
+def stored_vector(value: Any, dim: int) -> Optional[np.ndarray]:
+    """
+    Parse an embedding column value (a JSON array, or pgvector's "[...]"
+    text form), or None if it is missing or of the wrong dimension
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    if not isinstance(value, list) or len(value) != dim:
+        return None
+    return np.asarray(value, dtype=np.float32)
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over unit vectors with optional IVF partitioning
+    Supports incremental upsert/remove without rebuilding
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        ivf_threshold: int = 2000,
+        nprobe: int = 8,
+    ):
+        self.dim = dim
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+
+        self._vectors = np.zeros((64, dim), dtype=np.float32)
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+
+        # IVF state: centroids and the list each row belongs to
+        self._centroids: Optional[np.ndarray] = None
+        self._lists = np.zeros(64, dtype=np.int32)
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._positions
+
+    def upsert(self, item_id: str, vector: np.ndarray) -> None:
+        """Insert or replace the vector for ``item_id``"""
+        position = self._positions.get(item_id)
+        if position is None:
+            position = len(self._ids)
+            self._grow(position + 1)
+            self._ids.append(item_id)
+            self._positions[item_id] = position
+
+        self._vectors[position] = vector
+        if self._centroids is not None:
+            self._lists[position] = int(np.argmax(self._centroids @ vector))
+
+        self._maybe_train()
+
+    def remove(self, item_id: str) -> None:
+        """Remove ``item_id`` by moving the last row into its slot"""
+        position = self._positions.pop(item_id, None)
+        if position is None:
+            return
+
+        last = len(self._ids) - 1
+        if position != last:
+            moved_id = self._ids[last]
+            self._vectors[position] = self._vectors[last]
+            self._lists[position] = self._lists[last]
+            self._ids[position] = moved_id
+            self._positions[moved_id] = position
+        self._ids.pop()
+
+    def search(self, vector: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        """Return up to ``k`` (id, cosine similarity) pairs, best first"""
+        size = len(self._ids)
+        if size == 0 or k <= 0:
+            return []
+
+        if self._centroids is None:
+            candidates = np.arange(size)
+        else:
+            probe_count = min(self.nprobe, len(self._centroids))
+            centroid_scores = self._centroids @ vector
+            probes = np.argpartition(-centroid_scores, probe_count - 1)[:probe_count]
+            candidates = np.nonzero(np.isin(self._lists[:size], probes))[0]
+            if len(candidates) < k:
+                candidates = np.arange(size)
+
+        scores = self._vectors[candidates] @ vector
+        top = min(k, len(candidates))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+
+        return [(self._ids[candidates[i]], float(scores[i])) for i in best]
+
+    def _grow(self, needed: int) -> None:
+        """Double the backing arrays until ``needed`` rows fit"""
+        capacity = len(self._vectors)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:len(self._ids)] = self._vectors[:len(self._ids)]
+        self._vectors = vectors
+
+        lists = np.zeros(capacity, dtype=np.int32)
+        lists[:len(self._ids)] = self._lists[:len(self._ids)]
+        self._lists = lists
+
+    def _maybe_train(self) -> None:
+        """(Re)train IVF centroids when the index crosses a size threshold"""
+        size = len(self._ids)
+        if size < self.ivf_threshold:
+            return
+        if self._centroids is not None and size < 2 * self._trained_size:
+            return
+        self._train()
+
+    def _train(self, iterations: int = 8) -> None:
+        """Spherical k-means over the current vectors"""
+        size = len(self._ids)
+        data = self._vectors[:size]
+        n_lists = max(1, int(np.sqrt(size)))
+
+        rng = np.random.default_rng(0)
+        centroids = data[rng.choice(size, n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = data[assignment == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    if norm > 0:
+                        centroids[c] = centroid / norm
+
+        self._centroids = centroids
+        self._lists[:size] = np.argmax(data @ centroids.T, axis=1)
+        self._trained_size = size
+
+
+class UserVectors:
+    """A user's vector index plus what is needed to keep it current"""
+
+    def __init__(self, dim: int):
+        self.index = VectorIndex(dim=dim)
+        # note_id -> hash of the text its vector was computed from
+        self.hashes: Dict[str, str] = {}
+        # note_id -> new text, or None for a deletion, waiting to be applied
+        self.pending: Dict[str, Optional[str]] = {}
+        # Vectors embedded while building, not yet stored on their notes
+        self.unsaved: List[dict] = []
+
+
+class SemanticIndex(PerUserNoteIndex):
+    """
+    Per-user semantic search over note embeddings
+    Note writes are queued and embedded in one batch on the next search
+    """
+
+    columns = "id, title, body, embedding, embedding_hash"
+
+    async def search(self, user_id: str, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return (note_id, similarity) pairs for the user's notes most similar to query"""
+        vectors: UserVectors = await self.get(user_id)
+        async with self.lock(user_id):
+            await self._store_unsaved(user_id, vectors)
+            await self._apply_pending(vectors)
+        loop = asyncio.get_running_loop()
+        vector = await loop.run_in_executor(None, embedder.embed, query)
+        return vectors.index.search(vector, limit)
+
+    def build_index(self, notes: List[dict]) -> UserVectors:
+        vectors = UserVectors(dim=embedder.dim)
+        stale = []
+        for note in notes:
+            text = note_text(note)
+            digest = content_hash(text)
+            vector = None
+            if note.get("embedding_hash") == digest:
+                vector = stored_vector(note.get("embedding"), embedder.dim)
+            if vector is None:
+                stale.append((note["id"], text, digest))
+                continue
+            vectors.index.upsert(note["id"], vector)
+            vectors.hashes[note["id"]] = digest
+
+        if stale:
+            embedded = embedder.embed_batch([text for _, text, _ in stale])
+            for (note_id, _, digest), vector in zip(stale, embedded):
+                vectors.index.upsert(note_id, vector)
+                vectors.hashes[note_id] = digest
+                vectors.unsaved.append({"id": note_id, "vector": vector, "embedding_hash": digest})
+        return vectors
+
+    def apply_saved(self, vectors: UserVectors, note: dict) -> None:
+        if "title" not in note and "body" not in note:
+            return
+        text = note_text(note)
+        if vectors.hashes.get(note["id"]) == content_hash(text):
+            # Unchanged (or changed back): drop any queued re-embed
+            vectors.pending.pop(note["id"], None)
+            return
+        vectors.pending[note["id"]] = text
+
+    def apply_deleted(self, vectors: UserVectors, note: dict) -> None:
+        vectors.pending[note["id"]] = None
+
+    async def _store_unsaved(self, user_id: str, vectors: UserVectors) -> None:
+        """Write vectors embedded by the last build back to their notes"""
+        unsaved = vectors.unsaved
+        if not unsaved:
+            return
+        vectors.unsaved = []
+        for i in range(0, len(unsaved), STORE_BATCH_SIZE):
+            rows = [
+                {"id": row["id"], "embedding": to_list(row["vector"]), "embedding_hash": row["embedding_hash"]}
+                for row in unsaved[i:i + STORE_BATCH_SIZE]
+            ]
+            try:
+                await notes_repo.update_embeddings(user_id, rows)
+            except Exception as e:
+                # Only a cache: the next build embeds these notes again
+                print(f"Failed to store {len(rows)} embeddings: {e}")
+
+    async def _apply_pending(self, vectors: UserVectors) -> None:
+        """Apply queued note changes to a user's index"""
+        pending = vectors.pending
+        if not pending:
+            return
+        vectors.pending = {}
+
+        removed = [note_id for note_id, text in pending.items() if text is None]
+        changed = [(note_id, text) for note_id, text in pending.items() if text is not None]
+
+        for note_id in removed:
+            vectors.index.remove(note_id)
+            vectors.hashes.pop(note_id, None)
+
+        if changed:
+            loop = asyncio.get_running_loop()
+            embedded = await loop.run_in_executor(
+                None, embedder.embed_batch, [text for _, text in changed]
+            )
+            for (note_id, text), vector in zip(changed, embedded):
+                vectors.index.upsert(note_id, vector)
+                vectors.hashes[note_id] = content_hash(text)
+
+
+# Singleton instance, kept in sync with note writes
+semantic_index = SemanticIndex(max_age_seconds=settings.semantic_index_ttl_seconds)
@@ -0,0 +1,30 @@
+"""
+Shared fixtures.
+
+Tests run against an in-memory fake of the Supabase client (see fakes.py),
+so no database or network access is needed.
+"""
+import os
+import sys
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import repository  # noqa: E402
+from tests.fakes import FakeSupabase  # noqa: E402
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Route every repository query to a fresh in-memory database."""
+    client = FakeSupabase()
+    monkeypatch.setattr(repository, "get_supabase", lambda: client)
+    return client
+
+
+@pytest.fixture
+def user_id():
+    """A new user per test, so per-user index singletons start cold."""
+    return str(uuid.uuid4())
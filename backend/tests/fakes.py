@@ -0,0 +1,245 @@
+"""
+In-memory stand-in for the Supabase client.
+
+Implements the slice of the PostgREST query builder that ``db.repository``
+uses, over plain lists of dicts. Like PostgREST it caps every response at
+``max_rows`` rows, and it runs each ``execute()`` under one lock, so RPCs
+are atomic the way a single SQL statement is. Every executed query is
+recorded in ``client.queries`` as ``(table_or_rpc, operation)``.
+"""
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+# or_() filters produced by NotesRepository.list for keyset pagination
+_KEYSET_RE = re.compile(
+    r'^(\w+)\.lt\."([^"]*)",and\(\1\.eq\."([^"]*)",id\.lt\."([^"]*)"\)$'
+)
+
+
+class Response:
+    def __init__(self, data: List[dict]):
+        self.data = data
+
+
+class Query:
+    def __init__(self, client: "FakeSupabase", table: str):
+        self.client = client
+        self.table = table
+        self.operation = "select"
+        self.payload: Any = None
+        self.filters: List[Callable[[dict], bool]] = []
+        self.ordering: List[tuple] = []
+        self.row_limit: Optional[int] = None
+
+    # Operations
+
+    def select(self, columns: str = "*"):
+        self.columns = [column.strip() for column in columns.split(",")]
+        return self
+
+    def insert(self, rows):
+        self.operation, self.payload = "insert", rows
+        return self
+
+    def update(self, data: dict):
+        self.operation, self.payload = "update", data
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    # Filters
+
+    def eq(self, column: str, value: Any):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column: str, values: List[Any]):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def contains(self, column: str, values: List[Any]):
+        self.filters.append(lambda row: set(values) <= set(row.get(column) or []))
+        return self
+
+    def gte(self, column: str, value: Any):
+        self.filters.append(lambda row: row.get(column) >= value)
+        return self
+
+    def lte(self, column: str, value: Any):
+        self.filters.append(lambda row: row.get(column) <= value)
+        return self
+
+    def or_(self, expression: str):
+        match = _KEYSET_RE.match(expression)
+        if match is None:
+            raise ValueError(f"Unsupported or_() filter: {expression}")
+        column, before, same, row_id = match.groups()
+        self.filters.append(
+            lambda row: row[column] < before or (row[column] == same and row["id"] < row_id)
+        )
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count: int):
+        self.row_limit = count
+        return self
+
+    # Execution
+
+    def _matches(self, row: dict) -> bool:
+        return all(check(row) for check in self.filters)
+
+    def execute(self) -> Response:
+        with self.client.lock:
+            self.client.queries.append((self.table, self.operation))
+            rows = self.client.tables.setdefault(self.table, [])
+
+            if self.operation == "insert":
+                new = self.payload if isinstance(self.payload, list) else [self.payload]
+                stored = [self.client.with_defaults(dict(row)) for row in new]
+                rows.extend(stored)
+                return Response([dict(row) for row in stored])
+
+            matched = [row for row in rows if self._matches(row)]
+            if self.operation == "update":
+                for row in matched:
+                    row.update(self.payload)
+                return Response([dict(row) for row in matched])
+            if self.operation == "delete":
+                self.client.tables[self.table] = [row for row in rows if not self._matches(row)]
+                return Response([dict(row) for row in matched])
+
+            for column, desc in reversed(self.ordering):
+                matched.sort(key=lambda row: row.get(column), reverse=desc)
+            limit = self.client.max_rows
+            if self.row_limit is not None:
+                limit = min(limit, self.row_limit)
+            matched = matched[:limit]
+            if self.columns != ["*"]:
+                matched = [{column: row.get(column) for column in self.columns} for row in matched]
+            else:
+                matched = [dict(row) for row in matched]
+            return Response(matched)
+
+
+class Rpc:
+    def __init__(self, client: "FakeSupabase", name: str, params: dict):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> Response:
+        with self.client.lock:
+            self.client.queries.append((self.name, "rpc"))
+            return Response(self.client.functions[self.name](self.client, **self.params))
+
+
+def toggle_note_flag(client: "FakeSupabase", p_note_id: str, p_user_id: str, p_flag: str) -> List[dict]:
+    """Mirror of migrations/003_atomic_note_toggles.sql"""
+    if p_flag not in ("is_favorite", "is_archived"):
+        raise ValueError(f"Unsupported note flag: {p_flag}")
+    updated = []
+    for row in client.tables.get("notes", []):
+        if row["id"] == p_note_id and row["user_id"] == p_user_id:
+            row[p_flag] = not bool(row.get(p_flag))
+            row["updated_at"] = now()
+            updated.append(dict(row))
+    return updated
+
+
+def bulk_update_note_tags(
+    client: "FakeSupabase",
+    p_user_id: str,
+    p_note_ids: List[str],
+    p_add: List[str],
+    p_remove: List[str],
+    p_fields: Optional[dict] = None,
+) -> List[dict]:
+    """Mirror of migrations/004_bulk_note_tags.sql"""
+    fields = {
+        name: value for name, value in (p_fields or {}).items()
+        if name in ("is_favorite", "is_archived", "folder_id") and value is not None
+    }
+    ids = set(p_note_ids)
+    updated = []
+    for row in client.tables.get("notes", []):
+        if row["id"] in ids and row["user_id"] == p_user_id:
+            tags = list(dict.fromkeys((row.get("tags") or []) + (p_add or [])))
+            row["tags"] = [tag for tag in tags if tag not in (p_remove or [])]
+            row.update(fields)
+            row["updated_at"] = now()
+            updated.append(dict(row))
+    return updated
+
+
+def bulk_set_note_embeddings(client: "FakeSupabase", p_user_id: str, p_rows: List[dict]) -> List[dict]:
+    """Mirror of migrations/005_bulk_note_embeddings.sql"""
+    by_id = {row["id"]: row for row in p_rows}
+    updated = []
+    for row in client.tables.get("notes", []):
+        new = by_id.get(row["id"])
+        if new is not None and row["user_id"] == p_user_id:
+            row["embedding"] = new["embedding"]
+            row["embedding_hash"] = new["embedding_hash"]
+            updated.append({"id": row["id"]})
+    return updated
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeSupabase:
+    """Minimal synchronous Supabase client over in-memory tables."""
+
+    def __init__(self, max_rows: int = 1000):
+        self.max_rows = max_rows
+        self.tables: Dict[str, List[dict]] = {}
+        self.queries: List[tuple] = []
+        self.lock = threading.Lock()
+        self.functions: Dict[str, Callable] = {
+            "toggle_note_flag": toggle_note_flag,
+            "bulk_update_note_tags": bulk_update_note_tags,
+            "bulk_set_note_embeddings": bulk_set_note_embeddings,
+        }
+
+    def table(self, name: str) -> Query:
+        return Query(self, name).select()
+
+    def rpc(self, name: str, params: dict) -> Rpc:
+        return Rpc(self, name, params)
+
+    @staticmethod
+    def with_defaults(row: dict) -> dict:
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", now())
+        row.setdefault("updated_at", row["created_at"])
+        return row
+
+
+def make_note(user_id: str, index: int, **fields) -> dict:
+    """A notes row with distinct, ordered timestamps."""
+    stamp = f"2025-01-01T00:00:00.{index:06d}+00:00"
+    row = {
+        "id": str(uuid.UUID(int=index + 1)),
+        "user_id": user_id,
+        "title": f"Note {index}",
+        "body": f"Body of note {index}",
+        "tags": [],
+        "folder_id": None,
+        "is_favorite": False,
+        "is_archived": False,
+        "created_at": stamp,
+        "updated_at": stamp,
+    }
+    row.update(fields)
+    return row
@@ -0,0 +1,78 @@
+"""
+AI concurrency caps, provider budgets and circuit breakers.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import ai
+from core.config import settings
+from core.middleware import get_current_user_id
+from core.rate_limit import ProviderBudget, RateLimitBackend, rate_limiter
+from services.ai_service import ai_service
+from services.provider_health import ProviderHealth
+
+USER = "stream-user"
+
+
+def test_backend_must_implement_take():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(ai.router)
+    app.dependency_overrides[get_current_user_id] = lambda: USER
+    return TestClient(app)
+
+
+def test_stream_holds_slot_until_body_is_sent(client, monkeypatch):
+    in_flight = []
+
+    async def stream_summary(**kwargs):
+        for text in ("one", "two"):
+            in_flight.append(rate_limiter._active[f"ai:{USER}"])
+            yield "groq", text
+
+    monkeypatch.setattr(ai_service, "stream_summary", stream_summary)
+
+    response = client.post("/ai/summarize/stream", json={"title": "t", "content": "c"})
+
+    assert response.status_code == 200
+    assert "event: done" in response.text
+    assert in_flight == [1, 1]
+    assert rate_limiter._active[f"ai:{USER}"] == 0
+
+
+def test_stream_rejected_when_slots_are_taken(client, monkeypatch):
+    monkeypatch.setitem(rate_limiter._active, f"ai:{USER}", settings.ai_max_concurrent_per_user)
+
+    response = client.post("/ai/summarize/stream", json={"title": "t", "content": "c"})
+
+    assert response.status_code == 429
+
+
+def test_open_breaker_does_not_spend_budget(monkeypatch):
+    health = ProviderHealth("groq", failure_threshold=1, reset_timeout=60)
+    health.record_failure("down")
+    budget = ProviderBudget("groq", per_minute=10)
+    monkeypatch.setitem(ai_service.provider_health, "groq", health)
+    monkeypatch.setitem(ai_service.provider_budgets, "groq", budget)
+
+    assert ai_service._admit("groq") is False
+    assert budget.used == 0
+
+
+def test_budget_denial_releases_half_open_trial(monkeypatch):
+    health = ProviderHealth("groq", failure_threshold=1, reset_timeout=0)
+    health.record_failure("down")
+    budget = ProviderBudget("groq", per_minute=1)
+    assert budget.try_acquire()
+    monkeypatch.setitem(ai_service.provider_health, "groq", health)
+    monkeypatch.setitem(ai_service.provider_budgets, "groq", budget)
+
+    assert ai_service._admit("groq") is False
+    # The trial request was never sent, so the next caller may take it
+    assert health.allow_request() is True
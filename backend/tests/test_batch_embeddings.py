@@ -0,0 +1,49 @@
+"""
+Batch embedding covers every note, past PostgREST's row cap.
+"""
+import asyncio
+
+from api.ai import embed_user_notes
+from services.ai_service import ai_service
+from services.embeddings import content_hash, note_text
+from tests.fakes import make_note
+
+
+def fake_embeddings(monkeypatch):
+    calls = []
+
+    async def generate_embeddings(texts):
+        calls.append(len(texts))
+        return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr(ai_service, "generate_embeddings", generate_embeddings)
+    return calls
+
+
+def test_embeds_notes_past_row_cap(fake_db, user_id, monkeypatch):
+    calls = fake_embeddings(monkeypatch)
+    notes = [make_note(user_id, i) for i in range(2300)]
+    fake_db.tables["notes"] = notes
+
+    result = asyncio.run(embed_user_notes(user_id))
+
+    assert result["total_notes"] == 2300
+    assert result["success_count"] == 2300
+    assert result["failed_count"] == 0
+    assert sum(calls) == 2300
+    assert all(note["embedding_hash"] == content_hash(note_text(note)) for note in notes)
+
+
+def test_skips_unchanged_notes_on_every_page(fake_db, user_id, monkeypatch):
+    calls = fake_embeddings(monkeypatch)
+    notes = [make_note(user_id, i) for i in range(2300)]
+    for note in notes:
+        note["embedding_hash"] = content_hash(note_text(note))
+    notes[0]["body"] = "Edited"  # oldest note, last page
+    fake_db.tables["notes"] = notes
+
+    result = asyncio.run(embed_user_notes(user_id))
+
+    assert result["skipped_count"] == 2299
+    assert result["success_count"] == 1
+    assert calls == [1]
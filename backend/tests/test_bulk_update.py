@@ -0,0 +1,89 @@
+"""
+PATCH /notes/bulk: folder ownership and single-write tag edits.
+"""
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from api.notes import BulkNoteFilter, BulkNoteUpdate, bulk_update_notes
+from tests.fakes import make_note
+
+
+def seed(fake_db, user_id, count=3):
+    fake_db.tables["notes"] = [make_note(user_id, i, tags=["draft", "work"]) for i in range(count)]
+    folder = {"id": str(uuid.uuid4()), "user_id": user_id, "name": "Inbox", "position": 0}
+    fake_db.tables["folders"] = [folder]
+    return fake_db.tables["notes"], folder
+
+
+def test_rejects_folder_owned_by_another_user(fake_db, user_id):
+    notes, _ = seed(fake_db, user_id)
+    stranger_folder = {"id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()), "name": "Theirs", "position": 0}
+    fake_db.tables["folders"].append(stranger_folder)
+    request = BulkNoteUpdate(ids=[note["id"] for note in notes], folder_id=stranger_folder["id"])
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(bulk_update_notes(request, user_id=user_id))
+
+    assert error.value.status_code == 404
+    assert all(note["folder_id"] is None for note in notes)
+    assert ("notes", "update") not in fake_db.queries
+
+
+def test_fields_and_tag_edits_are_one_write(fake_db, user_id):
+    notes, folder = seed(fake_db, user_id)
+    request = BulkNoteUpdate(
+        ids=[note["id"] for note in notes],
+        is_favorite=True,
+        folder_id=folder["id"],
+        add_tags=["urgent"],
+        remove_tags=["draft"],
+    )
+    fake_db.queries.clear()
+
+    result = asyncio.run(bulk_update_notes(request, user_id=user_id))
+
+    assert result["succeeded"] == 3
+    assert [query for query in fake_db.queries if query[0] == "notes"] == []
+    assert fake_db.queries.count(("bulk_update_note_tags", "rpc")) == 1
+    for note in notes:
+        assert note["tags"] == ["work", "urgent"]
+        assert note["is_favorite"] is True
+        assert note["folder_id"] == folder["id"]
+
+
+def test_field_update_without_tag_edits(fake_db, user_id):
+    notes, folder = seed(fake_db, user_id)
+    request = BulkNoteUpdate(ids=[note["id"] for note in notes], folder_id=folder["id"])
+
+    result = asyncio.run(bulk_update_notes(request, user_id=user_id))
+
+    assert result["succeeded"] == 3
+    assert all(note["folder_id"] == folder["id"] for note in notes)
+    assert all(note["tags"] == ["draft", "work"] for note in notes)
+
+
+def test_filter_matching_more_than_limit_is_rejected(fake_db, user_id):
+    assert fake_db.max_rows == 1000
+    fake_db.tables["notes"] = [make_note(user_id, i, tags=["x"]) for i in range(1500)]
+    request = BulkNoteUpdate(filter=BulkNoteFilter(tag="x"), is_favorite=True)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(bulk_update_notes(request, user_id=user_id))
+
+    assert error.value.status_code == 422
+    assert not any(note["is_favorite"] for note in fake_db.tables["notes"])
+
+
+def test_filter_updates_every_match_up_to_limit(fake_db, user_id):
+    notes = [make_note(user_id, i, tags=["x"]) for i in range(1000)]
+    notes += [make_note(user_id, i, tags=["y"]) for i in range(1000, 1600)]
+    fake_db.tables["notes"] = notes
+    request = BulkNoteUpdate(filter=BulkNoteFilter(tag="x"), is_favorite=True)
+
+    result = asyncio.run(bulk_update_notes(request, user_id=user_id))
+
+    assert result["succeeded"] == 1000
+    assert sum(note["is_favorite"] for note in notes) == 1000
@@ -0,0 +1,46 @@
+"""
+Conditional GET: ETags follow the response body, not just updated_at.
+"""
+from starlette.requests import Request
+
+from core.conditional import conditional_json
+from tests.fakes import make_note
+
+
+def get(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/notes", "headers": headers})
+
+
+def test_unchanged_listing_is_not_modified():
+    notes = [make_note("u", i) for i in range(3)]
+    etag = conditional_json(get(), notes).headers["etag"]
+
+    response = conditional_json(get(etag), notes)
+
+    assert response.status_code == 304
+    assert response.body == b""
+
+
+def test_change_without_updated_at_bump_gets_new_etag():
+    notes = [make_note("u", i, folder_id="f1") for i in range(3)]
+    first = conditional_json(get(), notes)
+    # ON DELETE SET NULL when the folder is deleted; updated_at stays put
+    for note in notes:
+        note["folder_id"] = None
+
+    second = conditional_json(get(first.headers["etag"]), notes)
+
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert second.headers["last-modified"] == first.headers["last-modified"]
+
+
+def test_deleted_row_gets_new_etag():
+    notes = [make_note("u", i) for i in range(3)]
+    first = conditional_json(get(), notes)
+
+    second = conditional_json(get(first.headers["etag"]), notes[1:])
+
+    assert second.status_code == 200
+    assert second.headers["last-modified"] == first.headers["last-modified"]
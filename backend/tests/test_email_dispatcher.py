@@ -0,0 +1,214 @@
+"""
+Background email delivery against a fake SMTP server.
+
+smtplib.SMTP is replaced by a scripted fake, so the dispatcher's retry,
+dead-letter and connection reuse paths run without a mail server.
+"""
+import asyncio
+import json
+import smtplib
+
+import pytest
+
+from core import email_service as email_module
+from core.email_service import EmailDispatcher, SMTPConnection, email_service
+
+
+class FakeSMTPServer:
+    """Records sessions and deliveries; ``failures`` scripts sendmail outcomes"""
+
+    def __init__(self):
+        self.failures = []
+        self.sessions = []
+        self.delivered = []
+
+    def connect(self, host, port, timeout=None):
+        session = FakeSMTPSession(self)
+        self.sessions.append(session)
+        return session
+
+
+class FakeSMTPSession:
+    def __init__(self, server: FakeSMTPServer):
+        self.server = server
+        self.open = True
+
+    def ehlo(self):
+        return 250, b"ok"
+
+    def starttls(self):
+        return 220, b"ready"
+
+    def login(self, user, password):
+        return 235, b"ok"
+
+    def has_extn(self, name):
+        return name == "8bitmime"
+
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=()):
+        if not self.open:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        if self.server.failures:
+            failure = self.server.failures.pop(0)
+            if failure is not None:
+                raise failure
+        self.server.delivered.append((to_addrs[0], msg))
+        return {}
+
+    def quit(self):
+        self.open = False
+
+    def close(self):
+        self.open = False
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    server = FakeSMTPServer()
+    monkeypatch.setattr(smtplib, "SMTP", server.connect)
+    # No jitter, so backoff delays are exact
+    monkeypatch.setattr(email_module.random, "uniform", lambda a, b: 1.0)
+    return server
+
+
+def make_dispatcher(**kwargs) -> EmailDispatcher:
+    connection = SMTPConnection("smtp.test", 25, starttls=False)
+    kwargs.setdefault("retry_base", 0.01)
+    return EmailDispatcher(connection, **kwargs)
+
+
+def make_email(i: int = 0):
+    return email_service.welcome_template.render(f"user{i}@example.com", name="Ada")
+
+
+async def settle(dispatcher: EmailDispatcher, count: int) -> None:
+    """Wait until ``count`` messages were either sent or dead-lettered"""
+    for _ in range(400):
+        if dispatcher.sent + dispatcher.dead_lettered >= count:
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError(f"only {dispatcher.stats()} after waiting")
+
+
+def record_delays(monkeypatch) -> list:
+    """Capture the delay of every retry scheduled on the running loop"""
+    loop = asyncio.get_running_loop()
+    call_later = loop.call_later
+    delays = []
+
+    def spy(delay, callback, *args):
+        # asyncio.sleep() schedules through call_later too
+        if getattr(callback, "__name__", "") == "requeue":
+            delays.append(delay)
+        return call_later(delay, callback, *args)
+
+    monkeypatch.setattr(loop, "call_later", spy)
+    return delays
+
+
+def test_transient_failures_are_retried_with_backoff(smtp_server, monkeypatch):
+    smtp_server.failures = [
+        smtplib.SMTPResponseException(451, b"Try again later"),
+        smtplib.SMTPResponseException(421, b"Service not available"),
+    ]
+    dispatcher = make_dispatcher()
+
+    async def scenario():
+        delays = record_delays(monkeypatch)
+        await dispatcher.start()
+        dispatcher.enqueue(make_email())
+        await settle(dispatcher, 1)
+        await dispatcher.stop()
+        return delays
+
+    delays = asyncio.run(scenario())
+
+    assert delays == [pytest.approx(0.01), pytest.approx(0.02)]
+    assert dispatcher.retried == 2
+    assert dispatcher.sent == 1
+    assert dispatcher.dead_lettered == 0
+    assert [to for to, _ in smtp_server.delivered] == ["user0@example.com"]
+
+
+def test_permanent_failure_is_dead_lettered_without_retry(smtp_server, tmp_path):
+    smtp_server.failures = [smtplib.SMTPResponseException(550, b"No such user")]
+    dead_letter_path = tmp_path / "dead-letters.jsonl"
+    dispatcher = make_dispatcher(dead_letter_path=str(dead_letter_path))
+
+    async def scenario():
+        await dispatcher.start()
+        dispatcher.enqueue(make_email())
+        await settle(dispatcher, 1)
+        await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+    assert dispatcher.retried == 0
+    assert dispatcher.sent == 0
+    [item] = dispatcher.dead_letters
+    assert item.attempts == 1
+    assert "No such user" in item.last_error
+
+    record = json.loads(dead_letter_path.read_text())
+    assert record["to"] == "user0@example.com"
+    assert record["attempts"] == 1
+    # Metadata only: the body is not written to disk
+    assert "body" not in record and "raw" not in record
+
+
+def test_message_is_dead_lettered_after_max_attempts(smtp_server):
+    smtp_server.failures = [smtplib.SMTPResponseException(451, b"Try again later")] * 3
+    dispatcher = make_dispatcher(max_attempts=3)
+
+    async def scenario():
+        await dispatcher.start()
+        dispatcher.enqueue(make_email())
+        await settle(dispatcher, 1)
+        await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+    assert dispatcher.retried == 2
+    assert dispatcher.sent == 0
+    assert [item.attempts for item in dispatcher.dead_letters] == [3]
+    assert smtp_server.delivered == []
+
+
+def test_batch_is_sent_over_one_connection(smtp_server):
+    dispatcher = make_dispatcher()
+
+    async def scenario():
+        await dispatcher.start()
+        for i in range(5):
+            dispatcher.enqueue(make_email(i))
+        await settle(dispatcher, 5)
+        await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+    assert dispatcher.sent == 5
+    assert len(smtp_server.sessions) == 1
+    assert dispatcher.stats()["smtp_connections_opened"] == 1
+    # stop() ends the pooled session
+    assert not smtp_server.sessions[0].open
+
+
+def test_dropped_session_is_reopened_without_a_retry(smtp_server):
+    dispatcher = make_dispatcher()
+
+    async def scenario():
+        await dispatcher.start()
+        dispatcher.enqueue(make_email(0))
+        await settle(dispatcher, 1)
+        # The server hangs up on the idle pooled session
+        smtp_server.sessions[0].open = False
+        dispatcher.enqueue(make_email(1))
+        await settle(dispatcher, 2)
+        await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+    assert dispatcher.sent == 2
+    assert dispatcher.retried == 0
+    assert len(smtp_server.sessions) == 2
+    assert [to for to, _ in smtp_server.delivered] == ["user0@example.com", "user1@example.com"]
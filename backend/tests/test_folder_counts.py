@@ -0,0 +1,48 @@
+"""
+/folders/with-counts: correct counts with a constant number of queries.
+"""
+import asyncio
+import uuid
+
+from api.folders import get_folders_with_counts
+from tests.fakes import make_note
+
+
+def seed(fake_db, user_id, folder_count, note_count):
+    folders = [
+        {"id": str(uuid.uuid4()), "user_id": user_id, "name": f"Folder {i}", "position": i}
+        for i in range(folder_count)
+    ]
+    fake_db.tables["folders"] = folders
+    fake_db.tables["notes"] = [
+        make_note(user_id, i, folder_id=folders[i % folder_count]["id"], is_archived=i % 10 == 0)
+        for i in range(note_count)
+    ]
+    return folders
+
+
+def test_query_count_does_not_grow_with_folders(fake_db):
+    query_counts = []
+    for folder_count in (5, 50, 500):
+        user_id = str(uuid.uuid4())
+        seed(fake_db, user_id, folder_count, note_count=1000)
+        fake_db.queries.clear()
+
+        folders = asyncio.run(get_folders_with_counts(user_id=user_id))
+
+        assert len(folders) == folder_count
+        query_counts.append(len(fake_db.queries))
+
+    # One folders query plus the paged notes warm-up, whatever the folder count
+    assert query_counts == [3, 3, 3]
+
+
+def test_counts_notes_past_row_cap(fake_db, user_id):
+    folders = seed(fake_db, user_id, folder_count=2, note_count=2500)
+
+    result = asyncio.run(get_folders_with_counts(user_id=user_id))
+
+    counts = {folder["id"]: folder["note_count"] for folder in result}
+    # 2500 notes alternate between the two folders; every 10th (all in the
+    # first folder) is archived and not counted
+    assert counts == {folders[0]["id"]: 1000, folders[1]["id"]: 1250}
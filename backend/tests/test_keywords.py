@@ -0,0 +1,30 @@
+"""
+Fallback keyword extraction.
+"""
+from services.keywords import extract_keywords
+
+
+def test_keeps_accented_words_whole():
+    keywords = extract_keywords("Café crème", "Un café crème au bistrot. Café noir et café crème.")
+
+    assert keywords[0] == "café crème"
+    assert "caf" not in keywords
+
+
+def test_non_ascii_words_are_not_split_or_dropped():
+    keywords = extract_keywords("Über naïve résumé", "Über naïve résumé writing tips for résumé reviews")
+
+    words = {word for keyword in keywords for word in keyword.split()}
+    assert {"über", "naïve", "résumé"} <= words
+    assert not words & {"ber", "sum"}
+
+
+def test_technical_terms_keep_inner_punctuation():
+    keywords = extract_keywords(
+        "Node.js and C++ tips",
+        "Using node.js with C# and C++ for e-mail pipelines; node.js rocks.",
+    )
+
+    assert keywords[0] == "node.js"
+    assert "c++ tips" in keywords
+    assert "e-mail pipelines" in keywords
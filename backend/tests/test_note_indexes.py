@@ -0,0 +1,78 @@
+"""
+Per-user note indexes keep a bounded number of users resident.
+"""
+import asyncio
+import gc
+import uuid
+
+from services.tag_index import TagIndex
+from tests.fakes import make_note
+
+
+def seed(fake_db, user_ids):
+    fake_db.tables["notes"] = [
+        make_note(user_id, i, tags=["work"]) for i, user_id in enumerate(user_ids)
+    ]
+
+
+def test_least_recently_used_users_are_evicted(fake_db):
+    users = [str(uuid.uuid4()) for _ in range(5)]
+    seed(fake_db, users)
+    index = TagIndex(max_users=3)
+
+    async def scenario():
+        for user_id in users:
+            await index.all_tags(user_id)
+        await index.all_tags(users[2])  # touch: now most recently used
+        await index.all_tags(users[0])  # evicted: rebuilt, pushing out users[3]
+
+    asyncio.run(scenario())
+
+    assert index.stats()["size"] == 3
+    resident = [user_id for user_id in users if index.loaded(user_id) is not None]
+    assert resident == [users[0], users[2], users[4]]
+
+
+def test_build_locks_are_released_after_use(fake_db):
+    users = [str(uuid.uuid4()) for _ in range(50)]
+    seed(fake_db, users)
+    index = TagIndex(max_users=10)
+
+    async def scenario():
+        await asyncio.gather(*(index.all_tags(user_id) for user_id in users))
+
+    asyncio.run(scenario())
+    gc.collect()
+
+    assert len(index._locks) == 0
+    assert index.stats()["size"] == 10
+
+
+def test_writes_for_evicted_users_are_ignored(fake_db):
+    users = [str(uuid.uuid4()) for _ in range(2)]
+    seed(fake_db, users)
+    index = TagIndex(max_users=1)
+
+    async def scenario():
+        await index.all_tags(users[0])
+        await index.all_tags(users[1])
+
+    asyncio.run(scenario())
+    index.note_saved(users[0], {"id": "n", "tags": ["late"]})
+
+    assert index.loaded(users[0]) is None
+    assert index.stats()["size"] == 1
+
+
+def test_expired_index_is_rebuilt(fake_db, user_id):
+    fake_db.tables["notes"] = [make_note(user_id, 0, tags=["work"])]
+    index = TagIndex(max_age_seconds=0)
+
+    async def scenario():
+        await index.all_tags(user_id)
+        fake_db.tables["notes"].append(make_note(user_id, 1, tags=["home"]))
+        return await index.all_tags(user_id)
+
+    tags = asyncio.run(scenario())
+
+    assert {tag["tag"] for tag in tags} == {"work", "home"}
@@ -0,0 +1,78 @@
+"""
+Whole-table reads must follow keyset pages past PostgREST's row cap, and
+listings only accept a cursor where they paginate.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+
+from api.notes import get_all_notes
+from core.pagination import encode_cursor
+from db.repository import notes_repo
+from services.search_index import search_index
+from services.tag_index import tag_index
+from tests.fakes import make_note
+
+
+def test_list_all_reads_past_row_cap(fake_db, user_id):
+    fake_db.tables["notes"] = [make_note(user_id, i) for i in range(2500)]
+
+    notes = asyncio.run(notes_repo.list_all(user_id, is_archived=None, columns="id"))
+
+    assert len(notes) == 2500
+    assert len({note["id"] for note in notes}) == 2500
+    # 1000 + 1000 + 500 (short page ends the walk)
+    assert fake_db.queries == [("notes", "select")] * 3
+
+
+def test_list_all_stops_after_exactly_full_page(fake_db, user_id):
+    fake_db.tables["notes"] = [make_note(user_id, i) for i in range(2000)]
+
+    notes = asyncio.run(notes_repo.list_all(user_id, is_archived=None, columns="id"))
+
+    assert len(notes) == 2000
+    assert len(fake_db.queries) == 3
+
+
+def test_get_many_sends_ids_in_chunks(fake_db, user_id):
+    fake_db.tables["notes"] = [make_note(user_id, i) for i in range(450)]
+    note_ids = [note["id"] for note in fake_db.tables["notes"]]
+
+    notes = asyncio.run(notes_repo.get_many(note_ids, user_id, columns="id"))
+
+    assert sorted(note["id"] for note in notes) == sorted(note_ids)
+    # 200 + 200 + 50 ids per IN list
+    assert fake_db.queries == [("notes", "select")] * 3
+
+
+def test_search_index_finds_notes_past_row_cap(fake_db, user_id):
+    notes = [make_note(user_id, i) for i in range(1500)]
+    notes[0]["title"] = "Zanzibar itinerary"  # oldest note, last page
+    fake_db.tables["notes"] = notes
+
+    hits = asyncio.run(search_index.search(user_id, "zanzibar", limit=5))
+
+    assert [note_id for note_id, _ in hits] == [notes[0]["id"]]
+
+
+def test_tag_counts_include_notes_past_row_cap(fake_db, user_id):
+    fake_db.tables["notes"] = [make_note(user_id, i, tags=["work"]) for i in range(1200)]
+
+    tags = asyncio.run(tag_index.all_tags(user_id))
+
+    assert tags == [{"tag": "work", "count": 1200}]
+
+
+def test_listing_rejects_cursor_with_search(fake_db, user_id):
+    notes = [make_note(user_id, i) for i in range(3)]
+    fake_db.tables["notes"] = notes
+    cursor = encode_cursor("created_at", notes[1])
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_all_notes(
+            request=None, response=Response(), user_id=user_id, search="note", cursor=cursor
+        ))
+
+    assert error.value.status_code == 400
+    assert fake_db.queries == []
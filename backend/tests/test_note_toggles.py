@@ -0,0 +1,45 @@
+"""
+Concurrent flag toggles go through the atomic ``toggle_note_flag`` RPC, so
+none are lost and the cached indexes agree with the final row.
+"""
+import asyncio
+
+from api.notes import toggle_archive, toggle_favorite
+from services.folder_counts import folder_counts
+from tests.fakes import make_note
+
+TOGGLES = 51
+
+
+async def toggle_concurrently(endpoint, note_id, user_id):
+    return await asyncio.gather(
+        *(endpoint(note_id, user_id=user_id) for _ in range(TOGGLES))
+    )
+
+
+def test_concurrent_favorite_toggles_are_not_lost(fake_db, user_id):
+    note = make_note(user_id, 0)
+    fake_db.tables["notes"] = [note]
+
+    results = asyncio.run(toggle_concurrently(toggle_favorite, note["id"], user_id))
+
+    # An odd number of flips ends flipped, and every flip saw the previous one
+    assert note["is_favorite"] is True
+    assert sum(row["is_favorite"] for row in results) == TOGGLES // 2 + 1
+    assert fake_db.queries.count(("toggle_note_flag", "rpc")) == TOGGLES
+
+
+def test_concurrent_archive_toggles_keep_folder_counts_in_sync(fake_db, user_id):
+    note = make_note(user_id, 0, folder_id="f1")
+    other = make_note(user_id, 1, folder_id="f1")
+    fake_db.tables["notes"] = [note, other]
+
+    async def scenario():
+        assert await folder_counts.counts(user_id) == {"f1": 2}
+        await toggle_concurrently(toggle_archive, note["id"], user_id)
+        return await folder_counts.counts(user_id)
+
+    counts = asyncio.run(scenario())
+
+    assert note["is_archived"] is True
+    assert counts == {"f1": 1}
@@ -0,0 +1,53 @@
+"""
+Cursors are decoded into values that are safe to embed in PostgREST filters.
+"""
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from core.pagination import decode_cursor, encode_cursor
+
+
+def raw_cursor(*parts) -> str:
+    payload = json.dumps(list(parts)).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def test_round_trip():
+    row = {"id": "8c1d6a3e-4b0f-4c5e-9a51-3f1f7b0f2a10", "created_at": "2025-03-04T05:06:07.123456+00:00"}
+
+    assert decode_cursor(encode_cursor("created_at", row), "created_at") == (
+        row["created_at"],
+        row["id"],
+    )
+
+
+def test_normalizes_zulu_timestamp():
+    cursor = raw_cursor("created_at", "2025-03-04T05:06:07Z", "8c1d6a3e-4b0f-4c5e-9a51-3f1f7b0f2a10")
+
+    assert decode_cursor(cursor, "created_at")[0] == "2025-03-04T05:06:07+00:00"
+
+
+@pytest.mark.parametrize(
+    "value, row_id",
+    [
+        ('2025-01-01",user_id.neq."x', "8c1d6a3e-4b0f-4c5e-9a51-3f1f7b0f2a10"),
+        ("2025-01-01T00:00:00+00:00", '0",and(id.gt."0'),
+        ("yesterday", "8c1d6a3e-4b0f-4c5e-9a51-3f1f7b0f2a10"),
+        (1735689600, "8c1d6a3e-4b0f-4c5e-9a51-3f1f7b0f2a10"),
+    ],
+)
+def test_rejects_non_timestamp_or_non_uuid(value, row_id):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(raw_cursor("created_at", value, row_id), "created_at")
+
+    assert error.value.status_code == 400
+
+
+def test_rejects_cursor_for_other_sort_order():
+    cursor = raw_cursor("updated_at", "2025-01-01T00:00:00+00:00", "8c1d6a3e-4b0f-4c5e-9a51-3f1f7b0f2a10")
+
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, "created_at")
@@ -0,0 +1,85 @@
+"""
+Semantic index coverage and Unicode handling.
+"""
+import asyncio
+
+import numpy as np
+
+from db.repository import notes_repo
+from services.embeddings import content_hash, embedder, note_text, to_list
+from services.vector_index import SemanticIndex, semantic_index
+from tests.fakes import make_note
+
+
+def test_embeds_non_ascii_text():
+    japanese = embedder.embed("日本語のテキスト")
+    assert np.linalg.norm(japanese) > 0
+
+    # Accented words stay whole instead of being cut at the accent
+    cafe = embedder.embed("café crème")
+    assert float(cafe @ embedder.embed("crème café")) > float(cafe @ embedder.embed("caf cr me"))
+
+
+def test_finds_notes_past_row_cap(fake_db, user_id):
+    notes = [make_note(user_id, i, body="weekly status update") for i in range(1500)]
+    notes[0].update(title="東京 旅行", body="東京 旅行 の 計画")  # oldest note, last page
+    fake_db.tables["notes"] = notes
+
+    hits = asyncio.run(semantic_index.search(user_id, "東京 旅行", limit=1))
+
+    assert hits[0][0] == notes[0]["id"]
+
+
+def test_applies_writes_after_build(fake_db, user_id):
+    fake_db.tables["notes"] = [make_note(user_id, i) for i in range(3)]
+
+    async def scenario():
+        await semantic_index.search(user_id, "anything")
+        created = await notes_repo.create(
+            {"user_id": user_id, "title": "Quantum gardening", "body": "photosynthesis qubits"}
+        )
+        hits = await semantic_index.search(user_id, "quantum gardening", limit=1)
+        await notes_repo.delete(created["id"], user_id)
+        after_delete = await semantic_index.search(user_id, "quantum gardening", limit=5)
+        return created, hits, after_delete
+
+    created, hits, after_delete = asyncio.run(scenario())
+    assert hits[0][0] == created["id"]
+    assert created["id"] not in [note_id for note_id, _ in after_delete]
+
+
+def test_build_reuses_stored_embeddings(fake_db, user_id, monkeypatch):
+    notes = [make_note(user_id, i, body=f"topic {i}") for i in range(5)]
+    for note in notes:
+        note["embedding"] = to_list(embedder.embed(note_text(note)))
+        note["embedding_hash"] = content_hash(note_text(note))
+    notes[1]["body"] = "edited since it was embedded"
+    notes[2]["embedding"] = notes[2]["embedding_hash"] = None
+    notes[3]["embedding"] = str(notes[3]["embedding"])  # pgvector text form
+    fake_db.tables["notes"] = notes
+
+    embedded = []
+    embed_batch = embedder.embed_batch
+
+    def counting_embed_batch(texts):
+        texts = list(texts)
+        embedded.extend(texts)
+        return embed_batch(texts)
+
+    monkeypatch.setattr(embedder, "embed_batch", counting_embed_batch)
+    index = SemanticIndex()
+
+    hits = asyncio.run(index.search(user_id, "edited since it was embedded", limit=1))
+
+    # Only the stale notes (plus the query) were embedded, then stored
+    assert sorted(embedded[:-1]) == [note_text(notes[1]), note_text(notes[2])]
+    assert embedded[-1] == "edited since it was embedded"
+    assert hits[0][0] == notes[1]["id"]
+    assert notes[1]["embedding_hash"] == content_hash(note_text(notes[1]))
+    assert notes[2]["embedding_hash"] == content_hash(note_text(notes[2]))
+
+    embedded.clear()
+    index.invalidate(user_id)
+    asyncio.run(index.search(user_id, "topic", limit=1))
+
+    assert embedded == ["topic"]
@@ -0,0 +1,16 @@
+"""
+Local extractive summarizer.
+"""
+from services.summarizer import summarize
+
+
+def test_title_terms_match_whole_non_ascii_words():
+    # ASCII-only tokenizing reduces both "Grün" and "Grüße" to "gr"
+    summary = summarize(
+        "Grüße",
+        "Grün ist die Wand im Flur. Viele Grüße aus Köln von Jörg. "
+        "Der Zug fährt um acht. Morgen kommt Besuch.",
+        max_words=7,
+    )
+
+    assert summary == "Viele Grüße aus Köln von Jörg."
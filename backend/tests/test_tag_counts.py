@@ -0,0 +1,32 @@
+"""
+/notes/tags/all and /notes/tags/autocomplete count every note, not just the
+first page PostgREST returns.
+"""
+import asyncio
+
+from api.notes import autocomplete_tags, get_all_tags
+from tests.fakes import make_note
+
+
+def seed(fake_db, user_id):
+    notes = [make_note(user_id, i, tags=["work"]) for i in range(2100)]
+    # Oldest notes come back on the last page
+    for note in notes[:3]:
+        note["tags"] = ["work", "wedding"]
+    fake_db.tables["notes"] = notes
+
+
+def test_all_tags_counts_past_row_cap(fake_db, user_id):
+    seed(fake_db, user_id)
+
+    tags = asyncio.run(get_all_tags(user_id=user_id))
+
+    assert tags == [{"tag": "work", "count": 2100}, {"tag": "wedding", "count": 3}]
+
+
+def test_autocomplete_sees_tags_only_on_last_page(fake_db, user_id):
+    seed(fake_db, user_id)
+
+    suggestions = asyncio.run(autocomplete_tags(prefix="we", limit=10, user_id=user_id))
+
+    assert suggestions == [{"tag": "wedding", "count": 3}]